@@ -0,0 +1,262 @@
+import json
+import os
+import pickle
+import threading
+import time
+import logging
+from collections import OrderedDict
+
+from django.core.cache.backends.base import DEFAULT_TIMEOUT
+from django_redis.cache import RedisCache
+
+logger = logging.getLogger(__name__)
+
+_MISSING = object()
+FLUSH_ALL = '*'
+
+
+class LocalCache:
+    """Bounded, TTL'd LRU map living in the memory of a single process."""
+
+    def __init__(self, max_entries=1024, timeout=5):
+        self.max_entries = max_entries
+        self.timeout = timeout
+        self.hits = 0
+        self.misses = 0
+        self._data = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key):
+        now = time.monotonic()
+        with self._lock:
+            entry = self._data.get(key)
+            if entry is None or entry[0] <= now:
+                if entry is not None:
+                    del self._data[key]
+                self.misses += 1
+                return _MISSING
+            self._data.move_to_end(key)
+            self.hits += 1
+            payload = entry[1]
+        # values are kept pickled so callers can't mutate the shared copy
+        return pickle.loads(payload)
+
+    def set(self, key, value):
+        payload = pickle.dumps(value, pickle.HIGHEST_PROTOCOL)
+        with self._lock:
+            self._data[key] = (time.monotonic() + self.timeout, payload)
+            self._data.move_to_end(key)
+            while len(self._data) > self.max_entries:
+                self._data.popitem(last=False)
+
+    def delete(self, key):
+        with self._lock:
+            self._data.pop(key, None)
+
+    def clear(self):
+        with self._lock:
+            self._data.clear()
+
+    def stats(self):
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                'hits': self.hits,
+                'misses': self.misses,
+                'hit_ratio': self.hits / lookups if lookups else 0.0,
+                'size': len(self._data),
+                'max_entries': self.max_entries,
+            }
+
+
+class TwoTierRedisCache(RedisCache):
+    """
+    django-redis backend with an in-process L1 in front of Redis.
+
+    Every write publishes the affected keys on a Redis pub/sub channel and each
+    process runs a listener thread evicting those keys from its own L1, so
+    workers on every node stay coherent. L1 is bypassed whenever the listener
+    is not subscribed, since invalidations could be missed in that window.
+    L1 entries live at most ``L1_TIMEOUT`` seconds, which also bounds the race
+    between a read filling L1 and a concurrent write on another worker.
+    """
+
+    def __init__(self, server, params):
+        super().__init__(server, params)
+        options = params.get('OPTIONS', {})
+        self.l1 = LocalCache(
+            max_entries=options.get('L1_MAX_ENTRIES', 1024),
+            timeout=options.get('L1_TIMEOUT', 5),
+        )
+        self._channel = options.get('L1_CHANNEL', 'cache:invalidate')
+        self._listener = None
+        self._listener_pid = None
+        self._subscribed = threading.Event()
+        self._listener_lock = threading.Lock()
+
+    def l1_stats(self):
+        stats = self.l1.stats()
+        stats['subscribed'] = self._subscribed.is_set()
+        return stats
+
+    def _l1_ready(self):
+        if self._listener_pid != os.getpid() or not self._listener.is_alive():
+            self._start_listener()
+        return self._subscribed.is_set()
+
+    def _start_listener(self):
+        with self._listener_lock:
+            pid = os.getpid()
+            if self._listener_pid == pid and self._listener.is_alive():
+                return
+
+            # a forked worker inherits neither the thread nor a valid L1
+            self.l1.clear()
+            self._subscribed.clear()
+            self._listener_pid = pid
+            self._listener = threading.Thread(
+                target=self._listen, name='cache-l1-invalidation', daemon=True,
+            )
+            self._listener.start()
+
+    def _listen(self):
+        backoff = 0.5
+        while self._listener_pid == os.getpid():
+            pubsub = None
+            try:
+                pubsub = self.client.get_client(write=True).pubsub(
+                    ignore_subscribe_messages=True,
+                )
+                pubsub.subscribe(self._channel)
+                # drop anything cached while we were not listening
+                self.l1.clear()
+                self._subscribed.set()
+                backoff = 0.5
+                for message in pubsub.listen():
+                    if message['type'] == 'message':
+                        self._handle_invalidation(message['data'])
+            except Exception:
+                logger.warning('L1 invalidation listener disconnected', exc_info=True)
+            finally:
+                self._subscribed.clear()
+                self.l1.clear()
+                if pubsub is not None:
+                    try:
+                        pubsub.close()
+                    except Exception:
+                        pass
+            time.sleep(backoff)
+            backoff = min(backoff * 2, 30)
+
+    def _handle_invalidation(self, data):
+        keys = json.loads(data)
+        if keys == FLUSH_ALL:
+            self.l1.clear()
+            return
+        for key in keys:
+            self.l1.delete(key)
+
+    def _l1_key(self, key, version=None):
+        return str(self.client.make_key(key, version=version))
+
+    def _invalidate(self, keys):
+        for key in keys:
+            self.l1.delete(key)
+        self._publish(keys)
+
+    def _invalidate_all(self):
+        self.l1.clear()
+        self._publish(FLUSH_ALL)
+
+    def _publish(self, keys):
+        try:
+            self.client.get_client(write=True).publish(self._channel, json.dumps(keys))
+        except Exception:
+            # other workers fall back to the L1 timeout for staleness
+            logger.warning('Failed to publish L1 invalidation', exc_info=True)
+
+    def get(self, key, default=None, version=None, client=None):
+        if client is not None or not self._l1_ready():
+            return super().get(key, default, version, client)
+
+        l1_key = self._l1_key(key, version)
+        value = self.l1.get(l1_key)
+        if value is not _MISSING:
+            return value
+
+        value = super().get(key, _MISSING, version)
+        if value is _MISSING:
+            return default
+
+        self.l1.set(l1_key, value)
+        return value
+
+    def get_many(self, keys, version=None, client=None):
+        if client is not None or not self._l1_ready():
+            return super().get_many(keys, version=version, client=client)
+
+        found = {}
+        missing = []
+        for key in keys:
+            value = self.l1.get(self._l1_key(key, version))
+            if value is _MISSING:
+                missing.append(key)
+            else:
+                found[key] = value
+
+        if missing:
+            fetched = super().get_many(missing, version=version)
+            for key, value in fetched.items():
+                self.l1.set(self._l1_key(key, version), value)
+            found.update(fetched)
+
+        return OrderedDict((key, found[key]) for key in keys if key in found)
+
+    def set(self, key, value, timeout=DEFAULT_TIMEOUT, version=None, client=None, nx=False, xx=False):
+        result = super().set(key, value, timeout, version=version, client=client, nx=nx, xx=xx)
+        self._invalidate([self._l1_key(key, version)])
+        return result
+
+    def add(self, key, value, timeout=DEFAULT_TIMEOUT, version=None, client=None):
+        result = super().add(key, value, timeout, version=version, client=client)
+        if result:
+            self._invalidate([self._l1_key(key, version)])
+        return result
+
+    def set_many(self, data, timeout=DEFAULT_TIMEOUT, version=None, client=None):
+        result = super().set_many(data, timeout, version=version, client=client)
+        self._invalidate([self._l1_key(key, version) for key in data])
+        return result
+
+    def delete(self, key, version=None, prefix=None, client=None):
+        result = super().delete(key, version=version, prefix=prefix, client=client)
+        self._invalidate([str(self.client.make_key(key, version=version, prefix=prefix))])
+        return result
+
+    def delete_many(self, keys, version=None, client=None):
+        keys = list(keys)
+        result = super().delete_many(keys, version=version, client=client)
+        self._invalidate([self._l1_key(key, version) for key in keys])
+        return result
+
+    def incr(self, key, delta=1, version=None, client=None, ignore_key_check=False):
+        result = super().incr(
+            key, delta=delta, version=version, client=client, ignore_key_check=ignore_key_check,
+        )
+        self._invalidate([self._l1_key(key, version)])
+        return result
+
+    def decr(self, key, delta=1, version=None, client=None):
+        result = super().decr(key, delta=delta, version=version, client=client)
+        self._invalidate([self._l1_key(key, version)])
+        return result
+
+    def delete_pattern(self, *args, **kwargs):
+        result = super().delete_pattern(*args, **kwargs)
+        self._invalidate_all()
+        return result
+
+    def clear(self):
+        result = super().clear()
+        self._invalidate_all()
+        return result
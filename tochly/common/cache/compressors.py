@@ -0,0 +1,22 @@
+from lz4.frame import compress, decompress
+from django_redis.compressors.base import BaseCompressor
+from django_redis.exceptions import CompressorError
+
+
+class Lz4Compressor(BaseCompressor):
+    """LZ4 frame compression for values larger than ``COMPRESS_MIN_LENGTH`` bytes."""
+
+    def __init__(self, options):
+        super().__init__(options)
+        self.min_length = options.get('COMPRESS_MIN_LENGTH', 256)
+
+    def compress(self, value):
+        if len(value) > self.min_length:
+            return compress(value)
+        return value
+
+    def decompress(self, value):
+        try:
+            return decompress(value)
+        except Exception as e:
+            raise CompressorError from e
@@ -0,0 +1,58 @@
+import hashlib
+
+from django.core.cache import cache
+from django.db import models
+from rest_framework import serializers
+
+
+class FragmentCacheListSerializer(serializers.ListSerializer):
+    """
+    Assembles a list from per-row fragments fetched with one multi-get.
+
+    Only the rows missing from the cache are serialized, and they are written
+    back in a single pipelined ``set_many``.
+    """
+
+    def to_representation(self, data):
+        iterable = data.all() if isinstance(data, models.manager.BaseManager) else data
+        items = list(iterable)
+        if not self.child.use_fragment_cache():
+            return [self.child.to_representation(item) for item in items]
+        keys = [self.child.get_fragment_key(item) for item in items]
+        cached = cache.get_many(keys) if keys else {}
+
+        result = []
+        misses = {}
+        for key, item in zip(keys, items):
+            if key in cached:
+                result.append(cached[key])
+            else:
+                misses[key] = self.child.to_representation(item)
+                result.append(misses[key])
+
+        if misses:
+            cache.set_many(misses, timeout=self.child.fragment_cache_timeout)
+        return result
+
+
+class FragmentCacheMixin:
+    """
+    Caches the representation of each row when serializing with ``many=True``;
+    pair it with ``list_serializer_class = FragmentCacheListSerializer``.
+
+    Fragments are keyed by pk and ``get_fragment_version()``, which must
+    change whenever any value in the representation changes; by default it
+    is the ``updated`` timestamp of the instance.
+    """
+
+    fragment_cache_timeout = 60 * 60
+
+    def use_fragment_cache(self):
+        return True
+
+    def get_fragment_version(self, instance):
+        return instance.updated.isoformat()
+
+    def get_fragment_key(self, instance):
+        version = hashlib.sha1(repr(self.get_fragment_version(instance)).encode()).hexdigest()
+        return f'fragment:{type(self).__name__}:{instance.pk}:{version}'
@@ -0,0 +1,24 @@
+from rest_framework.response import Response
+
+from common.cache.querysets import cached_queryset, DEFAULT_TIMEOUT
+
+
+class CachedQuerysetMixin:
+    """Serves ``list()`` from the queryset cache, invalidated by model signals."""
+
+    queryset_cache_timeout = DEFAULT_TIMEOUT
+
+    def get_queryset_cache_scopes(self):
+        return None
+
+    def cache_queryset(self, queryset):
+        return cached_queryset(
+            queryset,
+            scopes=self.get_queryset_cache_scopes(),
+            timeout=self.queryset_cache_timeout,
+        )
+
+    def list(self, request, *args, **kwargs):
+        queryset = self.cache_queryset(self.filter_queryset(self.get_queryset()))
+        serializer = self.get_serializer(queryset, many=True)
+        return Response(serializer.data)
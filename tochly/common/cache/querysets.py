@@ -0,0 +1,138 @@
+"""
+Queryset result cache invalidated through per-table version counters.
+
+Entries are keyed by the SQL signature of the queryset plus the current
+version of every tracked table it reads. Saving or deleting a tracked model
+bumps its table version (and the versions of the scopes it belongs to, e.g.
+one team), so stale entries are simply never looked up again and age out of
+Redis on their own.
+
+Versions are the time of the last change, which also tells whether read
+replicas may still be behind: results are computed on the primary for
+``REPLICA_LAG_WINDOW`` seconds after a change, so a lagging replica can't
+cache old rows under the new version.
+"""
+import hashlib
+import time
+from functools import partial
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db import connections, router, transaction
+from django.db.models.signals import post_save, post_delete
+
+from common.cache.stampede import get_or_compute
+
+DEFAULT_TIMEOUT = 300
+
+_tracked = {}
+
+
+def track(model, scopes=()):
+    """Invalidate cached querysets whenever an instance of ``model`` changes."""
+    _tracked[model._meta.db_table] = tuple(scopes)
+    uid = f'queryset-cache:{model._meta.label}'
+    post_save.connect(_on_change, sender=model, weak=False, dispatch_uid=uid)
+    post_delete.connect(_on_change, sender=model, weak=False, dispatch_uid=uid)
+
+
+def _on_change(sender, instance, **kwargs):
+    scopes = {field: getattr(instance, field) for field in _tracked[sender._meta.db_table]}
+    invalidate(sender, **scopes)
+
+
+def version_key(table, field=None, value=None):
+    if field is None:
+        return f'qs:version:{table}'
+    return f'qs:version:{table}:{field}:{value}'
+
+
+def _scope_keys(table, scopes):
+    """Version keys of ``scopes``, where a list, tuple or set of values names one scope per value."""
+    keys = []
+    for field, value in sorted(scopes.items()):
+        values = sorted(set(value)) if isinstance(value, (list, tuple, set, frozenset)) else [value]
+        keys += [version_key(table, field, v) for v in values]
+    return keys
+
+
+def _bump(keys):
+    # a time based version can't collide with an evicted one
+    cache.set_many({key: time.time_ns() for key in keys}, timeout=None)
+
+
+def invalidate(model, **scopes):
+    """
+    Bump the table version of ``model`` and of each given scope.
+
+    Use this after writes that bypass model signals, such as
+    ``QuerySet.update()``. The bump is repeated on commit so that a reader
+    racing the open transaction can't cache pre-commit rows under the new
+    version.
+    """
+    table = model._meta.db_table
+    keys = [version_key(table)] + _scope_keys(table, scopes)
+    _bump(keys)
+    transaction.on_commit(partial(_bump, keys))
+
+
+def get_versions(keys):
+    versions = cache.get_many(keys)
+    for key in keys:
+        if key not in versions:
+            version = time.time_ns()
+            if not cache.add(key, version, timeout=None):
+                version = cache.get(key, version)
+            versions[key] = version
+    return versions
+
+
+def recently_changed(versions):
+    """Whether any of ``versions`` is recent enough that replicas may not have the change yet."""
+    lag = settings.REPLICA_LAG_WINDOW * 1_000_000_000
+    return bool(versions) and time.time_ns() - max(versions) < lag
+
+
+def _key_and_versions(queryset, scopes, covered=()):
+    scopes = {model._meta.db_table: fields for model, fields in (scopes or {}).items()}
+    covered = {model._meta.db_table for model in covered}
+    # replicas hold the primary's data, so they share its entries
+    using = router.db_for_write(queryset.model)
+    sql, params = queryset.query.sql_with_params()
+    quote_name = connections[using].ops.quote_name
+
+    version_keys = []
+    for table in sorted(_tracked):
+        if table in covered or quote_name(table) not in sql:
+            continue
+        if table in scopes:
+            version_keys += _scope_keys(table, scopes[table])
+        else:
+            version_keys.append(version_key(table))
+
+    found = get_versions(version_keys)
+    versions = [found[key] for key in version_keys]
+    signature = repr((using, sql, params, versions))
+    digest = hashlib.sha1(signature.encode()).hexdigest()
+    return f'qs:{queryset.model._meta.label_lower}:{digest}', versions
+
+
+def queryset_key(queryset, scopes=None, covered=()):
+    """
+    Build the cache key of ``queryset`` from its SQL and the versions of the
+    tracked tables it references. ``scopes`` maps a model to field lookups,
+    e.g. ``{Member: {'team_id': 1}}``, narrowing invalidation for that table
+    to changes within the scope. A list of values, e.g.
+    ``{Team: {'id': [1, 2]}}``, narrows it to changes within any of them.
+    ``covered`` lists models left out of the key because their changes
+    already bump one of the scopes, e.g. the users of a team's members.
+    """
+    return _key_and_versions(queryset, scopes, covered)[0]
+
+
+def cached_queryset(queryset, scopes=None, covered=(), timeout=DEFAULT_TIMEOUT):
+    """Return the evaluated ``queryset`` as a list, served from cache when fresh."""
+    key, versions = _key_and_versions(queryset, scopes, covered)
+    if recently_changed(versions):
+        queryset = queryset.using(router.db_for_write(queryset.model))
+    return get_or_compute(key, lambda: list(queryset.all()), timeout=timeout)
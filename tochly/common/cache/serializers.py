@@ -0,0 +1,86 @@
+import pickle
+import uuid
+from datetime import date, datetime, time, timedelta
+from decimal import Decimal
+
+import msgpack
+from django_redis.serializers.base import BaseSerializer
+
+EXT_TUPLE = 1
+EXT_DATETIME = 2
+EXT_DATE = 3
+EXT_TIME = 4
+EXT_TIMEDELTA = 5
+EXT_DECIMAL = 6
+EXT_UUID = 7
+EXT_PICKLE = 127
+
+
+def _default(obj):
+    # strict_types hands us subclasses too; plain containers stay msgpack native
+    if isinstance(obj, str):
+        return str(obj)
+    if isinstance(obj, dict):
+        return dict(obj)
+    if isinstance(obj, list):
+        return list(obj)
+    if type(obj) is tuple:
+        return msgpack.ExtType(EXT_TUPLE, _packb(list(obj)))
+    if type(obj) is datetime:
+        return msgpack.ExtType(EXT_DATETIME, obj.isoformat().encode())
+    if type(obj) is date:
+        return msgpack.ExtType(EXT_DATE, obj.isoformat().encode())
+    if type(obj) is time:
+        return msgpack.ExtType(EXT_TIME, obj.isoformat().encode())
+    if type(obj) is timedelta:
+        return msgpack.ExtType(EXT_TIMEDELTA, _packb([obj.days, obj.seconds, obj.microseconds]))
+    if type(obj) is Decimal:
+        return msgpack.ExtType(EXT_DECIMAL, str(obj).encode())
+    if type(obj) is uuid.UUID:
+        return msgpack.ExtType(EXT_UUID, obj.bytes)
+    # model instances and anything else msgpack can't describe
+    return msgpack.ExtType(EXT_PICKLE, pickle.dumps(obj, pickle.HIGHEST_PROTOCOL))
+
+
+def _ext_hook(code, data):
+    if code == EXT_TUPLE:
+        return tuple(_unpackb(data))
+    if code == EXT_DATETIME:
+        return datetime.fromisoformat(data.decode())
+    if code == EXT_DATE:
+        return date.fromisoformat(data.decode())
+    if code == EXT_TIME:
+        return time.fromisoformat(data.decode())
+    if code == EXT_TIMEDELTA:
+        return timedelta(*_unpackb(data))
+    if code == EXT_DECIMAL:
+        return Decimal(data.decode())
+    if code == EXT_UUID:
+        return uuid.UUID(bytes=data)
+    if code == EXT_PICKLE:
+        return pickle.loads(data)
+    return msgpack.ExtType(code, data)
+
+
+def _packb(value):
+    return msgpack.packb(value, default=_default, strict_types=True, use_bin_type=True)
+
+
+def _unpackb(value):
+    return msgpack.unpackb(value, ext_hook=_ext_hook, raw=False, strict_map_key=False)
+
+
+class MsgpackSerializer(BaseSerializer):
+    """
+    Compact msgpack cache serializer.
+
+    Common value types round-trip through msgpack extension types; dict, list
+    and str subclasses come back as their plain base types, and anything else
+    falls back to an embedded pickle.
+    """
+
+    def dumps(self, value):
+        return _packb(value)
+
+    def loads(self, value):
+        return _unpackb(value)
@@ -0,0 +1,86 @@
+"""
+Stampede protected cache reads.
+
+Values are stored in an envelope with a soft expiry. Past the soft expiry
+the entry is still served (stale-while-revalidate) while exactly one worker,
+holding a Redis lock, recomputes it. Before the soft expiry a worker may
+start that refresh early with a probability that grows as expiry nears and
+with the cost of the last computation (XFetch), so hot keys rarely expire
+at all. On a hard miss only the lock holder computes; others wait for it.
+"""
+import math
+import random
+import time
+
+from django.core.cache import cache
+from redis.exceptions import LockError
+
+POLL_INTERVAL = 0.05
+
+
+def _should_refresh(entry, beta):
+    if beta <= 0:
+        return time.time() >= entry['expires']
+    jitter = entry['delta'] * beta * -math.log(1.0 - random.random())
+    return time.time() + jitter >= entry['expires']
+
+
+def _compute_and_store(key, compute, timeout, stale_timeout):
+    started = time.time()
+    value = compute()
+    finished = time.time()
+    entry = {
+        'value': value,
+        'expires': finished + timeout,
+        'delta': finished - started,
+    }
+    cache.set(key, entry, timeout=timeout + stale_timeout)
+    return value
+
+
+def _release(lock):
+    try:
+        lock.release()
+    except LockError:
+        # the lock expired while computing; someone else may own it now
+        pass
+
+
+def get_or_compute(key, compute, timeout=300, stale_timeout=60, beta=1.0, lock_timeout=10):
+    """
+    Return the cached value of ``key``, calling ``compute()`` at most once
+    across the cluster when it is missing or due for a refresh.
+
+    ``stale_timeout`` is how long past ``timeout`` a stale value may still be
+    served while it is being refreshed, ``beta`` scales early refreshes
+    (0 disables them) and ``lock_timeout`` bounds how long a computation may
+    hold the lock and how long other workers wait for it.
+    """
+    entry = cache.get(key)
+    if entry is not None and not _should_refresh(entry, beta):
+        return entry['value']
+
+    lock = cache.lock(f'{key}:lock', timeout=lock_timeout)
+    if lock.acquire(blocking=False):
+        try:
+            # another worker may have refreshed it between our read and the lock
+            current = cache.get(key)
+            refreshed = current is not None and (entry is None or current['expires'] != entry['expires'])
+            if refreshed and time.time() < current['expires']:
+                return current['value']
+            return _compute_and_store(key, compute, timeout, stale_timeout)
+        finally:
+            _release(lock)
+
+    if entry is not None:
+        return entry['value']
+
+    deadline = time.time() + lock_timeout
+    while time.time() < deadline:
+        time.sleep(POLL_INTERVAL)
+        entry = cache.get(key)
+        if entry is not None:
+            return entry['value']
+
+    # the lock holder died or is too slow; don't fail the caller
+    return _compute_and_store(key, compute, timeout, stale_timeout)
@@ -0,0 +1,28 @@
+from django.db.backends.postgresql import base
+from django.db.backends.postgresql.psycopg_any import IsolationLevel
+
+from common.db.backends.postgresql_pool.creation import DatabaseCreation
+from common.db.pool import get_pool
+
+
+class DatabaseWrapper(base.DatabaseWrapper):
+    """PostgreSQL backend that borrows connections from ``common.db.pool``."""
+
+    creation_class = DatabaseCreation
+
+    @property
+    def pool(self):
+        return get_pool(self.alias, self.get_connection_params(), self.settings_dict.get('POOL', {}))
+
+    def get_new_connection(self, conn_params):
+        connection = self.pool.checkout(lambda: super(DatabaseWrapper, self).get_new_connection(conn_params))
+        # the parent sets this while connecting, pooled connections need it too
+        self.isolation_level = IsolationLevel(
+            self.settings_dict['OPTIONS'].get('isolation_level', IsolationLevel.READ_COMMITTED)
+        )
+        return connection
+
+    def _close(self):
+        if self.connection is not None:
+            with self.wrap_database_errors:
+                self.pool.checkin(self.connection)
@@ -0,0 +1,11 @@
+from django.db.backends.postgresql import creation
+
+from common.db.pool import all_pools
+
+
+class DatabaseCreation(creation.DatabaseCreation):
+    def _destroy_test_db(self, test_database_name, verbosity):
+        # idle pooled connections would otherwise keep the database in use
+        for pool in all_pools():
+            pool.close_all()
+        super()._destroy_test_db(test_database_name, verbosity)
@@ -0,0 +1,48 @@
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction
+
+from common.db.routers import apin_to_primary, pin_to_primary
+
+SAFE_METHODS = ('GET', 'HEAD', 'OPTIONS')
+
+
+def skip_primary_pin(request):
+    """Leave the user unpinned, for writes that don't reach the database right away."""
+    getattr(request, '_request', request).skip_primary_pin = True
+
+
+def _writer_id(request):
+    if getattr(request, 'skip_primary_pin', False):
+        return None
+    # DRF copies the user it authenticated onto the Django request
+    user = getattr(request, 'user', None)
+    if request.method not in SAFE_METHODS and user is not None and user.is_authenticated:
+        return user.id
+    return None
+
+
+class PrimaryPinMiddleware:
+    """Keeps users who just wrote on the primary until replicas catch up."""
+
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        if iscoroutinefunction(get_response):
+            markcoroutinefunction(self)
+
+    def __call__(self, request):
+        if iscoroutinefunction(self):
+            return self.__acall__(request)
+        response = self.get_response(request)
+        user_id = _writer_id(request)
+        if user_id is not None:
+            pin_to_primary(user_id)
+        return response
+
+    async def __acall__(self, request):
+        response = await self.get_response(request)
+        user_id = _writer_id(request)
+        if user_id is not None:
+            await apin_to_primary(user_id)
+        return response
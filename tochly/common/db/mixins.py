@@ -0,0 +1,21 @@
+from rest_framework.permissions import SAFE_METHODS
+
+from common.db.routers import is_pinned, start_replica_reads, stop_replica_reads
+
+
+class ReplicaReadMixin:
+    """Serves safe requests from a read replica unless the user wrote recently."""
+
+    _replica_reads_token = None
+
+    def initial(self, request, *args, **kwargs):
+        super().initial(request, *args, **kwargs)
+        pinned = request.user.is_authenticated and is_pinned(request.user.id)
+        if request.method in SAFE_METHODS and not pinned:
+            self._replica_reads_token = start_replica_reads()
+
+    def finalize_response(self, request, response, *args, **kwargs):
+        if self._replica_reads_token is not None:
+            stop_replica_reads(self._replica_reads_token)
+            self._replica_reads_token = None
+        return super().finalize_response(request, response, *args, **kwargs)
@@ -0,0 +1,217 @@
+"""
+Per-process PostgreSQL connection pool.
+
+Django connections are per thread. In ``DB_POOL_MODE=pool`` the backend in
+``common.db.backends.postgresql_pool`` borrows the raw psycopg2 connection
+from here on connect and hands it back on close, so threaded workers share
+a bounded set of server connections instead of opening one per request.
+
+Connections are health checked when they have been idle for a while and
+are retired once they exceed their maximum lifetime. Every pool keeps
+checkout metrics, which are published to the cache so ``db_pool_stats``
+can show them for all processes.
+"""
+import logging
+import os
+import socket
+import threading
+import time
+from collections import deque
+
+from django.core.cache import cache
+from django.db.utils import OperationalError
+from psycopg2.extensions import TRANSACTION_STATUS_IDLE
+
+logger = logging.getLogger(__name__)
+
+STATS_KEY_PREFIX = 'dbpool'
+STATS_INTERVAL = 10
+
+_pools = {}
+_pools_lock = threading.Lock()
+
+
+class PoolTimeout(OperationalError):
+    pass
+
+
+class ConnectionPool:
+    def __init__(self, name, max_size=10, max_lifetime=1800, checkout_timeout=10, health_check_interval=30):
+        self.name = name
+        self.max_size = max_size
+        self.max_lifetime = max_lifetime
+        self.checkout_timeout = checkout_timeout
+        self.health_check_interval = health_check_interval
+
+        self._idle = deque()
+        self._born = {}
+        # slots claimed by threads that are still connecting
+        self._opening = 0
+        self._condition = threading.Condition()
+        self._stats = {
+            'checkouts': 0,
+            'created': 0,
+            'retired': 0,
+            'failed_health_checks': 0,
+            'timeouts': 0,
+            'wait_total': 0.0,
+            'wait_max': 0.0,
+            'waiting': 0,
+        }
+        self._reported_at = 0.0
+
+    @property
+    def size(self):
+        return len(self._born) + self._opening
+
+    def checkout(self, connect):
+        """Return an idle connection, open one with ``connect()`` or wait for one."""
+        started = time.monotonic()
+        deadline = started + self.checkout_timeout
+        with self._condition:
+            self._stats['waiting'] += 1
+            try:
+                while True:
+                    connection = self._take_idle()
+                    if connection is not None:
+                        break
+                    if self.size < self.max_size:
+                        # claim the slot, connecting happens outside the lock
+                        self._opening += 1
+                        break
+                    remaining = deadline - time.monotonic()
+                    if remaining <= 0:
+                        self._stats['timeouts'] += 1
+                        raise PoolTimeout(
+                            f'No database connection available in pool {self.name} '
+                            f'after {self.checkout_timeout}s ({self.max_size} in use).'
+                        )
+                    self._condition.wait(remaining)
+            finally:
+                self._stats['waiting'] -= 1
+
+        if connection is None:
+            connection = self._open(connect)
+
+        waited = time.monotonic() - started
+        with self._condition:
+            self._stats['checkouts'] += 1
+            self._stats['wait_total'] += waited
+            self._stats['wait_max'] = max(self._stats['wait_max'], waited)
+        self._maybe_report()
+        return connection
+
+    def checkin(self, connection):
+        """Return ``connection`` to the pool, closing it if it is broken or too old."""
+        reusable = not connection.closed and not self._expired(connection)
+        if reusable and connection.get_transaction_status() != TRANSACTION_STATUS_IDLE:
+            try:
+                connection.rollback()
+            except Exception:
+                reusable = False
+
+        with self._condition:
+            if reusable:
+                self._idle.append((connection, time.monotonic()))
+            else:
+                self._discard(connection)
+                self._stats['retired'] += 1
+            self._condition.notify()
+
+    def close_all(self):
+        with self._condition:
+            while self._idle:
+                connection, _ = self._idle.popleft()
+                self._discard(connection)
+            self._condition.notify_all()
+
+    def stats(self):
+        with self._condition:
+            stats = dict(self._stats)
+            stats['size'] = self.size
+            stats['idle'] = len(self._idle)
+        stats['active'] = stats['size'] - stats['idle']
+        stats['wait_avg'] = stats['wait_total'] / stats['checkouts'] if stats['checkouts'] else 0.0
+        return stats
+
+    def _open(self, connect):
+        try:
+            connection = connect()
+        except Exception:
+            with self._condition:
+                self._opening -= 1
+                self._condition.notify()
+            raise
+        with self._condition:
+            self._opening -= 1
+            self._born[connection] = time.monotonic()
+            self._stats['created'] += 1
+        return connection
+
+    def _take_idle(self):
+        while self._idle:
+            connection, returned_at = self._idle.pop()
+            if connection.closed or self._expired(connection):
+                self._discard(connection)
+                self._stats['retired'] += 1
+                continue
+            if time.monotonic() - returned_at >= self.health_check_interval and not self._healthy(connection):
+                self._discard(connection)
+                self._stats['failed_health_checks'] += 1
+                continue
+            return connection
+        return None
+
+    def _expired(self, connection):
+        born = self._born.get(connection)
+        return born is not None and time.monotonic() - born >= self.max_lifetime
+
+    def _healthy(self, connection):
+        try:
+            with connection.cursor() as cursor:
+                cursor.execute('SELECT 1')
+            if connection.get_transaction_status() != TRANSACTION_STATUS_IDLE:
+                connection.rollback()
+            return True
+        except Exception:
+            return False
+
+    def _discard(self, connection):
+        self._born.pop(connection, None)
+        try:
+            connection.close()
+        except Exception:
+            pass
+
+    def _maybe_report(self):
+        now = time.monotonic()
+        if now - self._reported_at < STATS_INTERVAL:
+            return
+        self._reported_at = now
+        try:
+            cache.set(
+                f'{STATS_KEY_PREFIX}:{socket.gethostname()}:{os.getpid()}:{self.name}',
+                self.stats(),
+                timeout=STATS_INTERVAL * 6,
+            )
+        except Exception:
+            logger.debug('Could not publish pool stats', exc_info=True)
+
+
+def get_pool(alias, conn_params, options):
+    """Return this process's pool for ``alias`` and its connection parameters."""
+    key = (os.getpid(), alias, tuple(sorted((name, str(value)) for name, value in conn_params.items())))
+    pool = _pools.get(key)
+    if pool is None:
+        with _pools_lock:
+            pool = _pools.get(key)
+            if pool is None:
+                # a forked child must never reuse sockets owned by its parent
+                for stale in [k for k in _pools if k[0] != os.getpid()]:
+                    del _pools[stale]
+                pool = _pools[key] = ConnectionPool(alias, **options)
+    return pool
+
+
+def all_pools():
+    return [pool for key, pool in _pools.items() if key[0] == os.getpid()]
@@ -0,0 +1,81 @@
+"""
+Read replica routing.
+
+Reads only go to a replica inside ``replica_reads()``, which views enter
+through ``ReplicaReadMixin`` for safe requests. Everything else, including
+every write, uses the primary. After a user writes, ``PrimaryPinMiddleware``
+pins them to the primary for ``REPLICA_LAG_WINDOW`` seconds so they always
+read their own writes.
+"""
+import random
+from contextlib import contextmanager
+from contextvars import ContextVar
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db import DEFAULT_DB_ALIAS
+
+_replica_reads = ContextVar('replica_reads', default=False)
+
+
+def start_replica_reads():
+    """Route reads in the current context to replicas, returns a token for ``stop_replica_reads``."""
+    return _replica_reads.set(True)
+
+
+def stop_replica_reads(token):
+    _replica_reads.reset(token)
+
+
+@contextmanager
+def replica_reads():
+    token = start_replica_reads()
+    try:
+        yield
+    finally:
+        stop_replica_reads(token)
+
+
+@contextmanager
+def primary_reads():
+    """Route reads to the primary again, e.g. within ``replica_reads()``."""
+    token = _replica_reads.set(False)
+    try:
+        yield
+    finally:
+        _replica_reads.reset(token)
+
+
+def pin_key(user_id):
+    return f'db:primary:{user_id}'
+
+
+def pin_to_primary(user_id):
+    if settings.DATABASE_REPLICAS:
+        cache.set(pin_key(user_id), 1, timeout=settings.REPLICA_LAG_WINDOW)
+
+
+async def apin_to_primary(user_id):
+    if settings.DATABASE_REPLICAS:
+        await cache.aset(pin_key(user_id), 1, timeout=settings.REPLICA_LAG_WINDOW)
+
+
+def is_pinned(user_id):
+    return bool(settings.DATABASE_REPLICAS) and cache.get(pin_key(user_id)) is not None
+
+
+class ReplicaRouter:
+    def db_for_read(self, model, **hints):
+        if _replica_reads.get() and settings.DATABASE_REPLICAS:
+            return random.choice(settings.DATABASE_REPLICAS)
+        return None
+
+    def db_for_write(self, model, **hints):
+        # instances loaded from a replica must still be saved to the primary
+        return DEFAULT_DB_ALIAS
+
+    def allow_relation(self, obj1, obj2, **hints):
+        return True
+
+    def allow_migrate(self, db, app_label, model_name=None, **hints):
+        return db not in settings.DATABASE_REPLICAS
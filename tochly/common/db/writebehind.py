@@ -0,0 +1,106 @@
+"""
+Write-behind buffering of frequently updated fields.
+
+``WriteBehindBuffer.update()`` records field values for a row in a Redis
+hash instead of writing them to the database, so the latest value of each
+field wins and repeated updates of a row collapse into one. ``flush()``,
+run periodically, writes everything buffered with one ``bulk_update`` per
+set of changed fields. Like ``save(update_fields=...)`` only the buffered
+fields are written; model signals are not sent, pass ``on_flush`` to react
+to the flushed rows instead.
+
+With a ``touch`` field the last writer wins across both paths: a row saved
+directly after an update was buffered keeps the values of that save.
+"""
+from django.core.cache import cache
+from django.db.models import Case, F, Value, When
+from django.utils import timezone
+
+
+class WriteBehindBuffer:
+    def __init__(self, model, fields, touch=None, on_flush=None, batch_size=1000):
+        """
+        ``touch`` names a timestamp field set to the time of the last
+        buffered update, e.g. an ``auto_now`` field ``bulk_update`` would
+        otherwise leave alone.
+        """
+        self.model = model
+        self.fields = tuple(fields)
+        self.touch = touch
+        self.on_flush = on_flush
+        self.batch_size = batch_size
+        self.prefix = f'writebehind:{model._meta.label_lower}'
+
+    def _key(self, suffix):
+        return cache.client.make_key(f'{self.prefix}:{suffix}')
+
+    def update(self, pk, **values):
+        unknown = set(values) - set(self.fields)
+        if unknown:
+            raise ValueError(f'{self.model.__name__} does not buffer {", ".join(sorted(unknown))}')
+        if self.touch:
+            values[self.touch] = timezone.now()
+
+        pipeline = cache.client.get_client(write=True).pipeline()
+        pipeline.hset(self._key(pk), mapping={field: cache.client.encode(value) for field, value in values.items()})
+        pipeline.sadd(self._key('dirty'), pk)
+        pipeline.execute()
+
+    def flush(self):
+        """Write buffered updates to the database, returning the number of rows updated."""
+        client = cache.client.get_client(write=True)
+        flushed = 0
+        while True:
+            pks = [self.model._meta.pk.to_python(pk.decode()) for pk in client.spop(self._key('dirty'), self.batch_size)]
+            if not pks:
+                return flushed
+
+            # read and clear each row together, so no update lands in between
+            pipeline = client.pipeline()
+            for pk in pks:
+                pipeline.hgetall(self._key(pk))
+                pipeline.delete(self._key(pk))
+            results = pipeline.execute()[::2]
+            updates = {pk: self._decode(raw) for pk, raw in zip(pks, results) if raw}
+
+            try:
+                self._write(updates)
+            except Exception:
+                self._restore(updates)
+                raise
+            flushed += len(updates)
+            if self.on_flush and updates:
+                self.on_flush(list(updates))
+
+    def _decode(self, raw):
+        return {field.decode(): cache.client.decode(value) for field, value in raw.items()}
+
+    def _write(self, updates):
+        by_fields = {}
+        for pk, values in updates.items():
+            fields = tuple(sorted(values))
+            if self.touch:
+                values = self._unless_newer(values)
+            by_fields.setdefault(fields, []).append(self.model(pk=pk, **values))
+        for fields, objs in by_fields.items():
+            self.model.objects.bulk_update(objs, fields, batch_size=self.batch_size)
+
+    def _unless_newer(self, values):
+        # written by the same UPDATE, so a save racing the flush can't slip in between
+        newer = {f'{self.touch}__gte': values[self.touch]}
+        return {
+            field: Case(
+                When(**newer, then=F(field)),
+                default=Value(value, output_field=self.model._meta.get_field(field)),
+            )
+            for field, value in values.items()
+        }
+
+    def _restore(self, updates):
+        # values buffered since the pop are newer, keep them
+        pipeline = cache.client.get_client(write=True).pipeline()
+        for pk, values in updates.items():
+            for field, value in values.items():
+                pipeline.hsetnx(self._key(pk), field, cache.client.encode(value))
+            pipeline.sadd(self._key('dirty'), pk)
+        pipeline.execute()
@@ -0,0 +1,43 @@
+"""
+MessagePack next to JSON for the views of a URLconf.
+
+``offer_msgpack(urlpatterns)`` adds ``MessagePackRenderer`` and
+``MessagePackParser`` after the view's renderers and parsers, so clients
+opt in with ``Accept: application/msgpack`` (or ``?format=msgpack``) and
+``Content-Type: application/msgpack``; everyone else keeps getting JSON.
+Views that set their own renderers or parsers keep them and gain msgpack.
+"""
+from django.urls import URLPattern, URLResolver
+from rest_framework.views import APIView
+from rest_framework.viewsets import ViewSetMixin
+
+from common.rest.parsers import MessagePackParser
+from common.rest.renderers import MessagePackRenderer
+
+
+def offer_msgpack(urlpatterns):
+    return [_offer_msgpack(pattern) for pattern in urlpatterns]
+
+
+def _offer_msgpack(pattern):
+    if isinstance(pattern, URLResolver):
+        return URLResolver(
+            pattern.pattern, offer_msgpack(pattern.url_patterns), pattern.default_kwargs,
+            pattern.app_name, pattern.namespace,
+        )
+
+    cls = getattr(pattern.callback, 'cls', None)
+    if cls is None or not issubclass(cls, APIView):
+        return pattern
+
+    initkwargs = pattern.callback.initkwargs
+    initkwargs = {
+        **initkwargs,
+        'renderer_classes': [*initkwargs.get('renderer_classes', cls.renderer_classes), MessagePackRenderer],
+        'parser_classes': [*initkwargs.get('parser_classes', cls.parser_classes), MessagePackParser],
+    }
+    if issubclass(cls, ViewSetMixin):
+        callback = cls.as_view(pattern.callback.actions, **initkwargs)
+    else:
+        callback = cls.as_view(**initkwargs)
+    return URLPattern(pattern.pattern, callback, pattern.default_args, pattern.name)
@@ -0,0 +1,42 @@
+import codecs
+import io
+import re
+
+import msgpack
+import orjson
+from django.conf import settings
+from rest_framework.exceptions import ParseError
+from rest_framework.parsers import BaseParser, JSONParser
+
+from common.rest.renderers import MessagePackRenderer
+
+# orjson turns integers wider than 64 bits into floats, leave those bodies to the stdlib
+LONG_NUMBER_RE = re.compile(rb'\d{19}')
+
+
+class ORJSONParser(JSONParser):
+    """``JSONParser`` on orjson; bodies orjson can't parse like DRF are left to DRF, errors included."""
+
+    def parse(self, stream, media_type=None, parser_context=None):
+        encoding = (parser_context or {}).get('encoding', settings.DEFAULT_CHARSET)
+        if codecs.lookup(encoding).name != 'utf-8':
+            return super().parse(stream, media_type, parser_context)
+
+        body = stream.read()
+        if not LONG_NUMBER_RE.search(body):
+            try:
+                return orjson.loads(body)
+            except orjson.JSONDecodeError:
+                pass
+        return super().parse(io.BytesIO(body), media_type, parser_context)
+
+
+class MessagePackParser(BaseParser):
+    media_type = 'application/msgpack'
+    renderer_class = MessagePackRenderer
+
+    def parse(self, stream, media_type=None, parser_context=None):
+        try:
+            return msgpack.unpackb(stream.read(), raw=False)
+        except (ValueError, TypeError) as exc:
+            raise ParseError(f'MessagePack parse error - {exc}')
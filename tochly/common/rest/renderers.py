@@ -0,0 +1,87 @@
+import msgpack
+import orjson
+from rest_framework.renderers import BaseRenderer, JSONRenderer
+from rest_framework.utils.encoders import JSONEncoder
+
+# datetimes go through DRF's encoder, orjson would render +00:00 instead of Z
+ORJSON_OPTIONS = orjson.OPT_PASSTHROUGH_DATETIME | orjson.OPT_PASSTHROUGH_DATACLASS | orjson.OPT_NON_STR_KEYS
+
+
+def _float_differs(value):
+    # outside this range json writes exponents like 1e+16 and 1.5e-07, orjson
+    # 1e16 and 1.5e-7; orjson writes NaN and infinities as null, DRF raises
+    return not (value == 0 or 1e-4 <= abs(value) < 1e16)
+
+
+def _has_differing_float(data):
+    stack = [data]
+    while stack:
+        container = stack.pop()
+        for value in container.values() if isinstance(container, dict) else container:
+            kind = type(value)
+            if kind is str or kind is int or kind is bool or value is None:
+                continue
+            if isinstance(value, float):
+                if _float_differs(value):
+                    return True
+            elif isinstance(value, (dict, list, tuple)):
+                stack.append(value)
+    return False
+
+
+class ORJSONRenderer(JSONRenderer):
+    """
+    ``JSONRenderer`` on orjson, with byte-identical output.
+
+    Types orjson doesn't render the way DRF does are handed to DRF's own
+    encoder. Indented, non-compact and ASCII-only output, floats orjson
+    writes differently (exponents, NaN and infinities), and data orjson
+    can't encode fall back to the stdlib encoder.
+    """
+
+    encoder = JSONEncoder()
+
+    def default(self, obj):
+        value = self.encoder.default(obj)
+        # e.g. decimals become floats when COERCE_DECIMAL_TO_STRING is off
+        if _has_differing_float([value]):
+            # orjson raises JSONEncodeError, and render() falls back
+            raise ValueError('float left to the stdlib encoder')
+        return value
+
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        indent = self.get_indent(accepted_media_type, renderer_context or {})
+        if (
+            data is None or indent is not None or not self.compact or self.ensure_ascii
+            or _has_differing_float([data])
+        ):
+            return super().render(data, accepted_media_type, renderer_context)
+
+        try:
+            ret = orjson.dumps(data, default=self.default, option=ORJSON_OPTIONS)
+        except orjson.JSONEncodeError:
+            # e.g. integers wider than 64 bits; anything DRF can't encode fails there too
+            return super().render(data, accepted_media_type, renderer_context)
+        # like DRF, escape the line separators JavaScript won't take in strings
+        if b'\xe2\x80\xa8' in ret or b'\xe2\x80\xa9' in ret:
+            ret = ret.replace(b'\xe2\x80\xa8', b'\\u2028').replace(b'\xe2\x80\xa9', b'\\u2029')
+        return ret
+
+
+class MessagePackRenderer(BaseRenderer):
+    """
+    Renders ``application/msgpack``. Values JSON has no type for are
+    rendered as the strings JSON gets from DRF's encoder, so both formats
+    carry the same data.
+    """
+
+    media_type = 'application/msgpack'
+    format = 'msgpack'
+    charset = None
+    render_style = 'binary'
+    encoder = JSONEncoder()
+
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        if data is None:
+            return b''
+        return msgpack.packb(data, default=self.encoder.default, use_bin_type=True, datetime=False)
@@ -0,0 +1,110 @@
+"""
+Sparse fieldsets: ``?fields=id,display_name`` returns only the listed fields,
+``?omit=profile,user`` returns everything but the listed ones.
+
+``SparseFieldsetsMixin`` drops the fields from the serializer, and
+``SparseFieldsetsViewMixin`` reads the parameters on safe requests and
+prunes the queryset to match, so omitted relations are not joined and
+omitted columns are not read. A serializer field that is not a model field
+of the same name lists the model paths it reads in ``Meta.field_sources``,
+e.g. ``{'full_name': ('user__first_name', 'user__last_name')}``; a path
+ending at a relation loads the whole related row. Queries for fields
+without a known source are left as they are.
+"""
+from django.core.exceptions import FieldDoesNotExist
+from rest_framework.permissions import SAFE_METHODS
+
+
+def parse_field_names(value):
+    return {name.strip() for name in value.split(',') if name.strip()}
+
+
+def select_fields(names, only=None, omit=()):
+    return [name for name in names if (only is None or name in only) and name not in omit]
+
+
+def _add_source(model, path, columns, joins):
+    parts = path.split('__')
+    for depth, part in enumerate(parts, start=1):
+        field = model._meta.get_field(part)
+        if not field.is_relation:
+            columns.add(path)
+            return
+        joins.add('__'.join(parts[:depth]))
+        model = field.related_model
+    # the path ends at a relation, read its whole row
+    columns.update(f'{path}__{field.name}' for field in model._meta.concrete_fields)
+
+
+def prune_queryset(queryset, serializer_class, names):
+    """Restrict ``queryset`` to the joins and columns needed to serialize the fields ``names``."""
+    model = queryset.model
+    sources = getattr(serializer_class.Meta, 'field_sources', {})
+    columns, joins = {model._meta.pk.name}, set()
+    for name in names:
+        if name in sources:
+            for path in sources[name]:
+                _add_source(model, path, columns, joins)
+            continue
+        try:
+            field = model._meta.get_field(name)
+        except FieldDoesNotExist:
+            return queryset
+        if not field.concrete or field.many_to_many:
+            return queryset
+        # foreign keys without a source are read as their id column
+        columns.add(name)
+    queryset = queryset.select_related(None)
+    if joins:
+        # without arguments select_related() would follow every foreign key
+        queryset = queryset.select_related(*sorted(joins))
+    return queryset.only(*sorted(columns))
+
+
+class SparseFieldsetsMixin:
+    """Drops the fields left out by the ``sparse_fields`` context, see ``SparseFieldsetsViewMixin``."""
+
+    @property
+    def sparse_fields(self):
+        return self.context.get('sparse_fields')
+
+    def get_fields(self):
+        fields = super().get_fields()
+        if self.sparse_fields is None:
+            return fields
+        return {name: fields[name] for name in select_fields(fields, **self.sparse_fields)}
+
+    def use_fragment_cache(self):
+        # fragments hold whole rows, and the pruned query may not load their version
+        return self.sparse_fields is None and super().use_fragment_cache()
+
+
+class SparseFieldsetsViewMixin:
+    """Applies ``?fields=`` and ``?omit=`` to the serializer and the queryset of safe requests."""
+
+    def get_sparse_fields(self):
+        if getattr(self, '_sparse_fields', False) is not False:
+            return self._sparse_fields
+        self._sparse_fields = None
+
+        params = self.request.query_params
+        if self.request.method in SAFE_METHODS and ('fields' in params or 'omit' in params):
+            self._sparse_fields = {
+                'only': parse_field_names(params['fields']) if 'fields' in params else None,
+                'omit': parse_field_names(params.get('omit', '')),
+            }
+        return self._sparse_fields
+
+    def get_serializer_context(self):
+        context = super().get_serializer_context()
+        context['sparse_fields'] = self.get_sparse_fields()
+        return context
+
+    def filter_queryset(self, queryset):
+        queryset = super().filter_queryset(queryset)
+        sparse_fields = self.get_sparse_fields()
+        if sparse_fields is None:
+            return queryset
+        serializer_class = self.get_serializer_class()
+        names = list(serializer_class(context=self.get_serializer_context()).fields)
+        return prune_queryset(queryset, serializer_class, names)
@@ -0,0 +1,65 @@
+"""
+Streaming list responses: ``?stream=true`` on a list endpoint.
+
+The queryset is read with a server-side cursor ``stream_chunk_size`` rows
+at a time, each chunk is serialized and rendered, and the JSON array is
+sent as it is produced, so memory stays flat however long the list is.
+Streams are not served from the queryset cache. Under
+``DB_POOL_MODE=pgbouncer`` server-side cursors are disabled and the driver
+holds the rows, but not their serialized and rendered copies.
+
+Only JSON is streamed; other formats, like msgpack which needs the item
+count up front, get the usual response.
+"""
+from asgiref.sync import sync_to_async
+from django.core.handlers.asgi import ASGIRequest
+from django.http import StreamingHttpResponse
+
+
+class StreamingListMixin:
+    stream_chunk_size = 500
+
+    def wants_stream(self):
+        renderer = getattr(self.request, 'accepted_renderer', None)
+        return (
+            self.request.query_params.get('stream', '').lower() in ('1', 'true')
+            and renderer is not None and renderer.format == 'json'
+        )
+
+    def list(self, request, *args, **kwargs):
+        if self.wants_stream():
+            return self.stream_list(self.filter_queryset(self.get_queryset()))
+        return super().list(request, *args, **kwargs)
+
+    def stream_list(self, queryset):
+        # routed now, replica reads end with the view while the rows are still to come
+        queryset = queryset.using(queryset.db)
+        parts = self.iterate_json(queryset)
+        if isinstance(self.request._request, ASGIRequest):
+            parts = _aiterate(parts)
+        return StreamingHttpResponse(parts, content_type=self.request.accepted_renderer.media_type)
+
+    def iterate_json(self, queryset):
+        renderer = self.request.accepted_renderer
+        separator = b'['
+        chunk = []
+        for instance in queryset.iterator(chunk_size=self.stream_chunk_size):
+            chunk.append(instance)
+            if len(chunk) == self.stream_chunk_size:
+                yield self._render_chunk(renderer, separator, chunk)
+                separator, chunk = b',', []
+        if chunk:
+            yield self._render_chunk(renderer, separator, chunk)
+            separator = b','
+        yield b'[]' if separator == b'[' else b']'
+
+    def _render_chunk(self, renderer, separator, chunk):
+        rows = self.get_serializer(chunk, many=True).data
+        return separator + b','.join(renderer.render(row) for row in rows)
+
+
+async def _aiterate(parts):
+    # every chunk is read on the one thread that holds the cursor's connection
+    next_part = sync_to_async(next, thread_sensitive=True)
+    while (part := await next_part(parts, None)) is not None:
+        yield part
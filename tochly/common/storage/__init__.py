@@ -0,0 +1,18 @@
+from functools import lru_cache
+
+from django.conf import settings
+from django.core.signals import setting_changed
+from django.dispatch import receiver
+from django.utils.module_loading import import_string
+
+
+@lru_cache(maxsize=None)
+def get_storage():
+    """Return the process wide storage service configured by ``STORAGE_BACKEND``."""
+    return import_string(settings.STORAGE_BACKEND)()
+
+
+@receiver(setting_changed)
+def reset_storage(setting, **kwargs):
+    if setting in ('STORAGE_BACKEND', 'AWS_S3_STORAGE_BUCKET_NAME'):
+        get_storage.cache_clear()
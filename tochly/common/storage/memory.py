@@ -0,0 +1,116 @@
+import hashlib
+import threading
+import uuid
+from urllib.parse import urlparse
+
+from django.conf import settings
+from django.utils import timezone
+
+
+class InMemoryStorage:
+    """Process local stand-in for S3Storage, meant for tests and local runs."""
+
+    def __init__(self):
+        self.bucket = settings.AWS_S3_STORAGE_BUCKET_NAME
+        self.objects = {}
+        self.multipart_uploads = {}
+        self._lock = threading.Lock()
+
+    def url(self, key: str) -> str:
+        return f'https://{self.bucket}.s3.amazonaws.com/{key}'
+
+    def key_from_url(self, file_url: str) -> str:
+        return urlparse(file_url).path.lstrip('/')
+
+    def presigned_put_url(
+        self, key: str, content_type: str = 'image/jpeg', expires_in: int = 300, checksum_sha256: str = None,
+    ) -> str:
+        return f'memory://{self.bucket}/{key}?content_type={content_type}&expires_in={expires_in}'
+
+    def exists(self, key: str) -> bool:
+        with self._lock:
+            return key in self.objects
+
+    def get(self, key: str) -> bytes:
+        with self._lock:
+            return self.objects[key]['body']
+
+    def put(self, key: str, body: bytes, content_type: str = 'application/octet-stream', cache_control: str = None):
+        with self._lock:
+            self.objects[key] = {
+                'body': body,
+                'content_type': content_type,
+                'cache_control': cache_control,
+                'last_modified': timezone.now(),
+            }
+
+    def delete(self, key: str):
+        with self._lock:
+            self.objects.pop(key, None)
+
+    def create_multipart_upload(self, key: str, content_type: str) -> str:
+        upload_id = uuid.uuid4().hex
+        with self._lock:
+            self.multipart_uploads[upload_id] = {
+                'key': key,
+                'content_type': content_type,
+                'parts': {},
+                'initiated': timezone.now(),
+            }
+        return upload_id
+
+    def presigned_part_url(self, key: str, upload_id: str, part_number: int, expires_in: int = 3600) -> str:
+        return f'memory://{self.bucket}/{key}?upload_id={upload_id}&part_number={part_number}'
+
+    def upload_part(self, upload_id: str, part_number: int, body: bytes) -> str:
+        """Stand in for the client PUT to a presigned part URL."""
+        etag = f'"{hashlib.md5(body).hexdigest()}"'
+        with self._lock:
+            self.multipart_uploads[upload_id]['parts'][part_number] = (etag, body)
+        return etag
+
+    def list_parts(self, key: str, upload_id: str) -> list:
+        with self._lock:
+            parts = dict(self.multipart_uploads[upload_id]['parts'])
+        return [
+            {'part_number': number, 'etag': etag, 'size': len(body)}
+            for number, (etag, body) in sorted(parts.items())
+        ]
+
+    def complete_multipart_upload(self, key: str, upload_id: str, parts: list):
+        with self._lock:
+            upload = self.multipart_uploads[upload_id]
+            received = upload['parts']
+            for part in parts:
+                if received.get(part['part_number'], (None,))[0] != part['etag']:
+                    raise ValueError(f'Part {part["part_number"]} does not match its ETag.')
+            body = b''.join(received[part['part_number']][1] for part in parts)
+            del self.multipart_uploads[upload_id]
+        self.put(key, body, upload['content_type'])
+
+    def abort_multipart_upload(self, key: str, upload_id: str):
+        with self._lock:
+            self.multipart_uploads.pop(upload_id, None)
+
+    def iter_multipart_uploads(self, prefix: str):
+        with self._lock:
+            listing = [
+                (upload['key'], upload_id, upload['initiated'])
+                for upload_id, upload in self.multipart_uploads.items()
+            ]
+        for key, upload_id, initiated in sorted(listing):
+            if key.startswith(prefix):
+                yield key, upload_id, initiated
+
+    def delete_many(self, keys) -> list:
+        with self._lock:
+            for key in keys:
+                self.objects.pop(key, None)
+        return []
+
+    def iter_objects(self, prefix: str):
+        with self._lock:
+            listing = [(key, obj['last_modified']) for key, obj in self.objects.items()]
+        for key, last_modified in sorted(listing):
+            if key.startswith(prefix):
+                yield key, last_modified
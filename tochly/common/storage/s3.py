@@ -0,0 +1,156 @@
+import os
+import threading
+from urllib.parse import urlparse
+
+import boto3
+from botocore.config import Config
+from botocore.exceptions import ClientError
+from django.conf import settings
+
+# S3 caps DeleteObjects at 1000 keys per request
+DELETE_BATCH_SIZE = 1000
+
+
+class S3Storage:
+    """
+    S3 backed object storage sharing one client per process.
+
+    boto3 clients are thread-safe once built but expensive to build, so the
+    client is created lazily under a lock and rebuilt only after a fork.
+    Presigned URLs are signed locally by that client.
+    """
+
+    def __init__(self):
+        self.bucket = settings.AWS_S3_STORAGE_BUCKET_NAME
+        self.region = settings.AWS_S3_REGION_NAME
+        self._client = None
+        self._client_pid = None
+        self._lock = threading.Lock()
+
+    @property
+    def client(self):
+        if self._client is None or self._client_pid != os.getpid():
+            with self._lock:
+                if self._client is None or self._client_pid != os.getpid():
+                    # sessions are not thread-safe, so each client gets its own
+                    session = boto3.session.Session(
+                        aws_access_key_id=settings.AWS_S3_ACCESS_KEY_ID,
+                        aws_secret_access_key=settings.AWS_S3_SECRET_ACCESS_KEY,
+                        region_name=self.region,
+                    )
+                    self._client = session.client(
+                        's3',
+                        config=Config(
+                            signature_version='s3v4',
+                            max_pool_connections=settings.AWS_S3_MAX_POOL_CONNECTIONS,
+                        ),
+                    )
+                    self._client_pid = os.getpid()
+        return self._client
+
+    def url(self, key: str) -> str:
+        return f'https://{self.bucket}.s3.amazonaws.com/{key}'
+
+    def key_from_url(self, file_url: str) -> str:
+        return urlparse(file_url).path.lstrip('/')
+
+    def presigned_put_url(
+        self, key: str, content_type: str = 'image/jpeg', expires_in: int = 300, checksum_sha256: str = None,
+    ) -> str:
+        params = {'Bucket': self.bucket, 'Key': key, 'ContentType': content_type}
+        if checksum_sha256:
+            # S3 rejects bodies that do not match the signed base64 digest
+            params['ChecksumSHA256'] = checksum_sha256
+        return self.client.generate_presigned_url('put_object', Params=params, ExpiresIn=expires_in)
+
+    def exists(self, key: str) -> bool:
+        try:
+            self.client.head_object(Bucket=self.bucket, Key=key)
+        except ClientError as error:
+            if error.response['Error']['Code'] in ('404', 'NoSuchKey', 'NotFound'):
+                return False
+            raise
+        return True
+
+    def get(self, key: str) -> bytes:
+        try:
+            return self.client.get_object(Bucket=self.bucket, Key=key)['Body'].read()
+        except ClientError as error:
+            # missing keys raise KeyError like InMemoryStorage
+            if error.response['Error']['Code'] in ('404', 'NoSuchKey', 'NotFound'):
+                raise KeyError(key) from error
+            raise
+
+    def put(self, key: str, body: bytes, content_type: str = 'application/octet-stream', cache_control: str = None):
+        params = {'Bucket': self.bucket, 'Key': key, 'Body': body, 'ContentType': content_type}
+        if cache_control:
+            params['CacheControl'] = cache_control
+        self.client.put_object(**params)
+
+    def delete(self, key: str):
+        self.client.delete_object(Bucket=self.bucket, Key=key)
+
+    def create_multipart_upload(self, key: str, content_type: str) -> str:
+        response = self.client.create_multipart_upload(Bucket=self.bucket, Key=key, ContentType=content_type)
+        return response['UploadId']
+
+    def presigned_part_url(self, key: str, upload_id: str, part_number: int, expires_in: int = 3600) -> str:
+        return self.client.generate_presigned_url(
+            'upload_part',
+            Params={
+                'Bucket': self.bucket,
+                'Key': key,
+                'UploadId': upload_id,
+                'PartNumber': part_number,
+            },
+            ExpiresIn=expires_in,
+        )
+
+    def list_parts(self, key: str, upload_id: str) -> list:
+        """Return ``{'part_number', 'etag', 'size'}`` for every part S3 has received."""
+        paginator = self.client.get_paginator('list_parts')
+        return [
+            {'part_number': part['PartNumber'], 'etag': part['ETag'], 'size': part['Size']}
+            for page in paginator.paginate(Bucket=self.bucket, Key=key, UploadId=upload_id)
+            for part in page.get('Parts', [])
+        ]
+
+    def complete_multipart_upload(self, key: str, upload_id: str, parts: list):
+        self.client.complete_multipart_upload(
+            Bucket=self.bucket,
+            Key=key,
+            UploadId=upload_id,
+            MultipartUpload={
+                'Parts': [{'PartNumber': part['part_number'], 'ETag': part['etag']} for part in parts],
+            },
+        )
+
+    def abort_multipart_upload(self, key: str, upload_id: str):
+        self.client.abort_multipart_upload(Bucket=self.bucket, Key=key, UploadId=upload_id)
+
+    def iter_multipart_uploads(self, prefix: str):
+        """Yield ``(key, upload_id, initiated)`` for unfinished uploads under ``prefix``."""
+        paginator = self.client.get_paginator('list_multipart_uploads')
+        for page in paginator.paginate(Bucket=self.bucket, Prefix=prefix):
+            for upload in page.get('Uploads', []):
+                yield upload['Key'], upload['UploadId'], upload['Initiated']
+
+    def delete_many(self, keys) -> list:
+        """Delete ``keys`` with multi-object deletes, returning the keys that failed."""
+        keys = list(keys)
+        failed = []
+        for start in range(0, len(keys), DELETE_BATCH_SIZE):
+            batch = keys[start:start + DELETE_BATCH_SIZE]
+            response = self.client.delete_objects(
+                Bucket=self.bucket,
+                Delete={'Objects': [{'Key': key} for key in batch], 'Quiet': True},
+            )
+            failed += [error['Key'] for error in response.get('Errors', [])]
+        return failed
+
+    def iter_objects(self, prefix: str):
+        """Yield ``(key, last_modified)`` for every object under ``prefix``."""
+        paginator = self.client.get_paginator('list_objects_v2')
+        for page in paginator.paginate(Bucket=self.bucket, Prefix=prefix):
+            for obj in page.get('Contents', []):
+                yield obj['Key'], obj['LastModified']
@@ -7,7 +7,7 @@ class CacheRateLimiter:
         self.window = window
 
     def is_limited(self, user_id):
-        key = f'{self.key_prefix}:{user_id}'
+        key = f'ratelimit:{self.key_prefix}:{user_id}'
         added = cache.add(key, 1, timeout=self.window)
 
         if added:
@@ -18,3 +18,16 @@ class CacheRateLimiter:
             return True
 
         return False
+
+    async def ais_limited(self, user_id):
+        key = f'ratelimit:{self.key_prefix}:{user_id}'
+        added = await cache.aadd(key, 1, timeout=self.window)
+
+        if added:
+            return False
+
+        current = await cache.aincr(key)
+        if current > self.limit:
+            return True
+
+        return False
@@ -0,0 +1,98 @@
+import http.client
+import os
+import socket
+import subprocess
+import sys
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from django.core.management.base import BaseCommand, CommandError
+
+SERVERS = (
+    # the previous production command, kept as the baseline
+    ('single sync worker', ['tochly.wsgi:application'], {}),
+    ('tochly.server wsgi', ['-c', 'python:tochly.server'], {'SERVER_INTERFACE': 'wsgi'}),
+    ('tochly.server asgi', ['-c', 'python:tochly.server'], {'SERVER_INTERFACE': 'asgi'}),
+)
+
+
+class Command(BaseCommand):
+    help = 'Benchmark requests per second of gunicorn with and without tochly.server, over WSGI and ASGI.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--path', default='/api/users/teams/')
+        parser.add_argument('--method', default='GET')
+        parser.add_argument('--token', help='JWT sent as a Bearer token with every request.')
+        parser.add_argument('--concurrency', type=int, default=32)
+        parser.add_argument('--duration', type=float, default=10.0)
+        parser.add_argument('--port', type=int, default=8765)
+
+    def handle(self, *args, **options):
+        headers = {'Authorization': f"Bearer {options['token']}"} if options['token'] else {}
+
+        for name, command, env in SERVERS:
+            server = subprocess.Popen(
+                [sys.executable, '-m', 'gunicorn', '--bind', f"127.0.0.1:{options['port']}", *command],
+                env={**os.environ, **env},
+                stdout=subprocess.DEVNULL,
+                stderr=subprocess.DEVNULL,
+            )
+            try:
+                self._wait_for(options['port'])
+                rate, p50, p99, errors = self._load(options, headers)
+            finally:
+                server.terminate()
+                server.wait()
+            self.stdout.write(
+                f'{name:<20} {rate:>8.0f} req/s  p50 {p50 * 1000:>6.1f} ms  '
+                f'p99 {p99 * 1000:>6.1f} ms  errors {errors}'
+            )
+
+    def _wait_for(self, port, timeout=30):
+        deadline = time.monotonic() + timeout
+        while time.monotonic() < deadline:
+            try:
+                socket.create_connection(('127.0.0.1', port), timeout=1).close()
+                # let the remaining workers finish booting
+                time.sleep(2)
+                return
+            except OSError:
+                time.sleep(0.2)
+        raise CommandError(f'gunicorn did not start listening on port {port}')
+
+    def _load(self, options, headers):
+        deadline = time.monotonic() + options['duration']
+
+        def client(_):
+            latencies, errors = [], 0
+            connection = http.client.HTTPConnection('127.0.0.1', options['port'], timeout=30)
+            while time.monotonic() < deadline:
+                started = time.perf_counter()
+                try:
+                    connection.request(options['method'], options['path'], headers=headers)
+                    response = connection.getresponse()
+                    response.read()
+                    if response.status >= 500:
+                        errors += 1
+                except (OSError, http.client.HTTPException):
+                    errors += 1
+                    connection.close()
+                    connection = http.client.HTTPConnection('127.0.0.1', options['port'], timeout=30)
+                    continue
+                latencies.append(time.perf_counter() - started)
+            connection.close()
+            return latencies, errors
+
+        with ThreadPoolExecutor(max_workers=options['concurrency']) as pool:
+            results = list(pool.map(client, range(options['concurrency'])))
+
+        latencies = sorted(latency for result in results for latency in result[0])
+        errors = sum(result[1] for result in results)
+        if not latencies:
+            return 0.0, 0.0, 0.0, errors
+        return (
+            len(latencies) / options['duration'],
+            latencies[len(latencies) // 2],
+            latencies[int(len(latencies) * 0.99)],
+            errors,
+        )
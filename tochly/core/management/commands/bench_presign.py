@@ -0,0 +1,49 @@
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import boto3
+from django.conf import settings
+from django.core.management.base import BaseCommand
+
+from common.storage.s3 import S3Storage
+
+
+def presign_with_new_client(key):
+    # the previous per-call behaviour, kept as the baseline
+    s3 = boto3.client(
+        's3',
+        aws_access_key_id=settings.AWS_S3_ACCESS_KEY_ID,
+        aws_secret_access_key=settings.AWS_S3_SECRET_ACCESS_KEY,
+        region_name=settings.AWS_S3_REGION_NAME,
+    )
+    return s3.generate_presigned_url(
+        'put_object',
+        Params={'Bucket': settings.AWS_S3_STORAGE_BUCKET_NAME, 'Key': key, 'ContentType': 'image/jpeg'},
+        ExpiresIn=300,
+    )
+
+
+class Command(BaseCommand):
+    help = 'Benchmark presigned upload URLs per second, shared client vs. a client per call.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--requests', type=int, default=2000)
+        parser.add_argument('--threads', type=int, default=4)
+
+    def handle(self, *args, **options):
+        storage = S3Storage()
+        shared = lambda key: storage.presigned_put_url(key)
+
+        for name, presign, count in (
+            ('client per call', presign_with_new_client, max(options['requests'] // 20, 1)),
+            ('shared client', shared, options['requests']),
+        ):
+            rate = self._run(presign, count, options['threads'])
+            self.stdout.write(f'{name:<16} {rate:>10.0f} presigns/s ({count} requests)')
+
+    def _run(self, presign, count, threads):
+        keys = [f'profile_pictures/bench-{i}.jpg' for i in range(count)]
+        started = time.perf_counter()
+        with ThreadPoolExecutor(max_workers=threads) as pool:
+            list(pool.map(presign, keys))
+        return count / (time.perf_counter() - started)
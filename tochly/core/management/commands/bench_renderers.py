@@ -0,0 +1,77 @@
+import io
+import time
+from datetime import timedelta
+
+from django.core.management.base import BaseCommand
+from django.utils import timezone
+from rest_framework.parsers import JSONParser
+from rest_framework.renderers import JSONRenderer
+
+from common.rest.parsers import MessagePackParser, ORJSONParser
+from common.rest.renderers import MessagePackRenderer, ORJSONRenderer
+from members.models import Member, MemberPresence, Team
+from members.serializers import MemberSerializer
+from users.models import Profile, User
+
+FORMATS = (
+    # (name, renderer, parser), DRF's stdlib JSON first as the baseline
+    ('json', JSONRenderer(), JSONParser()),
+    ('orjson', ORJSONRenderer(), ORJSONParser()),
+    ('msgpack', MessagePackRenderer(), MessagePackParser()),
+)
+
+
+def member_payload(rows):
+    """A page of ``rows`` serialized members, built in memory like a team's member list."""
+    now = timezone.now()
+    team = Team(id=1, tid='TBENCH0001', name='Benchmark Team', created=now, updated=now)
+    payload = []
+    for i in range(1, rows + 1):
+        user = User(
+            id=i, email=f'member{i}@example.com', first_name='Member', last_name=f'Number {i}',
+            timezone='Europe/Berlin',
+        )
+        user.profile = Profile(id=i, dark_mode=i % 2 == 0, created=now, updated=now)
+        member = Member(
+            id=i, user=user, team=team, role='admin' if i == 1 else 'member',
+            display_name=f'Member {i}', title='Software Engineer', phone_number=f'+4915{i:09d}',
+            profile_picture_url=f'https://cdn.example.com/profile_pictures/{i:064x}.webp',
+            profile_picture_variants={
+                size: f'https://cdn.example.com/profile_pictures/{i:064x}-{size}.webp' for size in ('64', '256')
+            },
+            created=now - timedelta(days=i), updated=now,
+        )
+        member.presence = MemberPresence(online=i % 3 == 0, status='remote' if i % 4 == 0 else '', updated=now)
+        payload.append(MemberSerializer(member).data)
+    return payload
+
+
+class Command(BaseCommand):
+    help = 'Benchmark size, render and parse time of MemberSerializer pages in each API format.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--rows', type=int, default=200, help='Members per page.')
+        parser.add_argument('--repeat', type=int, default=200)
+
+    def handle(self, *args, **options):
+        payload = member_payload(options['rows'])
+        baseline = None
+
+        for name, renderer, parser in FORMATS:
+            body = renderer.render(payload)
+            render = self._time(lambda: renderer.render(payload), options['repeat'])
+            parse = self._time(lambda: parser.parse(io.BytesIO(body)), options['repeat'])
+            data = parser.parse(io.BytesIO(body))
+            if baseline is None:
+                baseline = data, render, len(body)
+            same = 'same data' if data == baseline[0] else 'DATA DIFFERS'
+            self.stdout.write(
+                f'{name:<8} render {render * 1000:>7.3f} ms  parse {parse * 1000:>7.3f} ms  '
+                f'{len(body):>8} bytes ({len(body) / baseline[2]:>4.0%})  x{baseline[1] / render:>5.1f}  {same}'
+            )
+
+    def _time(self, run, repeat):
+        started = time.perf_counter()
+        for _ in range(repeat):
+            run()
+        return (time.perf_counter() - started) / repeat
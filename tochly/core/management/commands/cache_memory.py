@@ -0,0 +1,86 @@
+from collections import defaultdict
+
+from django.conf import settings
+from django.core.cache import cache
+from django.core.management.base import BaseCommand
+from django_redis import get_redis_connection
+from redis.exceptions import ResponseError
+
+BATCH_SIZE = 500
+# rough per-key overhead used when MEMORY USAGE is unavailable
+KEY_OVERHEAD = 56
+
+
+class Command(BaseCommand):
+    help = 'Report Redis memory used per cache key prefix.'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--depth', type=int, default=1,
+            help='Number of ":" separated key segments that make up a prefix.',
+        )
+        parser.add_argument('--alias', default='default', help='Cache alias to inspect.')
+
+    def handle(self, *args, **options):
+        alias = options['alias']
+        depth = options['depth']
+        redis = get_redis_connection(alias)
+        key_prefix = settings.CACHES[alias].get('KEY_PREFIX', '')
+
+        usage = defaultdict(lambda: [0, 0])
+        batch = []
+        for key in redis.scan_iter(match=f'{key_prefix}:*' if key_prefix else '*', count=BATCH_SIZE):
+            batch.append(key)
+            if len(batch) >= BATCH_SIZE:
+                self._account(redis, batch, usage, depth)
+                batch = []
+        if batch:
+            self._account(redis, batch, usage, depth)
+
+        try:
+            info = redis.info('memory')
+        except ResponseError:
+            info = {}
+        used = info.get('used_memory', 0)
+        maxmemory = info.get('maxmemory', 0)
+        self.stdout.write(f'used_memory: {used} bytes, maxmemory: {maxmemory or "unlimited"}')
+
+        self.stdout.write(f'{"prefix":<40} {"keys":>10} {"bytes":>14} {"avg":>10} {"share":>7}')
+        for prefix, (count, size) in sorted(usage.items(), key=lambda item: -item[1][1]):
+            share = f'{100 * size / used:.1f}%' if used else '-'
+            self.stdout.write(f'{prefix:<40} {count:>10} {size:>14} {size // count:>10} {share:>7}')
+
+        l1_stats = getattr(cache, 'l1_stats', None)
+        if l1_stats is not None:
+            stats = l1_stats()
+            self.stdout.write(
+                f'L1 (this process): {stats["size"]}/{stats["max_entries"]} entries, '
+                f'hit ratio {stats["hit_ratio"]:.2%}'
+            )
+
+    def _account(self, redis, keys, usage, depth):
+        for key, size in zip(keys, self._sizes(redis, keys)):
+            usage[self._prefix(key, depth)][0] += 1
+            usage[self._prefix(key, depth)][1] += size or 0
+
+    def _sizes(self, redis, keys):
+        pipeline = redis.pipeline(transaction=False)
+        for key in keys:
+            pipeline.memory_usage(key)
+        try:
+            return pipeline.execute()
+        except ResponseError:
+            # MEMORY is disabled on some managed Redis offerings
+            pipeline = redis.pipeline(transaction=False)
+            for key in keys:
+                pipeline.strlen(key)
+            return [
+                length + len(key) + KEY_OVERHEAD if isinstance(length, int) else 0
+                for key, length in zip(keys, pipeline.execute(raise_on_error=False))
+            ]
+
+    def _prefix(self, key, depth):
+        # stored keys look like "<KEY_PREFIX>:<version>:<key>"
+        parts = key.decode().split(':', 2)
+        name = parts[-1]
+        return ':'.join(name.split(':')[:depth])
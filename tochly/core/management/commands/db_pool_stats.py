@@ -0,0 +1,29 @@
+from django.core.cache import cache
+from django.core.management.base import BaseCommand
+
+from common.db.pool import STATS_KEY_PREFIX
+
+
+class Command(BaseCommand):
+    help = 'Show database connection pool metrics reported by every web process.'
+
+    def handle(self, *args, **options):
+        keys = list(cache.iter_keys(f'{STATS_KEY_PREFIX}:*'))
+        reports = cache.get_many(keys)
+        if not reports:
+            self.stdout.write('No pool metrics reported, is DB_POOL_MODE=pool?')
+            return
+
+        self.stdout.write(
+            f'{"process":<40} {"size":>5} {"active":>7} {"idle":>5} {"waiting":>8} '
+            f'{"checkouts":>10} {"wait avg":>10} {"wait max":>10} {"timeouts":>9} {"retired":>8}'
+        )
+        for key in sorted(reports):
+            stats = reports[key]
+            process = key[len(STATS_KEY_PREFIX) + 1:]
+            self.stdout.write(
+                f'{process:<40} {stats["size"]:>5} {stats["active"]:>7} {stats["idle"]:>5} '
+                f'{stats["waiting"]:>8} {stats["checkouts"]:>10} '
+                f'{stats["wait_avg"] * 1000:>8.2f}ms {stats["wait_max"] * 1000:>8.2f}ms '
+                f'{stats["timeouts"]:>9} {stats["retired"] + stats["failed_health_checks"]:>8}'
+            )
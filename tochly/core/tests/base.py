@@ -1,4 +1,5 @@
 from django.contrib.auth import get_user_model
+from django.core.cache import cache
 from rest_framework.test import APITestCase, APIClient
 
 
@@ -9,6 +10,7 @@ class BaseAPITestCaseAuthenticated(APITestCase):
 
     def setUp(self):
         """Set up a test user and authenticate them."""
+        cache.clear()
         self.user = self.create_user()
         self.client = APIClient()
         self.client.force_authenticate(user=self.user)
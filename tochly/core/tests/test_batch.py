@@ -0,0 +1,91 @@
+from unittest import mock
+
+from django.core.cache import cache
+from django.test import override_settings
+from rest_framework import status
+from rest_framework.test import APIClient
+from rest_framework_simplejwt.tokens import AccessToken
+
+from common.db.routers import ReplicaRouter, is_pinned
+from core.tests.base import BaseAPITestCaseAuthenticated
+from members.models import Team, Member
+from users.authentication import CustomJWTAuthentication
+from users.models import Profile
+
+
+class BatchViewTests(BaseAPITestCaseAuthenticated):
+    def setUp(self):
+        super().setUp()
+        Profile.objects.create(user=self.user)
+        self.team = Team.objects.create(name='Batch Team')
+        Member.objects.create(user=self.user, team=self.team, display_name='Batcher')
+        self.url = '/api/batch/'
+
+    def batch(self, *paths):
+        return self.client.post(self.url, {'requests': [{'path': path} for path in paths]}, format='json')
+
+    def test_runs_sub_requests_in_order(self):
+        paths = [
+            f'/api/teams/{self.team.tid}/',
+            f'/api/teams/{self.team.tid}/members/?search=batch',
+            '/api/profiles/me/',
+        ]
+        response = self.batch(*paths)
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        responses = response.data['responses']
+        self.assertEqual([sub['status'] for sub in responses], [200, 200, 200])
+        for path, sub in zip(paths, responses):
+            cache.clear()
+            self.assertEqual(sub['body'], self.client.get(path).data)
+
+    def test_streamed_lists_are_included(self):
+        path = f'/api/teams/{self.team.tid}/members/'
+        response = self.batch(f'{path}?stream=true')
+
+        self.assertEqual(response.data['responses'][0]['body'], self.client.get(path).json())
+
+    def test_failures_are_reported_per_sub_request(self):
+        response = self.batch('/api/teams/NOPE/', '/api/teams/nope/nothing/here/')
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual([sub['status'] for sub in response.data['responses']], [404, 404])
+
+    def test_only_allowed_routes_can_be_batched(self):
+        response = self.batch('/api/auth/users/me/')
+
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+
+    def test_batch_size_is_limited(self):
+        with self.settings(BATCH_MAX_REQUESTS=2):
+            response = self.batch(*['/api/profiles/me/'] * 3)
+
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+
+    def test_authenticates_once(self):
+        client = APIClient()
+        client.credentials(HTTP_AUTHORIZATION=f'Bearer {AccessToken.for_user(self.user)}')
+        get_user = CustomJWTAuthentication.get_user
+
+        with mock.patch.object(CustomJWTAuthentication, 'get_user', autospec=True, side_effect=get_user) as patched:
+            response = client.post(
+                self.url,
+                {'requests': [{'path': f'/api/teams/{self.team.tid}/'}, {'path': '/api/profiles/me/'}]},
+                format='json',
+            )
+
+        self.assertEqual([sub['status'] for sub in response.data['responses']], [200, 200])
+        self.assertEqual(patched.call_count, 1)
+
+    @override_settings(DATABASE_REPLICAS=['replica1'], REPLICA_LAG_WINDOW=5)
+    def test_batches_do_not_pin(self):
+        # the replica alias is not set up in tests, so reads are sent back to the primary
+        with mock.patch.object(ReplicaRouter, 'db_for_read', return_value='default'):
+            response = self.batch(f'/api/teams/{self.team.tid}/')
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertFalse(is_pinned(self.user.id))
+
+    def test_unauthenticated_request(self):
+        self.unauthenticate()
+        self.assertEqual(self.batch('/api/profiles/me/').status_code, status.HTTP_401_UNAUTHORIZED)
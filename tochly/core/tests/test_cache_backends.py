@@ -0,0 +1,102 @@
+import time
+import uuid
+
+from django.conf import settings
+from django.test import SimpleTestCase
+
+from common.cache.backends import LocalCache, TwoTierRedisCache
+
+
+def make_cache(**options):
+    params = {
+        'KEY_PREFIX': 'test-l1',
+        'OPTIONS': {
+            'CLIENT_CLASS': 'django_redis.client.DefaultClient',
+            'L1_CHANNEL': 'test:cache:invalidate',
+            **options,
+        },
+    }
+    return TwoTierRedisCache(settings.CACHES['default']['LOCATION'], params)
+
+
+def wait_for(predicate, timeout=2):
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        if predicate():
+            return True
+        time.sleep(0.01)
+    return False
+
+
+class LocalCacheTests(SimpleTestCase):
+    def test_evicts_least_recently_used_entries(self):
+        l1 = LocalCache(max_entries=2)
+        l1.set('a', 1)
+        l1.set('b', 2)
+        l1.get('a')
+        l1.set('c', 3)
+
+        self.assertEqual(l1.get('a'), 1)
+        self.assertEqual(l1.get('c'), 3)
+        self.assertEqual(l1.stats()['size'], 2)
+        self.assertNotEqual(l1.get('b'), 2)
+
+    def test_entries_expire(self):
+        l1 = LocalCache(timeout=0.05)
+        l1.set('a', 1)
+        time.sleep(0.06)
+        self.assertNotEqual(l1.get('a'), 1)
+
+    def test_returned_values_are_copies(self):
+        l1 = LocalCache()
+        l1.set('a', {'items': [1]})
+        l1.get('a')['items'].append(2)
+        self.assertEqual(l1.get('a'), {'items': [1]})
+
+
+class TwoTierRedisCacheTests(SimpleTestCase):
+    def setUp(self):
+        self.worker_a = make_cache()
+        self.worker_b = make_cache()
+        self.key = f'key-{uuid.uuid4()}'
+        self.assertTrue(wait_for(lambda: self.worker_a._l1_ready() and self.worker_b._l1_ready()))
+
+    def tearDown(self):
+        self.worker_a.delete(self.key)
+
+    def test_repeated_reads_are_served_from_l1(self):
+        self.worker_a.set(self.key, 'value')
+        self.assertEqual(self.worker_a.get(self.key), 'value')
+        self.assertEqual(self.worker_a.get(self.key), 'value')
+
+        stats = self.worker_a.l1_stats()
+        self.assertEqual(stats['hits'], 1)
+        self.assertEqual(stats['misses'], 1)
+        self.assertEqual(stats['hit_ratio'], 0.5)
+
+    def test_write_on_other_worker_invalidates_l1(self):
+        self.worker_a.set(self.key, 'old')
+        self.assertEqual(self.worker_a.get(self.key), 'old')
+
+        self.worker_b.set(self.key, 'new')
+
+        self.assertTrue(wait_for(lambda: self.worker_a.get(self.key) == 'new'))
+
+    def test_delete_on_other_worker_invalidates_l1(self):
+        self.worker_a.set(self.key, 'value')
+        self.worker_a.get(self.key)
+
+        self.worker_b.delete(self.key)
+
+        self.assertTrue(wait_for(lambda: self.worker_a.get(self.key) is None))
+
+    def test_get_many_fills_l1_for_misses_only(self):
+        other = f'{self.key}-other'
+        self.worker_a.set_many({self.key: 1, other: 2})
+        self.worker_a.get(self.key)
+
+        result = self.worker_a.get_many([self.key, other, f'{self.key}-missing'])
+
+        self.assertEqual(result, {self.key: 1, other: 2})
+        self.assertEqual(self.worker_a.l1_stats()['hits'], 1)
+        self.worker_a.delete(other)
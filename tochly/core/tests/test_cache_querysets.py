@@ -0,0 +1,86 @@
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.test import TestCase
+
+from common.cache.querysets import cached_queryset, invalidate, queryset_key
+from members.models import Team, Member
+
+User = get_user_model()
+
+
+class CachedQuerysetTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.user = User.objects.create_user(email='cache@example.com', first_name='Cache', last_name='User')
+        self.team1 = Team.objects.create(name='Cache Team 1')
+        self.team2 = Team.objects.create(name='Cache Team 2')
+        self.member = Member.objects.create(user=self.user, team=self.team1, display_name='Cached')
+
+    def team_members(self, team):
+        return cached_queryset(
+            Member.objects.filter(team=team).order_by('id'),
+            scopes={Member: {'team_id': team.id}},
+        )
+
+    def test_second_evaluation_hits_the_cache(self):
+        self.assertEqual(self.team_members(self.team1), [self.member])
+        with self.assertNumQueries(0):
+            self.assertEqual(self.team_members(self.team1), [self.member])
+
+    def test_save_invalidates_cached_results(self):
+        self.team_members(self.team1)
+        self.member.display_name = 'Renamed'
+        self.member.save()
+
+        self.assertEqual(self.team_members(self.team1)[0].display_name, 'Renamed')
+
+    def test_delete_invalidates_cached_results(self):
+        self.team_members(self.team1)
+        self.member.delete()
+
+        self.assertEqual(self.team_members(self.team1), [])
+
+    def test_changes_in_other_scope_keep_entry(self):
+        self.team_members(self.team1)
+        Member.objects.create(user=self.user, team=self.team2, display_name='Elsewhere')
+
+        with self.assertNumQueries(0):
+            self.team_members(self.team1)
+
+    def test_scope_with_several_values_follows_each_of_them(self):
+        teams = Team.objects.filter(id__in=[self.team1.id, self.team2.id]).order_by('id')
+        scopes = {Team: {'id': [self.team1.id, self.team2.id]}}
+        cached_queryset(teams, scopes=scopes)
+
+        Team.objects.create(name='Cache Team 3')
+        with self.assertNumQueries(0):
+            cached_queryset(teams, scopes=scopes)
+
+        invalidate(Team, id=self.team2.id)
+        with self.assertNumQueries(1):
+            cached_queryset(teams, scopes=scopes)
+
+    def test_covered_models_are_left_out_of_the_key(self):
+        members = Member.objects.filter(team=self.team1).select_related('user')
+        key = queryset_key(members, covered=(User,))
+        invalidate(User, id=self.user.id)
+
+        self.assertEqual(key, queryset_key(members, covered=(User,)))
+        self.assertNotEqual(queryset_key(members), queryset_key(members, covered=(User,)))
+
+    def test_unscoped_querysets_see_changes_in_any_scope(self):
+        teams = Team.objects.filter(members__user=self.user).order_by('id')
+        self.assertEqual(cached_queryset(teams), [self.team1])
+
+        Member.objects.create(user=self.user, team=self.team2, display_name='Elsewhere')
+
+        self.assertEqual(cached_queryset(teams), [self.team1, self.team2])
+
+    def test_manual_invalidation_after_bulk_update(self):
+        key = queryset_key(Member.objects.filter(team=self.team1))
+        Member.objects.filter(team=self.team1).update(display_name='Bulk')
+        self.assertEqual(key, queryset_key(Member.objects.filter(team=self.team1)))
+
+        invalidate(Member, team_id=self.team1.id)
+
+        self.assertNotEqual(key, queryset_key(Member.objects.filter(team=self.team1)))
@@ -0,0 +1,67 @@
+import uuid
+from datetime import date, datetime, timedelta, timezone
+from decimal import Decimal
+from io import StringIO
+from unittest.mock import patch
+
+from django.core.cache import cache
+from django.core.management import call_command
+from django.test import SimpleTestCase
+
+from common.cache.compressors import Lz4Compressor
+from common.cache.serializers import MsgpackSerializer
+from members.models import Team
+
+
+class MsgpackSerializerTests(SimpleTestCase):
+    def setUp(self):
+        self.serializer = MsgpackSerializer({})
+
+    def roundtrip(self, value):
+        return self.serializer.loads(self.serializer.dumps(value))
+
+    def test_roundtrips_common_value_types(self):
+        value = {
+            'created': datetime(2024, 1, 2, 3, 4, 5, 6, tzinfo=timezone.utc),
+            'day': date(2024, 1, 2),
+            'ttl': timedelta(days=1, seconds=2),
+            'amount': Decimal('10.50'),
+            'id': uuid.uuid4(),
+            'pair': (1, 'a'),
+            'nested': [{'key': None}, True, 1.5, b'raw'],
+        }
+        self.assertEqual(self.roundtrip(value), value)
+
+    def test_falls_back_to_pickle_for_other_objects(self):
+        team = Team(id=1, name='Pickled', tid='T1')
+        restored = self.roundtrip([team])[0]
+        self.assertEqual((restored.pk, restored.name), (1, 'Pickled'))
+
+
+class Lz4CompressorTests(SimpleTestCase):
+    def test_only_compresses_above_threshold(self):
+        compressor = Lz4Compressor({'COMPRESS_MIN_LENGTH': 100})
+        small = b'x' * 50
+        large = b'x' * 1000
+
+        self.assertEqual(compressor.compress(small), small)
+        self.assertLess(len(compressor.compress(large)), len(large))
+        self.assertEqual(compressor.decompress(compressor.compress(large)), large)
+
+
+class CacheMemoryCommandTests(SimpleTestCase):
+    def test_reports_usage_per_prefix(self):
+        cache.set('upload:token:report-test', {'key': 'k', 'user_id': 1})
+        cache.set('ratelimit:report-test:1', 1)
+        out = StringIO()
+
+        with patch(
+            'core.management.commands.cache_memory.Command._sizes',
+            side_effect=lambda redis, keys: [100] * len(keys),
+        ):
+            call_command('cache_memory', stdout=out)
+
+        lines = {line.split()[0]: line.split() for line in out.getvalue().splitlines()[2:]}
+        self.assertIn('upload', lines)
+        self.assertIn('ratelimit', lines)
+        cache.delete_many(['upload:token:report-test', 'ratelimit:report-test:1'])
@@ -0,0 +1,84 @@
+import threading
+import time
+import uuid
+
+from django.core.cache import cache
+from django.test import SimpleTestCase
+
+from common.cache.stampede import get_or_compute
+
+
+class SlowComputation:
+    def __init__(self, value='fresh', duration=0.2):
+        self.value = value
+        self.duration = duration
+        self.calls = 0
+        self._lock = threading.Lock()
+
+    def __call__(self):
+        with self._lock:
+            self.calls += 1
+        time.sleep(self.duration)
+        return self.value
+
+
+class GetOrComputeTests(SimpleTestCase):
+    def setUp(self):
+        self.key = f'stampede-{uuid.uuid4()}'
+
+    def tearDown(self):
+        cache.delete_many([self.key, f'{self.key}:lock'])
+
+    def run_concurrently(self, target, workers=10):
+        results = []
+        barrier = threading.Barrier(workers)
+
+        def run():
+            barrier.wait()
+            results.append(target())
+
+        threads = [threading.Thread(target=run) for _ in range(workers)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        return results
+
+    def test_concurrent_misses_compute_once(self):
+        compute = SlowComputation()
+
+        results = self.run_concurrently(lambda: get_or_compute(self.key, compute, timeout=60))
+
+        self.assertEqual(compute.calls, 1)
+        self.assertEqual(results, ['fresh'] * 10)
+
+    def test_stale_value_is_served_while_one_worker_refreshes(self):
+        cache.set(self.key, {'value': 'stale', 'expires': time.time() - 1, 'delta': 0.1}, timeout=60)
+        compute = SlowComputation()
+
+        results = self.run_concurrently(lambda: get_or_compute(self.key, compute, timeout=60))
+
+        self.assertEqual(compute.calls, 1)
+        self.assertIn('stale', results)
+        self.assertEqual(get_or_compute(self.key, compute, timeout=60), 'fresh')
+
+    def test_fresh_value_is_not_recomputed(self):
+        get_or_compute(self.key, SlowComputation('first', 0), timeout=60)
+        compute = SlowComputation('second', 0)
+
+        self.assertEqual(get_or_compute(self.key, compute, timeout=60, beta=0), 'first')
+        self.assertEqual(compute.calls, 0)
+
+    def test_expensive_values_are_refreshed_early(self):
+        cache.set(self.key, {'value': 'old', 'expires': time.time() + 5, 'delta': 1000}, timeout=60)
+        compute = SlowComputation('new', 0)
+
+        self.assertEqual(get_or_compute(self.key, compute, timeout=60), 'new')
+        self.assertEqual(compute.calls, 1)
+
+    def test_waiters_recompute_when_lock_holder_never_finishes(self):
+        cache.lock(f'{self.key}:lock', timeout=60).acquire(blocking=False)
+        compute = SlowComputation(duration=0)
+
+        self.assertEqual(get_or_compute(self.key, compute, timeout=60, lock_timeout=0.2), 'fresh')
+        self.assertEqual(compute.calls, 1)
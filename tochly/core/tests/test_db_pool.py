@@ -0,0 +1,113 @@
+import threading
+import time
+from io import StringIO
+from unittest.mock import patch
+
+from django.core.management import call_command
+from django.db import connection
+from django.test import SimpleTestCase
+from psycopg2.extensions import TRANSACTION_STATUS_IDLE, TRANSACTION_STATUS_INTRANS
+
+from common.db.backends.postgresql_pool.base import DatabaseWrapper
+from common.db.pool import ConnectionPool, PoolTimeout
+
+
+class FakeConnection:
+    def __init__(self):
+        self.closed = 0
+        self.status = TRANSACTION_STATUS_IDLE
+        self.healthy = True
+
+    def get_transaction_status(self):
+        return self.status
+
+    def rollback(self):
+        self.status = TRANSACTION_STATUS_IDLE
+
+    def cursor(self):
+        if not self.healthy:
+            raise OSError('server closed the connection')
+        return patch.object(self, 'execute', create=True)
+
+    def close(self):
+        self.closed = 1
+
+
+class ConnectionPoolTests(SimpleTestCase):
+    def test_reuses_returned_connections(self):
+        pool = ConnectionPool('test')
+        first = pool.checkout(FakeConnection)
+        pool.checkin(first)
+
+        self.assertIs(pool.checkout(FakeConnection), first)
+        self.assertEqual(pool.stats()['created'], 1)
+
+    def test_waits_for_a_connection_when_exhausted(self):
+        pool = ConnectionPool('test', max_size=1, checkout_timeout=5)
+        held = pool.checkout(FakeConnection)
+        threading.Timer(0.1, pool.checkin, args=[held]).start()
+
+        self.assertIs(pool.checkout(FakeConnection), held)
+        stats = pool.stats()
+        self.assertGreaterEqual(stats['wait_max'], 0.05)
+        self.assertEqual(stats['active'], 1)
+
+    def test_times_out_when_no_connection_frees_up(self):
+        pool = ConnectionPool('test', max_size=1, checkout_timeout=0.05)
+        pool.checkout(FakeConnection)
+
+        with self.assertRaises(PoolTimeout):
+            pool.checkout(FakeConnection)
+        self.assertEqual(pool.stats()['timeouts'], 1)
+
+    def test_retires_connections_past_their_lifetime(self):
+        pool = ConnectionPool('test', max_lifetime=0.01)
+        old = pool.checkout(FakeConnection)
+        time.sleep(0.02)
+        pool.checkin(old)
+
+        self.assertTrue(old.closed)
+        self.assertIsNot(pool.checkout(FakeConnection), old)
+
+    def test_discards_idle_connections_failing_the_health_check(self):
+        pool = ConnectionPool('test', health_check_interval=0)
+        broken = pool.checkout(FakeConnection)
+        pool.checkin(broken)
+        broken.healthy = False
+
+        self.assertIsNot(pool.checkout(FakeConnection), broken)
+        self.assertEqual(pool.stats()['failed_health_checks'], 1)
+
+    def test_rolls_back_open_transactions_on_checkin(self):
+        pool = ConnectionPool('test')
+        dirty = pool.checkout(FakeConnection)
+        dirty.status = TRANSACTION_STATUS_INTRANS
+        pool.checkin(dirty)
+
+        self.assertEqual(pool.checkout(FakeConnection).status, TRANSACTION_STATUS_IDLE)
+
+
+class PooledBackendTests(SimpleTestCase):
+    def test_close_returns_the_connection_to_the_pool(self):
+        wrapper = DatabaseWrapper(dict(connection.settings_dict, ENGINE='common.db.backends.postgresql_pool'), 'pooled')
+        self.addCleanup(lambda: wrapper.pool.close_all())
+
+        with wrapper.cursor() as cursor:
+            cursor.execute('SELECT 1')
+        raw = wrapper.connection
+        wrapper.close()
+        with wrapper.cursor() as cursor:
+            cursor.execute('SELECT 1')
+
+        self.assertIs(wrapper.connection, raw)
+        wrapper.close()
+        self.assertEqual(wrapper.pool.stats()['created'], 1)
+
+    def test_stats_command_lists_reporting_processes(self):
+        pool = ConnectionPool('stats-test')
+        pool.checkout(FakeConnection)
+        out = StringIO()
+
+        call_command('db_pool_stats', stdout=out)
+
+        self.assertIn('stats-test', out.getvalue())
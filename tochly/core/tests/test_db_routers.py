@@ -0,0 +1,99 @@
+import time
+from unittest import mock
+
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.db import router
+from django.test import TestCase, override_settings
+from rest_framework import status
+from rest_framework.test import APIClient
+
+from common.cache.querysets import cached_queryset, version_key
+from common.db.routers import ReplicaRouter, is_pinned, replica_reads, start_replica_reads
+from members.models import Team, Member
+
+User = get_user_model()
+
+
+@override_settings(DATABASE_REPLICAS=['replica1'], REPLICA_LAG_WINDOW=5)
+class ReplicaRouterTests(TestCase):
+    def setUp(self):
+        cache.clear()
+
+    def test_reads_use_primary_by_default(self):
+        self.assertEqual(router.db_for_read(Team), 'default')
+
+    def test_reads_use_replica_inside_replica_reads(self):
+        with replica_reads():
+            self.assertEqual(router.db_for_read(Team), 'replica1')
+        self.assertEqual(router.db_for_read(Team), 'default')
+
+    def test_writes_always_use_primary(self):
+        with replica_reads():
+            self.assertEqual(router.db_for_write(Team), 'default')
+
+    def test_replicas_are_never_migrated(self):
+        self.assertFalse(router.allow_migrate('replica1', 'members'))
+        self.assertTrue(router.allow_migrate('default', 'members'))
+
+    @override_settings(DATABASE_REPLICAS=[])
+    def test_without_replicas_reads_stay_on_primary(self):
+        with replica_reads():
+            self.assertEqual(router.db_for_read(Team), 'default')
+
+
+@override_settings(DATABASE_REPLICAS=['replica1'], REPLICA_LAG_WINDOW=5)
+class ReadYourWritesTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.user = User.objects.create_user(email='replica@example.com', first_name='Rep', last_name='Lica')
+        self.client = APIClient()
+        self.client.force_authenticate(user=self.user)
+
+    def test_unsafe_request_pins_user_to_primary(self):
+        self.assertFalse(is_pinned(self.user.id))
+
+        response = self.client.post('/api/teams/', {'name': 'Pinned Team'})
+
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+        self.assertTrue(is_pinned(self.user.id))
+
+    def test_buffered_writes_do_not_pin(self):
+        team = Team.objects.create(name='Buffered Team')
+        Member.objects.create(user=self.user, team=team, display_name='Buffered')
+
+        response = self.client.post(f'/api/teams/{team.tid}/members/presence/', {'online': True})
+
+        self.assertEqual(response.status_code, status.HTTP_202_ACCEPTED)
+        self.assertFalse(is_pinned(self.user.id))
+
+    def test_safe_request_does_not_pin(self):
+        self.client.get('/api/users/teams/')
+
+        self.assertFalse(is_pinned(self.user.id))
+
+    def test_safe_request_reads_from_replica_unless_pinned(self):
+        with mock.patch('common.db.mixins.start_replica_reads', wraps=start_replica_reads) as start:
+            self.client.get('/api/users/teams/')
+            self.assertTrue(start.called)
+
+            start.reset_mock()
+            self.client.post('/api/teams/', {'name': 'Pinned Team'})
+            self.client.get('/api/users/teams/')
+            self.assertFalse(start.called)
+
+    def test_recently_changed_querysets_are_computed_on_primary(self):
+        Team.objects.create(name='Fresh Team')
+
+        with replica_reads(), mock.patch.object(ReplicaRouter, 'db_for_read', return_value='default') as db_for_read:
+            self.assertEqual([team.name for team in cached_queryset(Team.objects.all())], ['Fresh Team'])
+        self.assertFalse(db_for_read.called)
+
+    def test_settled_querysets_may_be_computed_on_replica(self):
+        Team.objects.create(name='Old Team')
+        cache.set(version_key(Team._meta.db_table), time.time_ns() - 10 * 1_000_000_000, timeout=None)
+
+        # the replica alias is not set up in tests, so reads are sent back to the primary
+        with replica_reads(), mock.patch.object(ReplicaRouter, 'db_for_read', return_value='default') as db_for_read:
+            self.assertEqual([team.name for team in cached_queryset(Team.objects.all())], ['Old Team'])
+        self.assertTrue(db_for_read.called)
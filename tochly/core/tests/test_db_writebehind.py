@@ -0,0 +1,95 @@
+from unittest import mock
+
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.db import DatabaseError
+from django.test import TestCase
+
+from common.db.writebehind import WriteBehindBuffer
+from members.models import Team, Member, MemberPresence
+
+User = get_user_model()
+
+
+class WriteBehindBufferTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        team = Team.objects.create(name='Buffered Team')
+        self.members = [
+            Member.objects.create(
+                user=User.objects.create_user(email=f'buffered{i}@example.com'), team=team, display_name=str(i),
+            )
+            for i in range(3)
+        ]
+        self.flushed = []
+        self.buffer = WriteBehindBuffer(
+            MemberPresence, fields=('online', 'status'), touch='updated', on_flush=self.flushed.extend,
+        )
+
+    def presence(self, member):
+        return MemberPresence.objects.get(member=member)
+
+    def test_updates_are_buffered_until_flushed(self):
+        self.buffer.update(self.members[0].pk, status='meeting')
+
+        self.assertEqual(self.presence(self.members[0]).status, '')
+        self.assertEqual(self.buffer.flush(), 1)
+        self.assertEqual(self.presence(self.members[0]).status, 'meeting')
+        self.assertEqual(self.flushed, [self.members[0].pk])
+
+    def test_latest_value_of_each_field_wins(self):
+        before = self.presence(self.members[0]).updated
+        self.buffer.update(self.members[0].pk, status='meeting')
+        self.buffer.update(self.members[0].pk, online=True)
+        self.buffer.update(self.members[0].pk, status='remote')
+        self.buffer.flush()
+
+        presence = self.presence(self.members[0])
+        self.assertTrue(presence.online)
+        self.assertEqual(presence.status, 'remote')
+        self.assertGreater(presence.updated, before)
+
+    def test_rows_saved_after_buffering_keep_the_saved_values(self):
+        member = self.members[0]
+        self.buffer.update(member.pk, status='meeting', online=True)
+        presence = self.presence(member)
+        presence.status = 'sick'
+        presence.save(update_fields=['status', 'updated'])
+
+        self.buffer.flush()
+
+        flushed = self.presence(member)
+        self.assertEqual(flushed.status, 'sick')
+        self.assertFalse(flushed.online)
+        self.assertEqual(flushed.updated, presence.updated)
+
+    def test_rows_are_written_in_one_statement_per_field_set(self):
+        for member in self.members:
+            self.buffer.update(member.pk, online=True)
+
+        with self.assertNumQueries(1):
+            self.assertEqual(self.buffer.flush(), 3)
+        self.assertEqual(MemberPresence.objects.filter(online=True).count(), 3)
+        self.assertEqual(self.buffer.flush(), 0)
+
+    def test_unbuffered_fields_are_rejected(self):
+        with self.assertRaises(ValueError):
+            self.buffer.update(self.members[0].pk, display_name='Nope')
+
+    def test_failed_flush_keeps_updates_without_overwriting_newer_ones(self):
+        member = self.members[0]
+        self.buffer.update(member.pk, status='meeting', online=True)
+
+        def fail(*args, **kwargs):
+            # a newer update arrives while the database write is failing
+            self.buffer.update(member.pk, status='sick')
+            raise DatabaseError('down')
+
+        with mock.patch.object(MemberPresence.objects, 'bulk_update', side_effect=fail):
+            with self.assertRaises(DatabaseError):
+                self.buffer.flush()
+
+        self.buffer.flush()
+        presence = self.presence(member)
+        self.assertEqual(presence.status, 'sick')
+        self.assertTrue(presence.online)
@@ -0,0 +1,79 @@
+import json
+from unittest.mock import patch
+
+import msgpack
+from django.urls import resolve
+from rest_framework import status
+
+from core.tests.base import BaseAPITestCaseAuthenticated
+from members.models import Team, Member
+from users.models import Profile
+
+MSGPACK = 'application/msgpack'
+
+
+class MessagePackNegotiationTests(BaseAPITestCaseAuthenticated):
+    def setUp(self):
+        super().setUp()
+        Profile.objects.create(user=self.user)
+        self.team = Team.objects.create(name='Packed Team', tid='TPACK0001')
+        Member.objects.create(user=self.user, team=self.team, display_name='Packed', role='admin')
+
+    def test_json_stays_the_default(self):
+        response = self.client.get(f'/api/teams/{self.team.tid}/members/')
+
+        self.assertEqual(response['Content-Type'], 'application/json')
+
+    def test_lists_are_rendered_when_accepted(self):
+        url = f'/api/teams/{self.team.tid}/members/'
+        expected = json.loads(self.client.get(url).content)
+
+        response = self.client.get(url, HTTP_ACCEPT=MSGPACK)
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response['Content-Type'], MSGPACK)
+        self.assertEqual(msgpack.unpackb(response.content), expected)
+
+    def test_format_query_parameter(self):
+        response = self.client.get('/api/profiles/me/', {'format': 'msgpack'})
+
+        self.assertEqual(response['Content-Type'], MSGPACK)
+        self.assertEqual(msgpack.unpackb(response.content)['user'], self.user.id)
+
+    def test_bodies_are_parsed(self):
+        response = self.client.post(
+            '/api/teams/', msgpack.packb({'name': 'Packed Team 2'}), content_type=MSGPACK, HTTP_ACCEPT=MSGPACK,
+        )
+
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+        self.assertEqual(msgpack.unpackb(response.content)['name'], 'Packed Team 2')
+
+    @patch('invitations.tasks.send_member_invite_email.delay')
+    def test_async_invitation_views_negotiate(self, mock_send_email):
+        payload = {
+            'tid': self.team.tid,
+            'invitee_email': 'packed@example.com',
+            'invited_by': self.user.id,
+            'role': 'member',
+            'url': 'https://example.com/accept-invite',
+        }
+
+        response = self.client.post(
+            '/api/invitations/send-invite/', msgpack.packb(payload), content_type=MSGPACK, HTTP_ACCEPT=MSGPACK,
+        )
+
+        self.assertEqual(response.status_code, status.HTTP_202_ACCEPTED)
+        self.assertEqual(msgpack.unpackb(response.content)['detail'], 'Invitation email is being sent.')
+
+    def test_invalid_body_is_rejected(self):
+        response = self.client.post('/api/teams/', b'\xc1', content_type=MSGPACK)
+
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+
+    def test_every_route_offers_msgpack(self):
+        for path in (
+            '/api/users/teams/', '/api/teams/', f'/api/teams/{self.team.tid}/members/presence/',
+            '/api/profiles/me/', '/api/jwt/create/', '/api/logout/', '/api/invitations/accept-invite/',
+        ):
+            view = resolve(path).func
+            self.assertIn('msgpack', [renderer.format for renderer in view.initkwargs['renderer_classes']], path)
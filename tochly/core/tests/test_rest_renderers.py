@@ -0,0 +1,120 @@
+import json
+import uuid
+from datetime import date, datetime, time, timedelta, timezone
+from decimal import Decimal
+from io import BytesIO, StringIO
+
+from django.core.management import call_command
+from django.test import SimpleTestCase, override_settings
+from django.utils.translation import gettext_lazy
+from rest_framework.exceptions import ParseError
+from rest_framework.parsers import JSONParser
+from rest_framework.renderers import JSONRenderer
+from rest_framework.settings import api_settings
+from rest_framework.utils.serializer_helpers import ReturnDict
+
+from common.rest.parsers import MessagePackParser, ORJSONParser
+from common.rest.renderers import MessagePackRenderer, ORJSONRenderer
+from core.management.commands.bench_renderers import member_payload
+
+
+class ORJSONRendererTests(SimpleTestCase):
+    def assertRendersLikeDRF(self, data, accepted_media_type=None, renderer_context=None):
+        self.assertEqual(
+            ORJSONRenderer().render(data, accepted_media_type, renderer_context),
+            JSONRenderer().render(data, accepted_media_type, renderer_context),
+        )
+
+    def test_member_pages_render_identically(self):
+        self.assertRendersLikeDRF(member_payload(20))
+
+    def test_value_types_render_identically(self):
+        self.assertRendersLikeDRF(ReturnDict({
+            'utc': datetime(2024, 1, 2, 3, 4, 5, 678901, tzinfo=timezone.utc),
+            'offset': datetime(2024, 1, 2, 3, 4, 5, tzinfo=timezone(timedelta(hours=2))),
+            'naive': datetime(2024, 1, 2, 3, 4, 5),
+            'day': date(2024, 1, 2),
+            'at': time(3, 4, 5, 6),
+            'ttl': timedelta(days=1, seconds=2),
+            'amount': Decimal('10.50'),
+            'id': uuid.UUID('12345678-1234-5678-1234-567812345678'),
+            'lazy': gettext_lazy('Not found.'),
+            'pair': (1, 'ü'),
+            'ids': {3: 'int key'},
+            'separators': 'a b c',
+            'nested': [{'key': None}, True, 1.5],
+        }, serializer=None))
+
+    def test_floats_render_identically(self):
+        self.assertRendersLikeDRF({'floats': [0.0, -0.0, 0.1, 1 / 3, 1e-4, 123456.789, 1e15, 9999999999999998.0]})
+        self.assertRendersLikeDRF({'big': 1e16, 'small': 1.5e-7, 'negative': -2.5e300})
+
+    @override_settings(REST_FRAMEWORK={'COERCE_DECIMAL_TO_STRING': False})
+    def test_decimals_coerced_to_floats_render_identically(self):
+        self.assertRendersLikeDRF({'amounts': [Decimal('10.50'), Decimal('1E+20'), Decimal('0.000001')]})
+
+    def test_non_finite_floats_raise_like_drf(self):
+        for value in (float('nan'), float('inf'), float('-inf')):
+            with self.assertRaises(ValueError):
+                ORJSONRenderer().render({'value': value})
+
+    def test_indented_output_falls_back_to_drf(self):
+        self.assertRendersLikeDRF({'a': [1, 2]}, 'application/json; indent=4')
+
+    def test_data_orjson_cannot_encode_falls_back_to_drf(self):
+        self.assertRendersLikeDRF({'big': 2 ** 70})
+        with self.assertRaises(TypeError):
+            ORJSONRenderer().render({'unknown': object()})
+
+    def test_none_renders_empty(self):
+        self.assertEqual(ORJSONRenderer().render(None), b'')
+
+    def test_configured_by_default(self):
+        self.assertEqual(api_settings.DEFAULT_RENDERER_CLASSES[0], ORJSONRenderer)
+        self.assertEqual(api_settings.DEFAULT_PARSER_CLASSES[0], ORJSONParser)
+
+
+class ORJSONParserTests(SimpleTestCase):
+    def parse(self, body, encoding='utf-8'):
+        return ORJSONParser().parse(BytesIO(body), parser_context={'encoding': encoding})
+
+    def test_parses_like_drf(self):
+        body = '{"name": "Tëam", "ids": [1, 2.5, null, true], "big": 123456789012345678901234567890}'.encode()
+        self.assertEqual(self.parse(body), JSONParser().parse(BytesIO(body)))
+
+    def test_other_encodings_are_decoded_by_drf(self):
+        self.assertEqual(self.parse('{"name": "Tëam"}'.encode('latin-1'), 'latin-1'), {'name': 'Tëam'})
+
+    def test_invalid_json_raises_drf_parse_error(self):
+        for body in (b'{"name": ', b'{"value": NaN}'):
+            with self.assertRaisesMessage(ParseError, 'JSON parse error'):
+                self.parse(body)
+
+
+class MessagePackTests(SimpleTestCase):
+    def test_carries_the_same_data_as_json(self):
+        data = member_payload(5)
+        data[0]['created_at'] = datetime(2024, 1, 2, 3, 4, 5, tzinfo=timezone.utc)
+        data[0]['amount'] = Decimal('10.50')
+
+        body = MessagePackRenderer().render(data)
+
+        self.assertEqual(MessagePackParser().parse(BytesIO(body)), json.loads(JSONRenderer().render(data)))
+        self.assertLess(len(body), len(JSONRenderer().render(data)))
+
+    def test_none_renders_empty(self):
+        self.assertEqual(MessagePackRenderer().render(None), b'')
+
+    def test_invalid_body_raises_parse_error(self):
+        for body in (b'', b'\xc1', b'\x81\x91\x01\x01'):
+            with self.assertRaisesMessage(ParseError, 'MessagePack parse error'):
+                MessagePackParser().parse(BytesIO(body))
+
+
+class BenchRenderersCommandTests(SimpleTestCase):
+    def test_reports_every_format(self):
+        out = StringIO()
+        call_command('bench_renderers', rows=5, repeat=2, stdout=out)
+        self.assertIn('orjson', out.getvalue())
+        self.assertIn('msgpack', out.getvalue())
+        self.assertNotIn('DATA DIFFERS', out.getvalue())
@@ -0,0 +1,45 @@
+import importlib
+import os
+from unittest.mock import mock_open, patch
+
+from django.test import SimpleTestCase
+
+from tochly import server
+
+
+class ServerConfigTests(SimpleTestCase):
+    def test_io_workload_runs_threaded_workers(self):
+        self.assertEqual(server.worker_sizing(4, 'io'), (9, 4))
+
+    def test_cpu_workload_runs_a_worker_per_core(self):
+        self.assertEqual(server.worker_sizing(4, 'cpu'), (5, 1))
+
+    def test_cgroup_quota_caps_available_cores(self):
+        with patch('os.sched_getaffinity', return_value=set(range(16))), \
+                patch('builtins.open', mock_open(read_data='250000 100000\n')):
+            self.assertEqual(server.available_cores(), 3)
+
+    def test_unlimited_cgroup_uses_affinity(self):
+        with patch('os.sched_getaffinity', return_value=set(range(16))), \
+                patch('builtins.open', mock_open(read_data='max 100000\n')):
+            self.assertEqual(server.available_cores(), 16)
+
+    def test_asgi_interface_runs_uvicorn_workers(self):
+        self.addCleanup(importlib.reload, server)
+        with patch.dict(os.environ, {'SERVER_INTERFACE': 'asgi'}):
+            importlib.reload(server)
+
+        self.assertEqual(server.wsgi_app, 'tochly.asgi:application')
+        self.assertEqual(server.worker_class, 'uvicorn_worker.UvicornWorker')
+
+    def test_asgi_closes_database_connections_after_each_request(self):
+        from tochly import settings as project_settings
+
+        self.addCleanup(importlib.reload, project_settings)
+        with patch.dict(os.environ, {'SERVER_INTERFACE': 'asgi', 'DB_POOL_MODE': 'persistent'}):
+            importlib.reload(project_settings)
+        self.assertEqual(project_settings.DATABASES['default']['CONN_MAX_AGE'], 0)
+
+        with patch.dict(os.environ, {'SERVER_INTERFACE': 'wsgi', 'DB_POOL_MODE': 'persistent'}):
+            importlib.reload(project_settings)
+        self.assertGreater(project_settings.DATABASES['default']['CONN_MAX_AGE'], 0)
@@ -0,0 +1,46 @@
+from concurrent.futures import ThreadPoolExecutor
+from urllib.parse import urlparse, parse_qs
+
+from botocore.stub import Stubber
+from django.test import SimpleTestCase, override_settings
+
+from common.storage import get_storage
+from common.storage.memory import InMemoryStorage
+from common.storage.s3 import S3Storage
+
+
+class S3StorageTests(SimpleTestCase):
+    def test_client_is_built_once_and_shared_across_threads(self):
+        storage = S3Storage()
+        with ThreadPoolExecutor(max_workers=4) as pool:
+            clients = set(pool.map(lambda _: id(storage.client), range(20)))
+        self.assertEqual(len(clients), 1)
+
+    def test_presigned_url_is_signed_locally_for_the_key(self):
+        storage = S3Storage()
+        url = urlparse(storage.presigned_put_url('profile_pictures/a.jpg', expires_in=60))
+
+        self.assertTrue(url.path.endswith('profile_pictures/a.jpg'))
+        query = parse_qs(url.query)
+        self.assertEqual(query['X-Amz-Expires'], ['60'])
+        self.assertIn('X-Amz-Signature', query)
+
+    def test_missing_keys_raise_key_error(self):
+        storage = S3Storage()
+        with Stubber(storage.client) as stubber:
+            stubber.add_client_error('get_object', service_error_code='NoSuchKey', http_status_code=404)
+            with self.assertRaises(KeyError):
+                storage.get('profile_pictures/gone.jpg')
+
+    def test_key_from_url_roundtrips(self):
+        storage = S3Storage()
+        self.assertEqual(storage.key_from_url(storage.url('profile_pictures/a.jpg')), 'profile_pictures/a.jpg')
+
+
+class GetStorageTests(SimpleTestCase):
+    def test_returns_a_process_wide_instance(self):
+        self.assertIs(get_storage(), get_storage())
+
+    @override_settings(STORAGE_BACKEND='common.storage.memory.InMemoryStorage')
+    def test_backend_is_swappable(self):
+        self.assertIsInstance(get_storage(), InMemoryStorage)
@@ -0,0 +1,31 @@
+from typing import Literal
+from urllib.parse import urlsplit
+
+from django.conf import settings
+
+from pydantic_core import PydanticCustomError
+from pydantic import BaseModel, Field, field_validator
+
+
+class SubRequestValidator(BaseModel):
+    method: Literal['GET'] = 'GET'
+    path: str = Field(..., max_length=500)
+
+    @field_validator('path')
+    def validate_route_allowed(cls, v):
+        path = urlsplit(v).path
+        if not any(path.startswith(prefix) for prefix in settings.BATCH_ROUTES):
+            raise PydanticCustomError('route_not_batchable', f'{path} can not be batched')
+        return v
+
+
+class BatchRequestValidator(BaseModel):
+    requests: list[SubRequestValidator] = Field(..., min_length=1)
+
+    @field_validator('requests')
+    def validate_batch_size(cls, v):
+        if len(v) > settings.BATCH_MAX_REQUESTS:
+            raise PydanticCustomError(
+                'batch_too_large', f'Batches are limited to {settings.BATCH_MAX_REQUESTS} requests',
+            )
+        return v
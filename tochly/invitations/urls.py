@@ -1,7 +1,9 @@
 from django.urls import path
+
+from common.rest.negotiation import offer_msgpack
 from .views import SendMemberInviteView, AcceptMemberInviteView
 
-urlpatterns = [
+urlpatterns = offer_msgpack([
     path('send-invite/', SendMemberInviteView.as_view(), name='send-invite'),
     path('accept-invite/', AcceptMemberInviteView.as_view(), name='accept-invite'),
-]
+])
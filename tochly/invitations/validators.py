@@ -12,6 +12,7 @@ from pydantic import (
 )
 
 from members.models import Team, Member
+from members.partitioning import team_id_for
 
 def validate_team_exists(tid: str) -> str:
     if not Team.objects.filter(tid=tid).exists():
@@ -50,7 +51,7 @@ class SendInviteRequestValidator(BaseModel):
     def validate_invitee_not_member(self):
         if Member.objects.filter(
             user__email=self.invitee_email,
-            team__tid=self.tid
+            team_id=team_id_for(self.tid),
         ).exists():
             raise PydanticCustomError('cannot_invite_a_member', 'Invitee is already a team member')
         return self
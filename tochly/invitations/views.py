@@ -1,4 +1,5 @@
 import jwt
+from asgiref.sync import sync_to_async
 from datetime import datetime, timedelta
 
 from django.conf import settings
@@ -10,6 +11,8 @@ from django.http import Http404
 from rest_framework.views import APIView
 from rest_framework.response import Response
 from rest_framework import status
+from adrf.shortcuts import aget_object_or_404
+from adrf.views import APIView as AsyncAPIView
 
 from pydantic import ValidationError
 
@@ -19,10 +22,11 @@ from invitations.validators import SendInviteRequestValidator, AcceptInviteValid
 
 User = get_user_model()
 
-class SendMemberInviteView(APIView):
-    def post(self, request):
+class SendMemberInviteView(AsyncAPIView):
+    async def post(self, request):
         try:
-            validated_data = SendInviteRequestValidator.model_validate(request.data)
+            # the validators query the team and inviter through the sync ORM
+            validated_data = await sync_to_async(SendInviteRequestValidator.model_validate)(request.data)
             expire = datetime.now(timezone.utc) + timedelta(hours=24)
             invitation_data = {
                 'tid': validated_data.tid,
@@ -34,9 +38,11 @@ class SendMemberInviteView(APIView):
             }
             token = jwt.encode(invitation_data, settings.SECRET_KEY, algorithm='HS256')
 
-            team = get_object_or_404(Team, tid=validated_data.tid)
+            team = await aget_object_or_404(Team, tid=validated_data.tid)
             invite_link = f'{validated_data.url}?token={token}'
-            send_member_invite_email.delay(validated_data.invitee_email, team.name, invite_link)
+            await sync_to_async(send_member_invite_email.delay)(
+                validated_data.invitee_email, team.name, invite_link,
+            )
             return Response(
                 {'detail': 'Invitation email is being sent.'}, 
                 status=status.HTTP_202_ACCEPTED
@@ -1,7 +1,7 @@
 from django.contrib import admin
 
 from members.models import Team
-from members.models import Member
+from members.models import Member, MemberPresence
 
 
 @admin.register(Team)
@@ -10,8 +10,13 @@ class TeamAdmin(admin.ModelAdmin):
     list_filter = ('created', 'updated')
     search_fields = ('name',)
 
+class MemberPresenceInline(admin.StackedInline):
+    model = MemberPresence
+
+
 @admin.register(Member)
 class MemberAdmin(admin.ModelAdmin):
+    inlines = (MemberPresenceInline,)
     list_display = (
         'user', 
         'team',
@@ -22,5 +27,7 @@ class MemberAdmin(admin.ModelAdmin):
         'status', 
         'profile_picture_url',
     )
+    # online and status are read from the presence row
+    list_select_related = ('user', 'team', 'presence')
     list_filter = ('created', 'updated')
     search_fields = ('display_name', 'title')
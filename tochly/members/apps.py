@@ -4,3 +4,11 @@ from django.apps import AppConfig
 class MembersConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'members'
+
+    def ready(self):
+        from . import signals
+        from common.cache.querysets import track
+        from members.models import Team, Member
+
+        track(Team, scopes=('id',))
+        track(Member, scopes=('team_id', 'user_id'))
@@ -0,0 +1,26 @@
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+from django.db import DEFAULT_DB_ALIAS, connections
+
+from members.partitioning import COPY_BATCH_SIZE, is_partitioned, partition_members
+
+
+class Command(BaseCommand):
+    help = 'Hash partition the members table by team, copying existing rows online.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--partitions', type=int, default=settings.MEMBER_PARTITIONS)
+        parser.add_argument('--batch-size', type=int, default=COPY_BATCH_SIZE)
+        parser.add_argument('--database', default=DEFAULT_DB_ALIAS)
+
+    def handle(self, *args, **options):
+        connection = connections[options['database']]
+        if connection.vendor != 'postgresql':
+            raise CommandError('Partitioning needs PostgreSQL.')
+        if is_partitioned(connection):
+            self.stdout.write('The members table is already partitioned.')
+            return
+        if options['partitions'] < 2:
+            raise CommandError('Pass --partitions 2 or more, or set DB_MEMBER_PARTITIONS.')
+
+        partition_members(connection, options['partitions'], options['batch_size'], log=self.stdout.write)
@@ -0,0 +1,18 @@
+# Generated by Django 4.2.7 on 2026-10-19 01:46
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('members', '0012_alter_member_unique_together'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='member',
+            name='profile_picture_variants',
+            field=models.JSONField(blank=True, default=dict),
+        ),
+    ]
@@ -0,0 +1,18 @@
+# Generated by Django 4.2.7 on 2026-10-19 01:50
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('members', '0013_member_profile_picture_variants'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='member',
+            name='profile_picture_url',
+            field=models.CharField(blank=True, db_index=True, max_length=200, null=True),
+        ),
+    ]
@@ -0,0 +1,22 @@
+from django.conf import settings
+from django.db import migrations
+
+from members.partitioning import partition_members
+
+
+def partition(apps, schema_editor):
+    partition_members(schema_editor.connection, settings.MEMBER_PARTITIONS)
+
+
+class Migration(migrations.Migration):
+    # every copy batch commits on its own so the table stays writable
+    atomic = False
+
+    dependencies = [
+        ('members', '0014_member_profile_picture_url_index'),
+    ]
+
+    operations = [
+        # the earlier migrations work on either layout, so reversing leaves it as is
+        migrations.RunPython(partition, migrations.RunPython.noop),
+    ]
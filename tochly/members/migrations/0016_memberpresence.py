@@ -0,0 +1,42 @@
+# Generated by Django 4.2.7 on 2026-10-19 02:19
+
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('members', '0015_partition_member_table'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='MemberPresence',
+            fields=[
+                ('member', models.OneToOneField(db_constraint=False, on_delete=django.db.models.deletion.CASCADE, primary_key=True, related_name='presence', serialize=False, to='members.member')),
+                ('online', models.BooleanField(default=False)),
+                ('status', models.CharField(blank=True, choices=[('', ''), ('meeting', 'In a Meeting'), ('commuting', 'Commuting'), ('remote', 'Working Remotely'), ('sick', 'Sick'), ('leave', 'In Leave')], default='', max_length=20, null=True)),
+                ('updated', models.DateTimeField(auto_now=True)),
+            ],
+        ),
+        # room on every page for the next version of a row, so updates stay heap-only
+        migrations.RunSQL(
+            'ALTER TABLE members_memberpresence SET (fillfactor = 50)',
+            'ALTER TABLE members_memberpresence RESET (fillfactor)',
+        ),
+        migrations.RunSQL(
+            'INSERT INTO members_memberpresence (member_id, online, status, updated) '
+            'SELECT id, online, status, updated FROM members_member',
+            'UPDATE members_member SET online = p.online, status = p.status '
+            'FROM members_memberpresence p WHERE p.member_id = members_member.id',
+        ),
+        migrations.RemoveField(
+            model_name='member',
+            name='online',
+        ),
+        migrations.RemoveField(
+            model_name='member',
+            name='status',
+        ),
+    ]
@@ -0,0 +1,23 @@
+# Generated by Django 4.2.7 on 2026-10-19 02:26
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('members', '0016_memberpresence'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='team',
+            name='members_count',
+            field=models.PositiveIntegerField(default=0),
+        ),
+        migrations.RunSQL(
+            'UPDATE members_team SET members_count = '
+            '(SELECT count(*) FROM members_member WHERE members_member.team_id = members_team.id)',
+            migrations.RunSQL.noop,
+        ),
+    ]
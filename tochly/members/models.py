@@ -10,6 +10,8 @@ class Team(models.Model):
         max_length=10, unique=True, db_index=True, default=generate_team_id,
     )
     description = models.TextField(blank=True, null=True)
+    # maintained by members.signals so team lists need not count members
+    members_count = models.PositiveIntegerField(default=0)
     created = models.DateTimeField(auto_now_add=True)
     updated = models.DateTimeField(auto_now=True)
 
@@ -47,23 +49,68 @@ class Member(models.Model):
     phone_number = models.CharField(
         max_length=15, blank=True, null=True, unique=True, db_index=True,
     )
-    online = models.BooleanField(default=False)
-    status = models.CharField(
-        max_length=20, 
-        choices=STATUS_OPTIONS, 
-        default='', 
-        blank=True, 
-        null=True,
-    )
+    # indexed so content addressed pictures can be reference counted
     profile_picture_url = models.CharField(
-        max_length=200, blank=True, null=True
+        max_length=200, blank=True, null=True, db_index=True,
     )
+    profile_picture_variants = models.JSONField(default=dict, blank=True)
     created = models.DateTimeField(auto_now_add=True)
     updated = models.DateTimeField(auto_now=True)
 
+    # kept on MemberPresence, which is updated far more often than the member
+    PRESENCE_FIELDS = ('online', 'status')
+
     class Meta:
         unique_together = ('user', 'team')
 
+    def get_presence(self):
+        try:
+            return self.presence
+        except MemberPresence.DoesNotExist:
+            self.presence = MemberPresence(member=self)
+            return self.presence
+
+    @property
+    def online(self):
+        return self.get_presence().online
+
+    @online.setter
+    def online(self, value):
+        self.get_presence().online = value
+        self._presence_changed = True
+
+    @property
+    def status(self):
+        return self.get_presence().status
+
+    @status.setter
+    def status(self, value):
+        self.get_presence().status = value
+        self._presence_changed = True
+
+    def save(self, *args, **kwargs):
+        """
+        Saves presence fields to ``MemberPresence``. When ``update_fields``
+        only names presence fields the member row is not written at all.
+        """
+        update_fields = kwargs.get('update_fields')
+        presence_fields = list(self.PRESENCE_FIELDS)
+        if update_fields is not None:
+            presence_fields = [field for field in update_fields if field in self.PRESENCE_FIELDS]
+            kwargs['update_fields'] = [field for field in update_fields if field not in self.PRESENCE_FIELDS]
+
+        adding = self._state.adding
+        if update_fields is None or kwargs['update_fields']:
+            super().save(*args, **kwargs)
+
+        if adding or (presence_fields and getattr(self, '_presence_changed', False)):
+            presence = self.get_presence()
+            if presence._state.adding:
+                presence.save()
+            else:
+                presence.save(update_fields=[*presence_fields, 'updated'])
+            self._presence_changed = False
+
     @property
     def full_name(self):
         return f'{self.user.first_name} {self.user.last_name}'
@@ -74,3 +121,28 @@ class Member(models.Model):
     
     def __str__(self):
         return self.tid
+
+
+class MemberPresence(models.Model):
+    """
+    The frequently changing state of a member. The row is narrow and none of
+    the changing columns are indexed, so status flips are heap-only updates
+    that leave the member row and its indexes alone.
+    """
+    # the members table may be partitioned, where ids alone can't be referenced
+    member = models.OneToOneField(
+        Member,
+        primary_key=True,
+        related_name='presence',
+        on_delete=models.CASCADE,
+        db_constraint=False,
+    )
+    online = models.BooleanField(default=False)
+    status = models.CharField(
+        max_length=20,
+        choices=Member.STATUS_OPTIONS,
+        default='',
+        blank=True,
+        null=True,
+    )
+    updated = models.DateTimeField(auto_now=True)
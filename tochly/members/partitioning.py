@@ -0,0 +1,199 @@
+"""
+Optional hash partitioning of ``members_member`` by ``team_id``.
+
+With ``MEMBER_PARTITIONS`` (``DB_MEMBER_PARTITIONS``) set to 2 or more,
+migration 0015 turns the table into ``MEMBER_PARTITIONS`` hash partitions,
+and ``manage.py partition_members`` does the same on a database that is
+already migrated. Queries filtering on ``team_id`` then only touch the
+partition holding that team, and each partition is vacuumed on its own.
+
+The table is converted online: the rows are copied into a partitioned
+shadow table in short batches while a trigger mirrors concurrent writes,
+then the tables are swapped in one short transaction.
+
+Postgres requires unique constraints on a partitioned table to contain the
+partition key, so the primary key becomes ``(id, team_id)`` and the unique
+phone number is only enforced per team by the database. Serializers still
+validate that phone numbers are unique across teams.
+"""
+from django.db import transaction
+from django.db.models import Subquery
+
+from members.models import Member, Team
+
+TABLE = Member._meta.db_table
+SHADOW = f'{TABLE}_partitioned'
+PARTITION_KEY = 'team_id'
+COPY_BATCH_SIZE = 5000
+
+
+def team_id_for(tid):
+    """``team_id`` of the team ``tid`` as a subquery, which still lets Postgres prune partitions."""
+    return Subquery(Team.objects.filter(tid=tid).values('id')[:1])
+
+
+def is_partitioned(connection):
+    if connection.vendor != 'postgresql':
+        return False
+    with connection.cursor() as cursor:
+        cursor.execute('SELECT relkind FROM pg_class WHERE oid = to_regclass(%s)', [TABLE])
+        row = cursor.fetchone()
+    return row is not None and row[0] == 'p'
+
+
+def partition_members(connection, partitions, batch_size=COPY_BATCH_SIZE, log=None):
+    """Convert ``members_member`` into ``partitions`` hash partitions, returning whether it did."""
+    if connection.vendor != 'postgresql' or partitions < 2 or is_partitioned(connection):
+        return False
+    log = log or (lambda message: None)
+
+    with transaction.atomic(using=connection.alias), connection.cursor() as cursor:
+        renames = _create_shadow(cursor, partitions)
+        _create_sync_trigger(cursor)
+    log(f'Created {partitions} partitions, copying rows')
+
+    copied = _copy_rows(connection, batch_size, log)
+
+    with transaction.atomic(using=connection.alias), connection.cursor() as cursor:
+        _swap(cursor, renames)
+    log(f'Swapped in the partitioned table after copying {copied} rows')
+    return True
+
+
+def _columns(cursor):
+    cursor.execute(
+        'SELECT attname FROM pg_attribute WHERE attrelid = %s::regclass AND attnum > 0 '
+        'AND NOT attisdropped ORDER BY attnum',
+        [TABLE],
+    )
+    return [row[0] for row in cursor.fetchall()]
+
+
+def _temporary_name(name):
+    return f'{name[:58]}_part'
+
+
+def _create_shadow(cursor, partitions):
+    """Create the partitioned copy of the table, returning the index and constraint renames for the swap."""
+    cursor.execute(
+        f'CREATE TABLE {SHADOW} (LIKE {TABLE} INCLUDING DEFAULTS INCLUDING CONSTRAINTS) '
+        f'PARTITION BY HASH ({PARTITION_KEY})'
+    )
+    for remainder in range(partitions):
+        cursor.execute(
+            f'CREATE TABLE {TABLE}_p{remainder} PARTITION OF {SHADOW} '
+            f'FOR VALUES WITH (MODULUS {partitions}, REMAINDER {remainder})'
+        )
+
+    # identity columns can't be added to partitioned tables, ids come from a plain sequence
+    cursor.execute(f"SELECT pg_get_serial_sequence('{TABLE}', 'id')")
+    sequence = cursor.fetchone()[0]
+    cursor.execute(f'CREATE SEQUENCE {SHADOW}_id_seq OWNED BY {SHADOW}.id')
+    cursor.execute(f"ALTER TABLE {SHADOW} ALTER COLUMN id SET DEFAULT nextval('{SHADOW}_id_seq')")
+
+    renames = {'sequences': [(f'{SHADOW}_id_seq', sequence.split('.')[-1])], 'constraints': [], 'indexes': []}
+
+    cursor.execute(
+        'SELECT conname, contype, pg_get_constraintdef(oid), '
+        'ARRAY(SELECT attname FROM unnest(conkey) AS k JOIN pg_attribute '
+        'ON attrelid = conrelid AND attnum = k ORDER BY array_position(conkey, k)) '
+        "FROM pg_constraint WHERE conrelid = %s::regclass AND contype IN ('p', 'u', 'f')",
+        [TABLE],
+    )
+    for name, kind, definition, columns in cursor.fetchall():
+        temporary = _temporary_name(name)
+        if kind == 'f':
+            cursor.execute(f'ALTER TABLE {SHADOW} ADD CONSTRAINT {temporary} {definition}')
+        else:
+            if PARTITION_KEY not in columns:
+                columns.append(PARTITION_KEY)
+            cursor.execute(
+                f'ALTER TABLE {SHADOW} ADD CONSTRAINT {temporary} '
+                f'{"PRIMARY KEY" if kind == "p" else "UNIQUE"} ({", ".join(columns)})'
+            )
+        renames['constraints'].append((temporary, name))
+
+    # the remaining indexes are plain ones, recreate them on the partitioned table
+    cursor.execute(
+        'SELECT indexrelid::regclass::text, pg_get_indexdef(indexrelid) FROM pg_index '
+        'WHERE indrelid = %s::regclass AND NOT EXISTS (SELECT 1 FROM pg_constraint WHERE conindid = indexrelid)',
+        [TABLE],
+    )
+    for name, definition in cursor.fetchall():
+        temporary = _temporary_name(name)
+        create, _, rest = definition.partition(' ON ')
+        method = rest.split(' USING ', 1)[1]
+        cursor.execute(f'{create.rsplit(" ", 1)[0]} {temporary} ON {SHADOW} USING {method}')
+        renames['indexes'].append((temporary, name))
+    return renames
+
+
+def _create_sync_trigger(cursor):
+    """Mirror writes made while the rows are copied into the shadow table."""
+    columns = _columns(cursor)
+    assignments = ', '.join(f'{column} = EXCLUDED.{column}' for column in columns)
+    cursor.execute(f'''
+        CREATE FUNCTION {SHADOW}_sync() RETURNS trigger AS $$
+        BEGIN
+            IF TG_OP IN ('UPDATE', 'DELETE') THEN
+                DELETE FROM {SHADOW} WHERE id = OLD.id AND {PARTITION_KEY} = OLD.{PARTITION_KEY};
+            END IF;
+            IF TG_OP IN ('INSERT', 'UPDATE') THEN
+                INSERT INTO {SHADOW} SELECT (NEW).*
+                ON CONFLICT (id, {PARTITION_KEY}) DO UPDATE SET {assignments};
+            END IF;
+            RETURN NULL;
+        END;
+        $$ LANGUAGE plpgsql
+    ''')
+    cursor.execute(
+        f'CREATE TRIGGER {SHADOW}_sync AFTER INSERT OR UPDATE OR DELETE ON {TABLE} '
+        f'FOR EACH ROW EXECUTE FUNCTION {SHADOW}_sync()'
+    )
+
+
+def _copy_rows(connection, batch_size, log):
+    with connection.cursor() as cursor:
+        cursor.execute(f'SELECT coalesce(max(id), 0) FROM {TABLE}')
+        last_id = cursor.fetchone()[0]
+
+    copied = 0
+    for start in range(0, last_id, batch_size):
+        with transaction.atomic(using=connection.alias), connection.cursor() as cursor:
+            # locking the batch holds back writers racing it until the copy commits,
+            # so the trigger can't apply their change before the old row lands
+            cursor.execute(
+                f'INSERT INTO {SHADOW} SELECT * FROM {TABLE} WHERE id > %s AND id <= %s '
+                f'FOR SHARE ON CONFLICT DO NOTHING',
+                [start, start + batch_size],
+            )
+            copied += cursor.rowcount
+        log(f'Copied rows up to id {min(start + batch_size, last_id)} of {last_id}')
+    return copied
+
+
+def _swap(cursor, renames):
+    # deferred foreign key checks still queued on the old table would block dropping it
+    cursor.execute('SET CONSTRAINTS ALL IMMEDIATE')
+    cursor.execute(f'LOCK TABLE {TABLE} IN ACCESS EXCLUSIVE MODE')
+    cursor.execute(f'SELECT (SELECT count(*) FROM {TABLE}), (SELECT count(*) FROM {SHADOW})')
+    expected, found = cursor.fetchone()
+    if expected != found:
+        raise RuntimeError(f'{SHADOW} holds {found} rows, {TABLE} holds {expected}')
+
+    cursor.execute(f"SELECT last_value FROM {renames['sequences'][0][1]}")
+    last_value = cursor.fetchone()[0]
+    cursor.execute(
+        f"SELECT setval('{SHADOW}_id_seq', greatest(%s, (SELECT coalesce(max(id), 1) FROM {SHADOW})))",
+        [last_value],
+    )
+
+    cursor.execute(f'DROP TABLE {TABLE}')
+    cursor.execute(f'DROP FUNCTION {SHADOW}_sync()')
+    cursor.execute(f'ALTER TABLE {SHADOW} RENAME TO {TABLE}')
+    for temporary, name in renames['sequences']:
+        cursor.execute(f'ALTER SEQUENCE {temporary} RENAME TO {name}')
+    for temporary, name in renames['constraints']:
+        cursor.execute(f'ALTER TABLE {TABLE} RENAME CONSTRAINT {temporary} TO {name}')
+    for temporary, name in renames['indexes']:
+        cursor.execute(f'ALTER INDEX {temporary} RENAME TO {name}')
@@ -0,0 +1,18 @@
+from common.cache.querysets import invalidate
+from common.db.writebehind import WriteBehindBuffer
+from members.models import Member, MemberPresence
+
+
+def _invalidate_members(member_ids):
+    scopes = set(Member.objects.filter(pk__in=member_ids).values_list('team_id', 'user_id'))
+    for team_id, user_id in scopes:
+        invalidate(Member, team_id=team_id, user_id=user_id)
+
+
+# status flips and online pings are written to Postgres in batches by flush_presence
+presence_buffer = WriteBehindBuffer(
+    MemberPresence,
+    fields=Member.PRESENCE_FIELDS,
+    touch='updated',
+    on_flush=_invalidate_members,
+)
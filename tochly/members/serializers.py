@@ -1,23 +1,91 @@
 from django.contrib.auth import get_user_model
+from django.db import models
+from django.db.models import F, Window
+from django.db.models.functions import RowNumber
 from rest_framework import serializers
 
+from common.cache.fragments import FragmentCacheMixin, FragmentCacheListSerializer
+from common.rest.sparse import SparseFieldsetsMixin
 from users.serializers import ProfileSerializer, CustomUserCreateSerializer
 from members.models import Team, Member
 
 User = get_user_model()
 
-class TeamSerializer(serializers.ModelSerializer):
+# most member avatars a team preview may ask for with ?preview=
+MEMBER_PREVIEW_MAX = 10
+MEMBER_PREVIEW_SIZE = '64'
+
+
+def member_previews(team_ids, count):
+    """Return the first ``count`` members of every team in ``team_ids`` with one window query."""
+    rows = Member.objects.filter(team_id__in=team_ids).annotate(
+        position=Window(RowNumber(), partition_by=F('team_id'), order_by=F('id').asc()),
+    ).filter(position__lte=count).order_by('team_id', 'position').values(
+        'team_id', 'id', 'display_name', 'profile_picture_url', 'profile_picture_variants',
+    )
+
+    previews = {}
+    for row in rows:
+        previews.setdefault(row.pop('team_id'), []).append({
+            'id': row['id'],
+            'display_name': row['display_name'],
+            'profile_picture_url': row['profile_picture_url'],
+            'profile_picture_variant': (row['profile_picture_variants'] or {}).get(MEMBER_PREVIEW_SIZE),
+        })
+    return previews
+
+
+class TeamListSerializer(serializers.ListSerializer):
+    """Fetches the member previews of a whole page of teams at once."""
+
+    def to_representation(self, data):
+        teams = list(data.all() if isinstance(data, models.manager.BaseManager) else data)
+        count = self.child.get_preview_count()
+        if count:
+            self.child.previews = member_previews([team.id for team in teams], count)
+        return super().to_representation(teams)
+
+
+class TeamSerializer(SparseFieldsetsMixin, serializers.ModelSerializer):
+    previews = None
 
     class Meta:
         model = Team
         fields = '__all__'
+        read_only_fields = ('members_count',)
+        list_serializer_class = TeamListSerializer
+        # role is annotated by UserTeamsListView
+        field_sources = {'role': ()}
+
+    def get_preview_count(self):
+        request = self.context.get('request')
+        preview = request.query_params.get('preview', '') if request else ''
+        return min(int(preview), MEMBER_PREVIEW_MAX) if preview.isdigit() else 0
 
+    def to_representation(self, instance):
+        data = super().to_representation(instance)
+        count = self.get_preview_count()
+        if count:
+            if self.previews is None:
+                self.previews = member_previews([instance.id], count)
+            data['members_preview'] = self.previews.get(instance.id, [])
+        return data
 
-class MemberSerializer(serializers.ModelSerializer):
+
+class UserTeamSerializer(TeamSerializer):
+    """A team of the requesting user, with their role in it."""
+    role = serializers.CharField(read_only=True)
+
+
+class MemberSerializer(SparseFieldsetsMixin, FragmentCacheMixin, serializers.ModelSerializer):
     user = serializers.SerializerMethodField()
     profile = serializers.SerializerMethodField(read_only=True)
     tid = serializers.SerializerMethodField(read_only=True)
     full_name = serializers.SerializerMethodField(read_only=True)
+    online = serializers.BooleanField(required=False)
+    status = serializers.ChoiceField(
+        choices=Member.STATUS_OPTIONS, required=False, allow_blank=True, allow_null=True,
+    )
 
     class Meta:
         model = Member
@@ -35,10 +103,43 @@ class MemberSerializer(serializers.ModelSerializer):
             'online',
             'status',
             'profile_picture_url',
+            'profile_picture_variants',
             'created',
             'updated',
         )
-        read_only_fields = ('id', 'team')
+        read_only_fields = ('id', 'team', 'profile_picture_variants')
+        list_serializer_class = FragmentCacheListSerializer
+        field_sources = {
+            'user': ('user',),
+            'profile': ('user__profile',),
+            'tid': ('team__tid',),
+            'full_name': ('user__first_name', 'user__last_name'),
+            'online': ('presence',),
+            'status': ('presence',),
+        }
+
+    def get_fragment_version(self, obj):
+        user = obj.user
+        return (
+            obj.updated,
+            obj.get_presence().updated,
+            obj.tid,
+            user.email,
+            user.first_name,
+            user.last_name,
+            user.timezone,
+            user.profile.updated,
+        )
+
+    def update(self, instance, validated_data):
+        for attr, value in validated_data.items():
+            setattr(instance, attr, value)
+        # presence only changes leave the member row untouched
+        update_fields = list(validated_data)
+        if set(update_fields) - set(Member.PRESENCE_FIELDS):
+            update_fields.append('updated')
+        instance.save(update_fields=update_fields)
+        return instance
 
     def get_user(self, obj):
         return CustomUserCreateSerializer(obj.user).data
@@ -51,3 +152,10 @@ class MemberSerializer(serializers.ModelSerializer):
     
     def get_full_name(self, obj):
         return obj.full_name
+
+
+class PresenceSerializer(serializers.Serializer):
+    online = serializers.BooleanField(required=False)
+    status = serializers.ChoiceField(
+        choices=Member.STATUS_OPTIONS, required=False, allow_blank=True, allow_null=True,
+    )
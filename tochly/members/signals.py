@@ -0,0 +1,52 @@
+from django.contrib.auth import get_user_model
+from django.db.models import F
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+
+from common.cache.querysets import invalidate
+from members.models import Member, MemberPresence, Team
+from users.models import Profile
+
+User = get_user_model()
+
+
+def _count_members(team_id, delta):
+    # a single UPDATE, so concurrent joins and leaves can't lose counts
+    Team.objects.filter(pk=team_id).update(members_count=F('members_count') + delta)
+    # per-user and per-team caches are keyed on the team's scope, so only they refresh
+    invalidate(Team, id=team_id)
+
+
+@receiver(post_save, sender=Member)
+def count_new_member(sender, instance, created, **kwargs):
+    if created:
+        _count_members(instance.team_id, 1)
+
+
+@receiver(post_delete, sender=Member)
+def count_removed_member(sender, instance, **kwargs):
+    _count_members(instance.team_id, -1)
+
+
+@receiver(post_save, sender=MemberPresence)
+def invalidate_member_querysets(sender, instance, **kwargs):
+    # presence is served as part of the member, whose row may not have been saved
+    member = instance.member
+    invalidate(Member, team_id=member.team_id, user_id=member.user_id)
+
+
+def _invalidate_memberships(user_id):
+    # member lists serve each member's user and profile under the team's scope
+    team_ids = list(Member.objects.filter(user_id=user_id).values_list('team_id', flat=True))
+    if team_ids:
+        invalidate(Member, team_id=team_ids, user_id=user_id)
+
+
+@receiver(post_save, sender=User)
+def invalidate_user_memberships(sender, instance, **kwargs):
+    _invalidate_memberships(instance.pk)
+
+
+@receiver([post_save, post_delete], sender=Profile)
+def invalidate_profile_memberships(sender, instance, **kwargs):
+    _invalidate_memberships(instance.user_id)
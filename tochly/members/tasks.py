@@ -0,0 +1,124 @@
+import logging
+from datetime import timedelta
+
+from celery import shared_task
+from PIL import Image, UnidentifiedImageError
+from django.conf import settings
+from django.utils import timezone
+
+from common.cache.querysets import invalidate
+from common.storage import get_storage
+from common.storage.s3 import DELETE_BATCH_SIZE
+from members.models import Member
+from members.presence import presence_buffer
+from members.utils.images import build_variants, sanitize
+from members.utils.profile_pictures import (
+    PROFILE_PICTURE_PREFIX,
+    queue_deletion,
+    pop_pending_deletions,
+    referenced_keys,
+    stored_keys,
+    variant_key,
+)
+
+logger = logging.getLogger(__name__)
+
+VARIANT_CACHE_CONTROL = 'public, max-age=31536000, immutable'
+
+
+@shared_task
+def process_profile_picture(member_id):
+    """Strip metadata from a member's upload and store resized variants next to it."""
+    member = Member.objects.filter(pk=member_id).only('profile_picture_url').first()
+    if member is None or not member.profile_picture_url:
+        return
+
+    storage = get_storage()
+    url = member.profile_picture_url
+    key = storage.key_from_url(url)
+    try:
+        original = storage.get(key)
+        sanitized, content_type = sanitize(original)
+        variants = list(build_variants(original))
+    except KeyError:
+        # replaced and deleted before this task ran
+        return
+    except (UnidentifiedImageError, Image.DecompressionBombError, ValueError, OSError):
+        logger.warning('Could not process profile picture %s', key, exc_info=True)
+        return
+
+    sharing = Member.objects.filter(profile_picture_url=url)
+    # writing a replaced picture back would leak it once its deletion has run
+    if not sharing.exists():
+        return
+
+    storage.put(key, sanitized, content_type)
+    urls = {}
+    for size, name, body, variant_type in variants:
+        name_key = variant_key(key, size, name)
+        storage.put(name_key, body, variant_type, cache_control=VARIANT_CACHE_CONTROL)
+        urls.setdefault(name, {})[str(size)] = storage.url(name_key)
+
+    # every membership sharing this picture gets the variants, unless all of
+    # them replaced it while this task was running
+    owners = list(sharing.values_list('team_id', 'user_id'))
+    if sharing.update(profile_picture_variants=urls, updated=timezone.now()):
+        for team_id, user_id in owners:
+            invalidate(Member, team_id=team_id, user_id=user_id)
+    else:
+        queue_deletion(*stored_keys(storage, url, urls))
+
+
+@shared_task
+def flush_profile_picture_deletions():
+    """Delete queued storage objects in multi-object batches."""
+    storage = get_storage()
+    deleted = 0
+    while True:
+        keys = pop_pending_deletions(DELETE_BATCH_SIZE)
+        if not keys:
+            return deleted
+
+        # content addressed pictures may have gained a member since being queued
+        keys = list(set(keys) - referenced_keys(storage, keys))
+        if not keys:
+            continue
+
+        try:
+            failed = storage.delete_many(keys)
+        except Exception:
+            queue_deletion(*keys)
+            raise
+
+        deleted += len(keys) - len(failed)
+        if failed:
+            # leave the rest for the next run instead of spinning on errors
+            queue_deletion(*failed)
+            return deleted
+
+
+@shared_task
+def reconcile_profile_pictures():
+    """Queue profile pictures no member references, e.g. uploads never completed."""
+    storage = get_storage()
+    cutoff = timezone.now() - timedelta(seconds=settings.PROFILE_PICTURE_ORPHAN_GRACE)
+    pictures = Member.objects.exclude(profile_picture_url__isnull=True).values_list(
+        'profile_picture_url', 'profile_picture_variants',
+    )
+    referenced = {
+        key for url, variants in pictures.iterator()
+        for key in stored_keys(storage, url, variants)
+    }
+
+    orphans = [
+        key for key, last_modified in storage.iter_objects(PROFILE_PICTURE_PREFIX)
+        if last_modified < cutoff and key not in referenced
+    ]
+    queue_deletion(*orphans)
+    return len(orphans)
+
+
+@shared_task
+def flush_presence():
+    """Write buffered presence updates to the database in bulk."""
+    return presence_buffer.flush()
@@ -4,7 +4,7 @@ from django.db import IntegrityError
 from django.contrib.auth import get_user_model
 from django.utils.timezone import make_aware
 
-from members.models import Team, Member
+from members.models import Team, Member, MemberPresence
 from datetime import datetime, timedelta
 
 
@@ -183,3 +183,45 @@ class MemberModelTest(TestCase):
             )
         
         self.assertIn('unique', str(context.exception).lower())
+
+
+class MemberPresenceTest(TestCase):
+    def setUp(self):
+        self.user = User.objects.create_user(email='presence@test.com', first_name='Pre', last_name='Sence')
+        self.team = Team.objects.create(name='Presence Team', tid='PRES1')
+        self.member = Member.objects.create(user=self.user, team=self.team, display_name='Presence', status='remote')
+
+    def test_presence_row_is_created_with_the_member(self):
+        presence = MemberPresence.objects.get(member=self.member)
+        self.assertFalse(presence.online)
+        self.assertEqual(presence.status, 'remote')
+
+    def test_presence_update_leaves_member_row_alone(self):
+        member = Member.objects.select_related('presence').get(pk=self.member.pk)
+        updated = member.updated
+        member.online = True
+        member.status = 'meeting'
+
+        with self.assertNumQueries(1):
+            member.save(update_fields=['online', 'status'])
+
+        member = Member.objects.get(pk=self.member.pk)
+        self.assertTrue(member.online)
+        self.assertEqual(member.status, 'meeting')
+        self.assertEqual(member.updated, updated)
+
+    def test_full_save_persists_presence(self):
+        self.member.display_name = 'Renamed'
+        self.member.status = 'sick'
+        self.member.save()
+
+        member = Member.objects.get(pk=self.member.pk)
+        self.assertEqual(member.display_name, 'Renamed')
+        self.assertEqual(member.status, 'sick')
+
+    def test_members_without_presence_read_defaults(self):
+        MemberPresence.objects.filter(member=self.member).delete()
+        member = Member.objects.get(pk=self.member.pk)
+
+        self.assertFalse(member.online)
+        self.assertEqual(member.status, '')
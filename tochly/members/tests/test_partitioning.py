@@ -0,0 +1,83 @@
+from unittest import mock
+
+from django.contrib.auth import get_user_model
+from django.db import IntegrityError, connection, transaction
+from django.test import TestCase
+
+from members import partitioning
+from members.models import Team, Member
+from members.partitioning import is_partitioned, partition_members, team_id_for
+
+User = get_user_model()
+
+
+class PartitionMembersTests(TestCase):
+    def setUp(self):
+        if is_partitioned(connection):
+            self.skipTest('DB_MEMBER_PARTITIONS already partitioned the test database')
+        self.users = [
+            User.objects.create_user(email=f'part{i}@example.com', first_name='Part', last_name=str(i))
+            for i in range(3)
+        ]
+        self.teams = [Team.objects.create(name=f'Partitioned Team {i}') for i in range(4)]
+        self.members = [
+            Member.objects.create(user=user, team=team, display_name=f'{user.last_name}-{team.id}')
+            for team in self.teams for user in self.users
+        ]
+
+    def test_rows_are_moved_into_partitions(self):
+        self.assertTrue(partition_members(connection, 4, batch_size=5))
+
+        self.assertTrue(is_partitioned(connection))
+        self.assertEqual(
+            sorted(Member.objects.values_list('id', 'team_id', 'display_name')),
+            sorted((member.id, member.team_id, member.display_name) for member in self.members),
+        )
+
+    def test_already_partitioned_table_is_left_alone(self):
+        partition_members(connection, 4)
+
+        self.assertFalse(partition_members(connection, 8))
+
+    def test_ids_and_constraints_survive(self):
+        partition_members(connection, 4)
+
+        member = Member.objects.create(user=User.objects.create_user(email='new@example.com'), team=self.teams[0])
+        self.assertGreater(member.id, max(member.id for member in self.members))
+        with self.assertRaises(IntegrityError), transaction.atomic():
+            Member.objects.create(user=self.users[0], team=self.teams[0], display_name='Duplicate')
+
+    def test_team_scoped_queries_prune_to_one_partition(self):
+        partition_members(connection, 4)
+        team = self.teams[0]
+
+        for queryset in (
+            Member.objects.filter(team=team),
+            Member.objects.filter(team_id=team_id_for(team.tid)),
+        ):
+            plan = queryset.explain(analyze=True)
+            # subqueries are pruned when the query runs, the other partitions are never executed
+            scanned = [
+                line for line in plan.splitlines()
+                if ' on members_member_p' in line and 'never executed' not in line
+            ]
+            self.assertEqual(len(scanned), 1, plan)
+
+    def test_writes_during_copy_are_kept(self):
+        copy_rows = partitioning._copy_rows
+        renamed, deleted = self.members[0], self.members[1]
+
+        def write_then_copy(*args):
+            Member.objects.filter(pk=renamed.pk).update(display_name='Renamed mid-copy')
+            Member.objects.filter(pk=deleted.pk).delete()
+            Member.objects.create(
+                user=User.objects.create_user(email='late@example.com'), team=self.teams[1], display_name='Late',
+            )
+            return copy_rows(*args)
+
+        with mock.patch.object(partitioning, '_copy_rows', side_effect=write_then_copy):
+            partition_members(connection, 4, batch_size=5)
+
+        self.assertEqual(Member.objects.get(pk=renamed.pk).display_name, 'Renamed mid-copy')
+        self.assertFalse(Member.objects.filter(pk=deleted.pk).exists())
+        self.assertTrue(Member.objects.filter(display_name='Late').exists())
@@ -1,5 +1,10 @@
+from unittest.mock import patch
+
 from django.test import TestCase
 from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from rest_framework.request import Request
+from rest_framework.test import APIRequestFactory
 
 from members.models import Team, Member
 from users.models import Profile
@@ -53,6 +58,68 @@ class TeamSerializerTest(TestCase):
         self.assertEqual(team.description, updated_data['description'])
 
 
+class TeamMembersCountTest(TestCase):
+    def setUp(self):
+        self.team = Team.objects.create(name='Counted Team')
+        self.users = [User.objects.create_user(email=f'counted{i}@example.com') for i in range(3)]
+
+    def test_count_follows_member_creation_and_deletion(self):
+        members = [Member.objects.create(user=user, team=self.team, display_name=str(user.id)) for user in self.users]
+        self.team.refresh_from_db()
+        self.assertEqual(self.team.members_count, 3)
+
+        members[0].delete()
+        self.team.refresh_from_db()
+        self.assertEqual(self.team.members_count, 2)
+
+    def test_count_is_read_only(self):
+        serializer = TeamSerializer(instance=self.team, data={'members_count': 100}, partial=True)
+        self.assertTrue(serializer.is_valid())
+        self.assertEqual(serializer.save().members_count, 0)
+
+
+class TeamMembersPreviewTest(TestCase):
+    def setUp(self):
+        self.factory = APIRequestFactory()
+        self.teams = [Team.objects.create(name=f'Preview Team {i}') for i in range(3)]
+        for team in self.teams:
+            for i in range(4):
+                user = User.objects.create_user(email=f'preview{team.id}-{i}@example.com')
+                Member.objects.create(
+                    user=user,
+                    team=team,
+                    display_name=f'{team.name} {i}',
+                    profile_picture_variants={'64': {'webp': f'https://cdn/{user.id}.webp'}},
+                )
+        self.teams = list(Team.objects.order_by('id'))
+
+    def serialize(self, query, **kwargs):
+        request = Request(self.factory.get('/', query))
+        return TeamSerializer(context={'request': request}, **kwargs).data
+
+    def test_page_of_previews_takes_one_query(self):
+        with self.assertNumQueries(1):
+            data = self.serialize({'preview': 2}, instance=self.teams, many=True)
+
+        for team, item in zip(self.teams, data):
+            self.assertEqual(item['members_count'], 4)
+            self.assertEqual(
+                [preview['display_name'] for preview in item['members_preview']],
+                [f'{team.name} 0', f'{team.name} 1'],
+            )
+        self.assertTrue(data[0]['members_preview'][0]['profile_picture_variant']['webp'].endswith('.webp'))
+
+    def test_single_team_preview_is_capped(self):
+        with patch('members.serializers.MEMBER_PREVIEW_MAX', 3):
+            data = self.serialize({'preview': 50}, instance=self.teams[0])
+        self.assertEqual(len(data['members_preview']), 3)
+
+    def test_preview_is_optional(self):
+        with self.assertNumQueries(0):
+            data = self.serialize({}, instance=self.teams, many=True)
+        self.assertNotIn('members_preview', data[0])
+
+
 class MemberSerializerTest(TestCase):
     def setUp(self):
         self.user = User.objects.create(
@@ -88,6 +155,7 @@ class MemberSerializerTest(TestCase):
         expected_fields = [
             'id', 'user', 'profile', 'team', 'role', 'display_name', 'title',
             'phone_number', 'online', 'status', 'profile_picture_url',
+            'profile_picture_variants',
             'created', 'updated', 'tid', 'full_name'
         ]
         self.assertEqual(set(serializer.data.keys()), set(expected_fields))
@@ -171,3 +239,53 @@ class MemberSerializerTest(TestCase):
         serializer = MemberSerializer(data=data)
         self.assertFalse(serializer.is_valid())
         self.assertIn('phone_number', serializer.errors)
+
+
+class MemberSerializerFragmentCacheTest(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.team = Team.objects.create(name='Fragment Team')
+        self.members = []
+        for i in range(3):
+            user = User.objects.create(email=f'fragment{i}@example.com', first_name='Frag', last_name=str(i))
+            Profile.objects.create(user=user)
+            self.members.append(Member.objects.create(user=user, team=self.team, display_name=f'Row {i}'))
+
+    def serialize(self):
+        queryset = Member.objects.filter(team=self.team).select_related('team', 'user__profile').order_by('id')
+        return MemberSerializer(queryset, many=True).data
+
+    def test_unchanged_rows_are_not_reserialized(self):
+        first = self.serialize()
+
+        with patch.object(MemberSerializer, 'to_representation', side_effect=AssertionError) as rendered:
+            second = self.serialize()
+
+        self.assertEqual(first, second)
+        rendered.assert_not_called()
+
+    def test_only_changed_rows_are_reserialized(self):
+        self.serialize()
+        self.members[1].display_name = 'Changed'
+        self.members[1].save()
+
+        rendered = []
+        to_representation = MemberSerializer.to_representation
+
+        def spy(serializer, instance):
+            rendered.append(instance.pk)
+            return to_representation(serializer, instance)
+
+        with patch.object(MemberSerializer, 'to_representation', spy):
+            data = self.serialize()
+
+        self.assertEqual(rendered, [self.members[1].pk])
+        self.assertEqual([row['display_name'] for row in data], ['Row 0', 'Changed', 'Row 2'])
+
+    def test_user_changes_refresh_the_fragment(self):
+        self.serialize()
+        user = self.members[0].user
+        user.first_name = 'Renamed'
+        user.save()
+
+        self.assertEqual(self.serialize()[0]['full_name'], 'Renamed 0')
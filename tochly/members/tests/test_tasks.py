@@ -0,0 +1,201 @@
+from datetime import timedelta
+from io import BytesIO
+from unittest.mock import patch
+
+from PIL import Image
+
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.test import TestCase, override_settings
+from django.utils import timezone
+
+from common.storage import get_storage
+from members.models import Team, Member
+from members.tasks import (
+    flush_profile_picture_deletions,
+    process_profile_picture,
+    reconcile_profile_pictures,
+)
+from members.utils.profile_pictures import queue_deletion
+
+User = get_user_model()
+
+
+@override_settings(STORAGE_BACKEND='common.storage.memory.InMemoryStorage')
+class ProfilePictureDeletionTaskTest(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.storage = get_storage()
+
+    def test_flush_deletes_queued_keys_in_batches(self):
+        keys = [f'profile_pictures/{i}.jpg' for i in range(1500)]
+        for key in keys:
+            self.storage.put(key, b'data')
+        queue_deletion(*keys)
+
+        self.assertEqual(flush_profile_picture_deletions(), 1500)
+        self.assertEqual(self.storage.objects, {})
+
+    def test_flush_requeues_failed_keys(self):
+        self.storage.put('profile_pictures/a.jpg', b'data')
+        queue_deletion('profile_pictures/a.jpg')
+        self.storage.delete_many = lambda keys: list(keys)
+
+        self.assertEqual(flush_profile_picture_deletions(), 0)
+        self.assertEqual(cache.spop('storage:pending_deletions', 10), {'profile_pictures/a.jpg'})
+
+
+@override_settings(STORAGE_BACKEND='common.storage.memory.InMemoryStorage')
+class ReconcileProfilePicturesTaskTest(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.storage = get_storage()
+        user = User.objects.create_user(email='gc@example.com')
+        team = Team.objects.create(name='GC Team')
+        Member.objects.create(
+            user=user,
+            team=team,
+            display_name='Kept',
+            profile_picture_url=self.storage.url('profile_pictures/kept.jpg'),
+        )
+
+    def put(self, key, age):
+        self.storage.put(key, b'data')
+        self.storage.objects[key]['last_modified'] = timezone.now() - age
+
+    def test_old_unreferenced_uploads_are_deleted(self):
+        self.put('profile_pictures/kept.jpg', timedelta(days=3))
+        self.put('profile_pictures/orphan.jpg', timedelta(days=3))
+        self.put('profile_pictures/in-flight.jpg', timedelta(minutes=1))
+        self.put('other/file.jpg', timedelta(days=3))
+
+        self.assertEqual(reconcile_profile_pictures(), 1)
+        flush_profile_picture_deletions()
+
+        self.assertEqual(
+            set(self.storage.objects),
+            {'profile_pictures/kept.jpg', 'profile_pictures/in-flight.jpg', 'other/file.jpg'},
+        )
+
+
+def make_jpeg(size=(400, 300)):
+    image = Image.new('RGB', size, (200, 10, 10))
+    exif = Image.Exif()
+    exif[0x0112] = 6  # orientation: rotate 90 degrees
+    exif[0x8825] = {2: (51.0, 30.0, 0.0)}  # GPS latitude
+    buffer = BytesIO()
+    image.save(buffer, format='JPEG', exif=exif)
+    return buffer.getvalue()
+
+
+@override_settings(STORAGE_BACKEND='common.storage.memory.InMemoryStorage')
+class ProcessProfilePictureTaskTest(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.storage = get_storage()
+        self.key = 'profile_pictures/avatar.jpg'
+        self.storage.put(self.key, make_jpeg(), 'image/jpeg')
+        user = User.objects.create_user(email='media@example.com')
+        team = Team.objects.create(name='Media Team')
+        self.member = Member.objects.create(
+            user=user,
+            team=team,
+            display_name='Media',
+            profile_picture_url=self.storage.url(self.key),
+        )
+
+    def test_strips_metadata_and_applies_orientation(self):
+        process_profile_picture(self.member.id)
+
+        image = Image.open(BytesIO(self.storage.get(self.key)))
+        self.assertEqual(len(image.getexif()), 0)
+        self.assertEqual(image.size, (300, 400))
+
+    def test_stores_square_variants_with_immutable_caching(self):
+        process_profile_picture(self.member.id)
+
+        self.member.refresh_from_db()
+        variants = self.member.profile_picture_variants
+        self.assertEqual(set(variants), {'webp', 'jpeg'})
+        self.assertEqual(set(variants['webp']), {'32', '64', '256'})
+
+        key = self.storage.key_from_url(variants['webp']['64'])
+        self.assertEqual(key, 'profile_pictures/variants/avatar/64.webp')
+        stored = self.storage.objects[key]
+        self.assertEqual(stored['content_type'], 'image/webp')
+        self.assertIn('immutable', stored['cache_control'])
+        self.assertEqual(Image.open(BytesIO(stored['body'])).size, (64, 64))
+
+    def test_discards_variants_when_picture_changed_meanwhile(self):
+        put = self.storage.put
+
+        def replace_then_put(key, *args, **kwargs):
+            Member.objects.filter(pk=self.member.pk).update(
+                profile_picture_url=self.storage.url('profile_pictures/newer.jpg'),
+            )
+            put(key, *args, **kwargs)
+
+        self.storage.put = replace_then_put
+        process_profile_picture(self.member.id)
+
+        self.member.refresh_from_db()
+        self.assertEqual(self.member.profile_picture_variants, {})
+        pending = cache.spop('storage:pending_deletions', 100)
+        self.assertEqual(len(pending), 7)
+        self.assertIn(self.key, pending)
+        self.assertEqual(len([key for key in pending if key.startswith('profile_pictures/variants/')]), 6)
+
+    def test_leaves_pictures_replaced_before_processing_alone(self):
+        get = self.storage.get
+        original = get(self.key)
+
+        def replace_then_get(key):
+            Member.objects.filter(pk=self.member.pk).update(
+                profile_picture_url=self.storage.url('profile_pictures/newer.jpg'),
+            )
+            return get(key)
+
+        stored = set(self.storage.objects)
+        self.storage.get = replace_then_get
+        process_profile_picture(self.member.id)
+
+        self.assertEqual(get(self.key), original)
+        self.assertEqual(set(self.storage.objects), stored)
+
+    def test_ignores_pictures_deleted_before_processing(self):
+        self.storage.delete(self.key)
+
+        process_profile_picture(self.member.id)
+
+        self.member.refresh_from_db()
+        self.assertEqual(self.member.profile_picture_variants, {})
+        self.assertFalse(self.storage.exists(self.key))
+
+    def test_ignores_decompression_bombs(self):
+        with patch('members.tasks.sanitize', side_effect=Image.DecompressionBombError('too many pixels')):
+            process_profile_picture(self.member.id)
+
+        self.member.refresh_from_db()
+        self.assertEqual(self.member.profile_picture_variants, {})
+
+    def test_variants_are_shared_by_every_member_using_the_picture(self):
+        twin = Member.objects.create(
+            user=self.member.user,
+            team=Team.objects.create(name='Twin Team'),
+            display_name='Twin',
+            profile_picture_url=self.member.profile_picture_url,
+        )
+
+        process_profile_picture(self.member.id)
+
+        twin.refresh_from_db()
+        self.assertEqual(set(twin.profile_picture_variants), {'webp', 'jpeg'})
+
+    def test_ignores_files_that_are_not_images(self):
+        self.storage.put(self.key, b'not an image', 'image/jpeg')
+
+        process_profile_picture(self.member.id)
+
+        self.member.refresh_from_db()
+        self.assertEqual(self.member.profile_picture_variants, {})
+        self.assertEqual(self.storage.get(self.key), b'not an image')
@@ -1,11 +1,22 @@
+import hashlib
+import json
+from unittest.mock import patch
+
 from django.urls import reverse
 from django.contrib.auth import get_user_model
+from django.db import connection
+from django.test import AsyncClient, override_settings
+from django.test.utils import CaptureQueriesContext
 
 from rest_framework import status
+from rest_framework_simplejwt.tokens import AccessToken
 
+from common.storage import get_storage
 from core.tests.base import BaseAPITestCaseAuthenticated
 from users.models import Profile
 from members.models import Team, Member
+from members.views import MemberViewSet
+from members.tasks import flush_presence, flush_profile_picture_deletions
 
 User = get_user_model()
 
@@ -27,6 +38,11 @@ class TeamViewSetTests(BaseAPITestCaseAuthenticated):
         self.assertEqual(len(response.data), 1)
         self.assertEqual(response.data[0]['name'], 'Team Alpha')
 
+    def test_list_teams_with_fields(self):
+        response = self.client.get(reverse('teams-list'), {'fields': 'tid,name', 'name': 'alpha'})
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.data, [{'tid': 'T12345678', 'name': 'Team Alpha'}])
+
     def test_retrieve_team_by_tid(self):
         url = reverse('teams-detail', args=[self.team1.tid])
         response = self.client.get(url)
@@ -55,6 +71,13 @@ class TeamViewSetTests(BaseAPITestCaseAuthenticated):
         self.assertEqual(response.status_code, status.HTTP_200_OK)
         self.assertEqual(Team.objects.get(tid=tid).name, 'Team Alpha Partial Update')
 
+    def test_cached_list_reflects_later_writes(self):
+        self.client.get(reverse('teams-list'))
+        self.client.patch(reverse('teams-detail', args=[self.team1.tid]), {'name': 'Team Omega'}, format='json')
+
+        response = self.client.get(reverse('teams-list'))
+        self.assertIn('Team Omega', {team['name'] for team in response.data})
+
     def test_delete_team(self):
         tid = self.team1.tid
         url = reverse('teams-detail', args=[tid])
@@ -106,6 +129,80 @@ class MemberViewSetTest(BaseAPITestCaseAuthenticated):
         self.assertEqual(len(response.data), 2)
         self.assertEqual(response.data[0]['display_name'], 'Johnny')
 
+    def test_cached_list_survives_joins_in_other_teams(self):
+        self.client.get(self.base_url.format(self.team1.tid))
+        Member.objects.create(user=self.user, team=self.team2, display_name='Elsewhere')
+
+        # only the team lookup, the members come from cache
+        with self.assertNumQueries(1):
+            response = self.client.get(self.base_url.format(self.team1.tid))
+        self.assertEqual(len(response.data), 2)
+
+    def test_cached_list_follows_its_members_profiles_only(self):
+        outsider = User.objects.create_user(email='outsider@example.com')
+        Member.objects.create(user=outsider, team=self.team2, display_name='Outsider')
+        Profile.objects.create(user=outsider)
+        self.client.get(self.base_url.format(self.team1.tid))
+
+        outsider.first_name = 'Renamed'
+        outsider.save()
+        outsider.profile.dark_mode = True
+        outsider.profile.save()
+        with self.assertNumQueries(1):
+            self.client.get(self.base_url.format(self.team1.tid))
+
+        self.user1.first_name = 'Jack'
+        self.user1.save()
+        self.user1.profile.dark_mode = True
+        self.user1.profile.save()
+        response = self.client.get(self.base_url.format(self.team1.tid))
+        self.assertEqual(response.data[0]['full_name'], 'Jack Doe')
+        self.assertTrue(response.data[0]['profile']['dark_mode'])
+
+    def test_status_change_is_listed(self):
+        """Test presence updates reach the cached member list"""
+        self.client.get(self.base_url.format(self.team1.tid))
+        response = self.client.patch(
+            f'{self.base_url.format(self.team1.tid)}{self.member1.id}/',
+            data={'status': 'meeting', 'online': True},
+            format='json',
+        )
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+
+        response = self.client.get(self.base_url.format(self.team1.tid))
+        self.assertEqual(response.data[0]['status'], 'meeting')
+        self.assertTrue(response.data[0]['online'])
+
+    def test_presence_is_buffered_until_flushed(self):
+        """Test presence pings are written by the periodic flush"""
+        self.client.force_authenticate(user=self.user1)
+        url = f'{self.base_url.format(self.team1.tid)}presence/'
+        self.client.get(self.base_url.format(self.team1.tid))
+
+        response = self.client.post(url, data={'online': True}, format='json')
+        self.assertEqual(response.status_code, status.HTTP_202_ACCEPTED)
+        self.assertFalse(Member.objects.get(pk=self.member1.pk).online)
+
+        flush_presence()
+        response = self.client.get(self.base_url.format(self.team1.tid))
+        self.assertTrue(response.data[0]['online'])
+
+    def test_edit_after_buffered_presence_is_kept(self):
+        """Test a presence edit isn't overwritten by an older buffered ping"""
+        self.client.force_authenticate(user=self.user1)
+        member_url = f'{self.base_url.format(self.team1.tid)}{self.member1.id}/'
+        self.client.post(f'{self.base_url.format(self.team1.tid)}presence/', data={'status': 'remote'}, format='json')
+        self.client.patch(member_url, data={'status': 'meeting'}, format='json')
+
+        flush_presence()
+
+        self.assertEqual(self.client.get(member_url).data['status'], 'meeting')
+
+    def test_presence_of_non_member_is_rejected(self):
+        """Test presence can only be sent for the caller's own membership"""
+        response = self.client.post(f'{self.base_url.format(self.team1.tid)}presence/', data={'online': True})
+        self.assertEqual(response.status_code, status.HTTP_404_NOT_FOUND)
+
     def test_create_member(self):
         """Test creating a new member"""
         self.client.force_authenticate(user=self.user1)
@@ -165,6 +262,83 @@ class MemberViewSetTest(BaseAPITestCaseAuthenticated):
         self.assertEqual(len(response.data), 1)
 
 
+    def test_list_with_fields(self):
+        """Test ?fields= returns only the listed fields without joining the rest"""
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.get(f"{self.base_url.format(self.team1.tid)}?fields=id,display_name")
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.data, [
+            {'id': self.member1.id, 'display_name': 'Johnny'},
+            {'id': self.member2.id, 'display_name': 'Janey'},
+        ])
+        listed = [query['sql'] for query in queries if 'FROM "members_member"' in query['sql']]
+        self.assertEqual(len(listed), 1)
+        self.assertNotIn('JOIN', listed[0])
+        self.assertNotIn('"phone_number"', listed[0])
+
+    def test_list_with_omit(self):
+        """Test ?omit= drops fields and still serializes the rest"""
+        response = self.client.get(f"{self.base_url.format(self.team1.tid)}?omit=user,profile&search=john")
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertNotIn('user', response.data[0])
+        self.assertNotIn('profile', response.data[0])
+        self.assertEqual(response.data[0]['full_name'], 'John Doe')
+        self.assertEqual(response.data[0]['tid'], 'TEAM1')
+        self.assertFalse(response.data[0]['online'])
+
+    def test_sparse_list_does_not_reuse_full_fragments(self):
+        """Test full and sparse lists of the same members are cached apart"""
+        url = self.base_url.format(self.team1.tid)
+        self.client.get(f'{url}?fields=id')
+        self.assertIn('email', self.client.get(url).data[0]['user'])
+        self.assertEqual(self.client.get(f'{url}?fields=id').data[0], {'id': self.member1.id})
+
+    def test_list_streamed_in_chunks(self):
+        """Test ?stream=true sends the same list a chunk of rows at a time"""
+        url = self.base_url.format(self.team1.tid)
+        expected = self.client.get(url).json()
+
+        with patch.object(MemberViewSet, 'stream_chunk_size', 1):
+            response = self.client.get(f'{url}?stream=true')
+            parts = list(response.streaming_content)
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response['Content-Type'], 'application/json')
+        self.assertEqual(len(parts), 3)
+        self.assertEqual(json.loads(b''.join(parts)), expected)
+
+    def test_streamed_list_keeps_filters_and_fields(self):
+        """Test streaming applies search, limit and ?fields="""
+        response = self.client.get(f'{self.base_url.format(self.team1.tid)}?stream=true&search=jan&fields=id')
+        self.assertEqual(json.loads(b''.join(response.streaming_content)), [{'id': self.member2.id}])
+
+        response = self.client.get(f'{self.base_url.format(self.team2.tid)}?stream=true')
+        self.assertEqual(json.loads(b''.join(response.streaming_content)), [])
+
+    def test_only_json_is_streamed(self):
+        """Test other formats ignore ?stream=true"""
+        response = self.client.get(f'{self.base_url.format(self.team1.tid)}?stream=true', HTTP_ACCEPT='application/msgpack')
+        self.assertFalse(response.streaming)
+        self.assertEqual(len(response.data), 2)
+
+    async def test_list_streamed_over_asgi(self):
+        """Test ASGI requests stream without collecting the rows first"""
+        client = AsyncClient()
+        headers = {'Authorization': f'Bearer {AccessToken.for_user(self.user1)}'}
+
+        response = await client.get(f'{self.base_url.format(self.team1.tid)}?stream=true', headers=headers)
+
+        self.assertTrue(response.is_async)
+        body = b''.join([part async for part in response.streaming_content])
+        self.assertEqual([member['display_name'] for member in json.loads(body)], ['Johnny', 'Janey'])
+
+    def test_retrieve_with_fields(self):
+        """Test ?fields= applies to single members"""
+        response = self.client.get(f'{self.base_url.format(self.team1.tid)}{self.member1.id}/?fields=tid,full_name')
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.data, {'tid': 'TEAM1', 'full_name': 'John Doe'})
+
+
 class UserTeamsListViewTest(BaseAPITestCaseAuthenticated):
     def setUp(self):
         super().setUp()
@@ -195,8 +369,231 @@ class UserTeamsListViewTest(BaseAPITestCaseAuthenticated):
         self.assertEqual(response.status_code, status.HTTP_200_OK)
         self.assertSetEqual(returned_team_names, {'Team A', 'Team B'})
 
+    def test_roles_come_with_the_teams_in_one_query(self):
+        Member.objects.filter(user=self.user, team=self.team2).update(role='admin')
+
+        # the caller's team ids, then the teams with their roles
+        with self.assertNumQueries(2):
+            response = self.client.get(self.url)
+
+        roles = {team['name']: team['role'] for team in response.json()}
+        self.assertEqual(roles, {'Team A': 'member', 'Team B': 'admin'})
+
+    def test_roles_with_fields(self):
+        response = self.client.get(self.url, {'fields': 'name,role'})
+
+        self.assertEqual(
+            sorted(response.json(), key=lambda team: team['name']),
+            [{'name': 'Team A', 'role': 'member'}, {'name': 'Team B', 'role': 'member'}],
+        )
+
+    def test_cached_teams_follow_membership_changes(self):
+        self.client.get(self.url)
+        with self.assertNumQueries(0):
+            self.client.get(self.url)
+
+        Member.objects.create(user=self.user, team=self.team3)
+        response = self.client.get(self.url)
+        self.assertEqual(len(response.json()), 3)
+
+    def test_cached_teams_survive_joins_in_other_teams(self):
+        self.client.get(self.url)
+        Member.objects.create(user=self.create_user(email='joiner@example.com'), team=self.team3)
+
+        with self.assertNumQueries(0):
+            self.client.get(self.url)
+
+        Member.objects.create(user=self.create_user(email='teammate@example.com'), team=self.team1)
+        counts = {team['name']: team['members_count'] for team in self.client.get(self.url).json()}
+        self.assertEqual(counts, {'Team A': 2, 'Team B': 1})
+
     def test_unauthenticated_request(self):
         self.unauthenticate()
         response = self.client.get(self.url)
 
         self.assertEqual(response.status_code, status.HTTP_401_UNAUTHORIZED)
+
+
+class BootstrapViewTest(BaseAPITestCaseAuthenticated):
+    def setUp(self):
+        super().setUp()
+        self.profile = Profile.objects.create(user=self.user)
+        self.team1 = Team.objects.create(name='Boot Team A')
+        self.team2 = Team.objects.create(name='Boot Team B')
+        Member.objects.create(user=self.user, team=self.team1, display_name='Boot A', role='admin')
+        Member.objects.create(user=self.user, team=self.team2, display_name='Boot B')
+        self.url = reverse('user-bootstrap')
+
+    def test_returns_everything_from_three_queries(self):
+        # the caller's team ids for the cache key, then user with profile and memberships with teams
+        with self.assertNumQueries(3):
+            response = self.client.get(self.url)
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.data['user']['email'], self.user.email)
+        self.assertEqual(response.data['profile']['id'], self.profile.id)
+        self.assertEqual(
+            {team['name']: team['role'] for team in response.data['teams']},
+            {'Boot Team A': 'admin', 'Boot Team B': 'member'},
+        )
+        self.assertEqual(
+            {member['display_name'] for member in response.data['memberships']},
+            {'Boot A', 'Boot B'},
+        )
+
+    def test_cached_until_something_it_shows_changes(self):
+        self.client.get(self.url)
+        with self.assertNumQueries(0):
+            self.client.get(self.url)
+
+        self.profile.dark_mode = True
+        self.profile.save()
+        self.assertTrue(self.client.get(self.url).data['profile']['dark_mode'])
+
+        Member.objects.filter(user=self.user, team=self.team2).get().delete()
+        self.assertEqual(len(self.client.get(self.url).data['teams']), 1)
+
+    def test_teams_leave_out_member_previews(self):
+        self.client.get(self.url, {'preview': 3})
+        response = self.client.get(self.url)
+
+        self.assertTrue(response.data['teams'])
+        for team in response.data['teams']:
+            self.assertNotIn('members_preview', team)
+        for team in self.client.get(self.url, {'preview': 3}).data['teams']:
+            self.assertNotIn('members_preview', team)
+
+    @override_settings(DATABASE_REPLICAS=['replica1'], REPLICA_LAG_WINDOW=5)
+    def test_built_on_primary_right_after_a_change(self):
+        # the replica alias is not set up in tests, choosing it is what's checked
+        with patch('common.db.routers.random.choice', return_value='default') as choose_replica:
+            self.assertEqual(self.client.get(self.url).status_code, status.HTTP_200_OK)
+        self.assertFalse(choose_replica.called)
+
+    @override_settings(DATABASE_REPLICAS=['replica1'], REPLICA_LAG_WINDOW=0)
+    def test_built_on_replica_once_changes_settled(self):
+        with patch('common.db.routers.random.choice', return_value='default') as choose_replica:
+            self.assertEqual(self.client.get(self.url).status_code, status.HTTP_200_OK)
+        self.assertTrue(choose_replica.called)
+
+    def test_unauthenticated_request(self):
+        self.unauthenticate()
+        self.assertEqual(self.client.get(self.url).status_code, status.HTTP_401_UNAUTHORIZED)
+
+
+@override_settings(STORAGE_BACKEND='common.storage.memory.InMemoryStorage')
+class ProfileUploadViewTest(BaseAPITestCaseAuthenticated):
+    def setUp(self):
+        super().setUp()
+        self.team = Team.objects.create(name='Upload Team')
+        self.member = Member.objects.create(user=self.user, team=self.team, display_name='Uploader')
+        self.storage = get_storage()
+
+    def presign(self, **params):
+        response = self.client.get(reverse('presigned_profile_upload'), params)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        return response.data
+
+    def complete(self, token, team=None):
+        return self.client.post(
+            f"{reverse('complete_profile_upload')}?team_tid={(team or self.team).tid}",
+            {'token': token},
+            format='json',
+        )
+
+    def test_presign_returns_upload_url_and_token(self):
+        data = self.presign()
+        self.assertTrue(data['upload_url'].startswith('memory://'))
+        self.assertTrue(data['file_url'].endswith('.jpg'))
+        self.assertTrue(data['token'])
+
+    async def test_async_views_serve_asgi_requests(self):
+        client = AsyncClient()
+        headers = {'Authorization': f'Bearer {AccessToken.for_user(self.user)}'}
+
+        presigned = await client.get(reverse('presigned_profile_upload'), headers=headers)
+        self.assertEqual(presigned.status_code, status.HTTP_200_OK)
+        completed = await client.post(
+            f"{reverse('complete_profile_upload')}?team_tid={self.team.tid}",
+            {'token': presigned.json()['token']},
+            content_type='application/json',
+            headers=headers,
+        )
+
+        self.assertEqual(completed.status_code, status.HTTP_200_OK)
+        self.assertEqual(completed.json()['file_url'], presigned.json()['file_url'])
+
+    def test_complete_sets_profile_picture_url(self):
+        data = self.presign()
+
+        response = self.complete(data['token'])
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.member.refresh_from_db()
+        self.assertEqual(self.member.profile_picture_url, data['file_url'])
+
+    def test_complete_replaces_old_picture(self):
+        old = self.presign()
+        self.complete(old['token'])
+        old_key = self.storage.key_from_url(old['file_url'])
+        self.storage.put(old_key, b'old')
+
+        self.complete(self.presign()['token'])
+        self.assertIn(old_key, self.storage.objects)
+
+        flush_profile_picture_deletions()
+        self.assertNotIn(old_key, self.storage.objects)
+
+    def test_complete_rejects_unknown_token(self):
+        response = self.complete('unknown')
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+
+    def test_content_addressed_upload_is_keyed_by_hash(self):
+        body = b'avatar-bytes'
+        digest = hashlib.sha256(body).hexdigest()
+
+        data = self.presign(sha256=digest)
+        self.assertTrue(data['file_url'].endswith(f'profile_pictures/{digest}.jpg'))
+        self.storage.put(f'profile_pictures/{digest}.jpg', body)
+
+        response = self.complete(data['token'])
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+
+    def test_content_addressed_upload_rejects_mismatched_body(self):
+        digest = hashlib.sha256(b'expected').hexdigest()
+        data = self.presign(sha256=digest)
+        self.storage.put(f'profile_pictures/{digest}.jpg', b'something else')
+
+        response = self.complete(data['token'])
+
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        self.member.refresh_from_db()
+        self.assertIsNone(self.member.profile_picture_url)
+
+    def test_rejects_malformed_hash(self):
+        response = self.client.get(reverse('presigned_profile_upload'), {'sha256': 'abc'})
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+
+    def test_identical_pictures_are_stored_once_and_shared(self):
+        body = b'shared-avatar'
+        digest = hashlib.sha256(body).hexdigest()
+        key = f'profile_pictures/{digest}.jpg'
+        other_team = Team.objects.create(name='Second Team')
+        other = Member.objects.create(user=self.user, team=other_team, display_name='Twin')
+
+        self.storage.put(key, body)
+        self.complete(self.presign(sha256=digest)['token'])
+        variants = {'webp': {'32': self.storage.url(f'profile_pictures/variants/{digest}/32.webp')}}
+        Member.objects.filter(pk=self.member.pk).update(profile_picture_variants=variants)
+
+        second = self.presign(sha256=digest)
+        self.assertIsNone(second['upload_url'])
+        self.complete(second['token'], team=other_team)
+        other.refresh_from_db()
+        self.assertEqual(other.profile_picture_url, self.storage.url(key))
+        self.assertEqual(other.profile_picture_variants, variants)
+
+        # replacing the picture in one team keeps the object the other still uses
+        self.complete(self.presign()['token'])
+        flush_profile_picture_deletions()
+        self.assertIn(key, self.storage.objects)
@@ -0,0 +1,47 @@
+from django.db import transaction
+from rest_framework.exceptions import NotFound, ValidationError
+
+from common.storage import get_storage
+from members.models import Member
+from members.partitioning import team_id_for
+from members.tasks import process_profile_picture
+from members.utils.profile_pictures import queue_deletion, stored_keys
+
+
+def apply_profile_picture(member, file_url):
+    """Point ``member`` at ``file_url``, reusing variants of members that share it."""
+    if member.profile_picture_url == file_url:
+        return
+
+    shared = Member.objects.filter(profile_picture_url=file_url).values_list(
+        'profile_picture_variants', flat=True,
+    )
+    variants = next((variant for variant in shared if variant), None)
+
+    # shared objects survive this: the flush skips anything still referenced
+    queue_deletion(*stored_keys(
+        get_storage(), member.profile_picture_url, member.profile_picture_variants,
+    ))
+    member.profile_picture_url = file_url
+    member.profile_picture_variants = variants or {}
+    member.save()
+    if variants is None:
+        transaction.on_commit(lambda: process_profile_picture.delay(member.id))
+
+
+def validate_avatar_upload(session, request):
+    """Upload validation for the ``avatar`` purpose, returning the member to update."""
+    team_tid = request.query_params.get('team_tid')
+    if not team_tid:
+        raise ValidationError({'team_tid': 'team_tid is required'})
+
+    member = Member.objects.filter(user=request.user, team_id=team_id_for(team_tid)).first()
+    if member is None:
+        raise NotFound('Member not found in the specified team.')
+    return member
+
+
+def complete_avatar_upload(session, request, member):
+    """Upload handler for the ``avatar`` purpose, see ``UPLOAD_PURPOSES``."""
+    apply_profile_picture(member, get_storage().url(session['key']))
+    return {'profile_picture_url': member.profile_picture_url}
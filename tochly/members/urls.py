@@ -1,10 +1,13 @@
 from django.urls import path, include
 from rest_framework_nested import routers
 
+from common.rest.negotiation import offer_msgpack
+
 from members.views import (
     TeamViewSet, 
     MemberViewSet, 
     UserTeamsListView,
+    BootstrapView,
     PresignedProfileUploadView,
     CompleteProfileUploadView,
 )
@@ -15,10 +18,11 @@ router.register(r'teams', viewset=TeamViewSet, basename='teams')
 teams_router = routers.NestedSimpleRouter(router, r'teams', lookup='team')
 teams_router.register(r'members', viewset=MemberViewSet, basename='team-members')
 
-urlpatterns = [
+urlpatterns = offer_msgpack([
     path('users/teams/', UserTeamsListView.as_view(), name='user-teams'),
+    path('users/bootstrap/', BootstrapView.as_view(), name='user-bootstrap'),
     path(r'', include(router.urls)),
     path(r'', include(teams_router.urls)),
     path('upload/profile/presign/', PresignedProfileUploadView.as_view(), name='presigned_profile_upload'),
     path('upload/profile/complete/', CompleteProfileUploadView.as_view(), name='complete_profile_upload'),
-]
+])
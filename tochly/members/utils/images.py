@@ -0,0 +1,66 @@
+from io import BytesIO
+
+from PIL import Image, ImageOps
+
+AVATAR_SIZES = (32, 64, 256)
+VARIANT_FORMATS = {
+    'webp': ('WEBP', 'image/webp', {'quality': 80, 'method': 4}),
+    'jpeg': ('JPEG', 'image/jpeg', {'quality': 82, 'optimize': True, 'progressive': True}),
+}
+SANITIZED_FORMATS = {
+    'JPEG': ('image/jpeg', {'quality': 90, 'optimize': True}),
+    'PNG': ('image/png', {'optimize': True}),
+    'WEBP': ('image/webp', {'quality': 90}),
+}
+# refuse decompression bombs well before Pillow's own warning threshold
+MAX_PIXELS = 40_000_000
+
+
+def _open(data: bytes):
+    image = Image.open(BytesIO(data))
+    if image.width * image.height > MAX_PIXELS:
+        raise ValueError('Image is too large to process.')
+    image_format = image.format
+    image.load()
+    # bake the EXIF orientation into the pixels before dropping the metadata
+    return ImageOps.exif_transpose(image), image_format
+
+
+def _flatten(image: Image.Image) -> Image.Image:
+    if image.mode in ('RGBA', 'LA') or (image.mode == 'P' and 'transparency' in image.info):
+        image = image.convert('RGBA')
+        background = Image.new('RGB', image.size, (255, 255, 255))
+        background.paste(image, mask=image.getchannel('A'))
+        return background
+    return image.convert('RGB')
+
+
+def _encode(image: Image.Image, image_format: str, options: dict) -> bytes:
+    buffer = BytesIO()
+    # some encoders fall back to image.info, so EXIF/XMP/comments go with it
+    image.info = {}
+    image.save(buffer, format=image_format, **options)
+    return buffer.getvalue()
+
+
+def sanitize(data: bytes):
+    """Re-encode an upload without metadata, returning ``(bytes, content_type)``."""
+    image, image_format = _open(data)
+    if image_format not in SANITIZED_FORMATS:
+        image_format = 'JPEG'
+    content_type, options = SANITIZED_FORMATS[image_format]
+    if image_format == 'JPEG':
+        image = _flatten(image)
+    elif image.mode == 'P':
+        # palette transparency lives in image.info, which _encode drops
+        image = image.convert('RGBA')
+    return _encode(image, image_format, options), content_type
+
+
+def build_variants(data: bytes, sizes=AVATAR_SIZES):
+    """Yield ``(size, name, bytes, content_type)`` square avatar thumbnails."""
+    image = _flatten(_open(data)[0])
+    for size in sizes:
+        thumbnail = ImageOps.fit(image, (size, size), method=Image.LANCZOS)
+        for name, (image_format, content_type, options) in VARIANT_FORMATS.items():
+            yield size, name, _encode(thumbnail, image_format, options), content_type
@@ -0,0 +1,68 @@
+import hashlib
+import re
+from functools import reduce
+from operator import or_
+
+from django.core.cache import cache
+from django.db.models import Q
+
+from members.models import Member
+
+SHA256_RE = re.compile(r'^[0-9a-f]{64}$')
+
+PROFILE_PICTURE_PREFIX = 'profile_pictures/'
+VARIANTS_PREFIX = f'{PROFILE_PICTURE_PREFIX}variants/'
+VARIANT_EXTENSIONS = {'webp': 'webp', 'jpeg': 'jpg'}
+PENDING_DELETIONS_KEY = 'storage:pending_deletions'
+
+
+def content_key(sha256, extension):
+    """Key for a picture addressed by the hex SHA-256 of its uploaded bytes."""
+    return f'{PROFILE_PICTURE_PREFIX}{sha256}.{extension}'
+
+
+def content_matches(data, key):
+    return hashlib.sha256(data).hexdigest() == picture_stem(key)
+
+
+def picture_stem(key):
+    """Return the name shared by an original and all of its variants."""
+    if key.startswith(VARIANTS_PREFIX):
+        return key[len(VARIANTS_PREFIX):].split('/', 1)[0]
+    return key[len(PROFILE_PICTURE_PREFIX):].rsplit('.', 1)[0]
+
+
+def variant_key(key, size, name):
+    return f'{VARIANTS_PREFIX}{picture_stem(key)}/{size}.{VARIANT_EXTENSIONS[name]}'
+
+
+def referenced_keys(storage, keys):
+    """Return the subset of ``keys`` whose picture is still used by any member."""
+    stems = {picture_stem(key) for key in keys}
+    if not stems:
+        return set()
+    lookup = reduce(or_, (
+        Q(profile_picture_url__startswith=storage.url(f'{PROFILE_PICTURE_PREFIX}{stem}.'))
+        for stem in stems
+    ))
+    urls = Member.objects.filter(lookup).values_list('profile_picture_url', flat=True)
+    used = {picture_stem(storage.key_from_url(url)) for url in urls}
+    return {key for key in keys if picture_stem(key) in used}
+
+
+def stored_keys(storage, url, variants):
+    """Return every storage key behind a member's picture and its variants."""
+    keys = [storage.key_from_url(url)] if url else []
+    for by_size in (variants or {}).values():
+        keys += [storage.key_from_url(variant_url) for variant_url in by_size.values()]
+    return keys
+
+
+def queue_deletion(*keys):
+    """Schedule storage objects for removal by the next batched flush."""
+    if keys:
+        cache.sadd(PENDING_DELETIONS_KEY, *keys)
+
+
+def pop_pending_deletions(count):
+    return cache.spop(PENDING_DELETIONS_KEY, count) or set()
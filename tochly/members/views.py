@@ -1,33 +1,65 @@
+import base64
+import hashlib
 import uuid
-import json
 
+from asgiref.sync import sync_to_async
 from django.shortcuts import get_object_or_404
 from django.contrib.auth import get_user_model
-from django.conf import settings
 from django.core.cache import cache
-from django.db.models import Value, Q
+from django.db.models import F, Value, Q
 from django.db.models.functions import Concat
 
+from rest_framework.decorators import action
 from rest_framework.response import Response
-from rest_framework import viewsets, generics, status
 from rest_framework.views import APIView
+from rest_framework import viewsets, generics, status
 from rest_framework.serializers import ValidationError
+from adrf.views import APIView as AsyncAPIView
 
 from common.utils.ratelimiter import CacheRateLimiter
-from members.utils.s3 import (
-    generate_presigned_url, 
-    delete_old_profile_picture,
+from common.cache.mixins import CachedQuerysetMixin
+from common.cache.querysets import DEFAULT_TIMEOUT, cached_queryset, get_versions, recently_changed, version_key
+from common.cache.stampede import get_or_compute
+from common.db.middleware import skip_primary_pin
+from common.db.mixins import ReplicaReadMixin
+from common.db.routers import primary_reads
+from common.rest.sparse import SparseFieldsetsViewMixin
+from common.rest.streaming import StreamingListMixin
+from common.storage import get_storage
+from members.utils.profile_pictures import (
+    PROFILE_PICTURE_PREFIX,
+    SHA256_RE,
+    content_key,
+    content_matches,
+    queue_deletion,
+    referenced_keys,
 )
+from members.uploads import apply_profile_picture
 
 from members.serializers import (
     TeamSerializer, 
     MemberSerializer, 
+    PresenceSerializer,
+    UserTeamSerializer,
 )
 from members.models import Team, Member
+from members.partitioning import team_id_for
+from members.presence import presence_buffer
+from users.models import Profile
+from users.serializers import ProfileSerializer, UserSerializer
 
 User = get_user_model()
 
-class TeamViewSet(viewsets.ModelViewSet):
+
+def user_team_ids(user_id):
+    """Ids of the teams ``user_id`` belongs to, cached until their memberships change."""
+    return cached_queryset(
+        Member.objects.filter(user_id=user_id).values_list('team_id', flat=True).order_by('team_id'),
+        scopes={Member: {'user_id': user_id}},
+    )
+
+
+class TeamViewSet(ReplicaReadMixin, SparseFieldsetsViewMixin, CachedQuerysetMixin, viewsets.ModelViewSet):
     serializer_class = TeamSerializer
     queryset = Team.objects.all()
     lookup_field = 'tid'
@@ -43,15 +75,21 @@ class TeamViewSet(viewsets.ModelViewSet):
         return queryset
 
 
-class MemberViewSet(viewsets.ModelViewSet):
+class MemberViewSet(ReplicaReadMixin, SparseFieldsetsViewMixin, StreamingListMixin, viewsets.ModelViewSet):
     serializer_class = MemberSerializer
     lookup_field = 'id'
 
+    def get_team(self):
+        if not hasattr(self, '_team'):
+            self._team = get_object_or_404(Team, tid=self.kwargs['team_tid'])
+        return self._team
+
     def get_queryset(self):
-        tid = self.kwargs['team_tid']
-        team = get_object_or_404(Team, tid=tid)
+        team = self.get_team()
         user_id = self.request.query_params.get('user_id')
-        queryset = Member.objects.filter(team=team)
+        queryset = Member.objects.filter(team=team).select_related(
+            'team', 'user', 'user__profile', 'presence',
+        ).order_by('id')
         if user_id:
             queryset = queryset.filter(user_id=user_id)
         
@@ -62,7 +100,7 @@ class MemberViewSet(viewsets.ModelViewSet):
         search_query = request.query_params.get('search', '').strip().lower()
         limit = request.query_params.get('limit')
 
-        queryset = self.get_queryset()
+        queryset = self.filter_queryset(self.get_queryset())
         if search_query:
             queryset = queryset.annotate(
                 search_full_name=Concat('user__first_name', Value(' '), 'user__last_name')
@@ -74,7 +112,17 @@ class MemberViewSet(viewsets.ModelViewSet):
         if limit and limit.isdigit():
             queryset = queryset[:int(limit)]
 
-        serializer = MemberSerializer(queryset, many=True)
+        if self.wants_stream():
+            return self.stream_list(queryset)
+
+        team_id = self.get_team().id
+        queryset = cached_queryset(
+            queryset,
+            scopes={Member: {'team_id': team_id}, Team: {'id': team_id}},
+            # their changes bump the team scope of their members, see members.signals
+            covered=(User, Profile),
+        )
+        serializer = self.get_serializer(queryset, many=True)
         return Response(serializer.data)
 
     def perform_create(self, serializer):
@@ -89,19 +137,96 @@ class MemberViewSet(viewsets.ModelViewSet):
 
         serializer.save(user=user, team=team)
 
+    @action(detail=False, methods=['post'])
+    def presence(self, request, *args, **kwargs):
+        """Buffers the caller's online flag and status, written in bulk by flush_presence."""
+        serializer = PresenceSerializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+        if not serializer.validated_data:
+            return Response({'error': 'Send online or status.'}, status=status.HTTP_400_BAD_REQUEST)
 
-class UserTeamsListView(generics.ListAPIView):
-    serializer_class = TeamSerializer
+        member_id = Member.objects.filter(
+            user=request.user, team_id=team_id_for(self.kwargs['team_tid']),
+        ).values_list('id', flat=True).first()
+        if member_id is None:
+            return Response({'detail': 'Member not found in the specified team.'}, status=status.HTTP_404_NOT_FOUND)
+
+        presence_buffer.update(member_id, **serializer.validated_data)
+        # nothing reached the database yet, reads may keep using replicas
+        skip_primary_pin(request)
+        return Response(serializer.validated_data, status=status.HTTP_202_ACCEPTED)
+
+
+class UserTeamsListView(ReplicaReadMixin, SparseFieldsetsViewMixin, CachedQuerysetMixin, generics.ListAPIView):
+    serializer_class = UserTeamSerializer
+
+    def get_queryset_cache_scopes(self):
+        user_id = self.request.user.id
+        return {Member: {'user_id': user_id}, Team: {'id': user_team_ids(user_id)}}
 
     def get_queryset(self):
-        return Team.objects.filter(members__user=self.request.user).distinct().order_by('-created')
+        # (user, team) is unique, so the join yields one row per team and needs no DISTINCT
+        return Team.objects.filter(members__user=self.request.user).annotate(
+            role=F('members__role'),
+        ).order_by('-created')
+
+
+class BootstrapView(ReplicaReadMixin, APIView):
+    """Everything the client loads on launch: user, profile, teams with roles and memberships."""
 
+    bootstrap_cache_timeout = DEFAULT_TIMEOUT
 
-class PresignedProfileUploadView(APIView):
     def get(self, request):
+        user_id = request.user.id
+        # the key changes with anything the response is built from
+        versions = get_versions([
+            version_key(User._meta.db_table, 'id', user_id),
+            version_key(Profile._meta.db_table, 'user_id', user_id),
+            version_key(Member._meta.db_table, 'user_id', user_id),
+        ] + [version_key(Team._meta.db_table, 'id', team_id) for team_id in user_team_ids(user_id)])
+        digest = hashlib.sha1(repr(sorted(versions.items())).encode()).hexdigest()
+
+        def build():
+            # a lagging replica would cache the old rows under the new versions
+            if recently_changed(versions.values()):
+                with primary_reads():
+                    return self.build(request)
+            return self.build(request)
+
+        data = get_or_compute(f'bootstrap:{user_id}:{digest}', build, timeout=self.bootstrap_cache_timeout)
+        return Response(data)
+
+    def build(self, request):
+        user = User.objects.select_related('profile').get(pk=request.user.id)
+        memberships = list(
+            Member.objects.filter(user=user).select_related(
+                'team', 'user', 'user__profile', 'presence',
+            ).order_by('-team__created')
+        )
+        teams = []
+        for member in memberships:
+            member.team.role = member.role
+            teams.append(member.team)
+
+        try:
+            profile = ProfileSerializer(user.profile).data
+        except Profile.DoesNotExist:
+            profile = None
+        return {
+            'user': UserSerializer(user).data,
+            'profile': profile,
+            # no request in the context: ?preview= would vary the cached payload, and the
+            # previews show other members, which the cache key doesn't cover
+            'teams': UserTeamSerializer(teams, many=True).data,
+            'memberships': MemberSerializer(memberships, many=True).data,
+        }
+
+
+class PresignedProfileUploadView(AsyncAPIView):
+    async def get(self, request):
         limiter = CacheRateLimiter('profile_upload')
 
-        if limiter.is_limited(request.user.id):
+        if await limiter.ais_limited(request.user.id):
             return Response(
                 {'error': 'Too many uploads. Try again later.'}, 
                 status=status.HTTP_429_TOO_MANY_REQUESTS,
@@ -109,16 +234,32 @@ class PresignedProfileUploadView(APIView):
 
         extension = request.query_params.get('extension', 'jpg')
         content_type = request.query_params.get('type', 'image/jpeg')
-        unique_id = str(uuid.uuid4())
-        key = f'profile_pictures/{unique_id}.{extension}'
+        sha256 = request.query_params.get('sha256', '').lower()
+        storage = get_storage()
+
+        if sha256:
+            if not SHA256_RE.match(sha256):
+                return Response({'error': 'sha256 must be a hex digest.'}, status=400)
+            key = content_key(sha256, extension)
+            # an image some member already uses is stored once and shared
+            if await sync_to_async(referenced_keys)(storage, [key]):
+                presigned_url = None
+            else:
+                presigned_url = storage.presigned_put_url(
+                    key,
+                    content_type=content_type,
+                    checksum_sha256=base64.b64encode(bytes.fromhex(sha256)).decode(),
+                )
+        else:
+            key = f'{PROFILE_PICTURE_PREFIX}{uuid.uuid4()}.{extension}'
+            presigned_url = storage.presigned_put_url(key, content_type=content_type)
 
-        presigned_url = generate_presigned_url(key, content_type=content_type)
-        file_url = f'https://{settings.AWS_S3_STORAGE_BUCKET_NAME}.s3.amazonaws.com/{key}'
+        file_url = storage.url(key)
         upload_token = str(uuid.uuid4())
 
-        cache.set(
-            f'profile_upload_token:{upload_token}',
-            json.dumps({'key': key, 'user_id': request.user.id}),
+        await cache.aset(
+            f'upload:token:{upload_token}',
+            {'key': key, 'user_id': request.user.id, 'content_addressed': bool(sha256)},
             timeout=300
         )
 
@@ -129,8 +270,8 @@ class PresignedProfileUploadView(APIView):
         })
     
 
-class CompleteProfileUploadView(APIView):
-    def post(self, request):
+class CompleteProfileUploadView(AsyncAPIView):
+    async def post(self, request):
         token = request.data.get('token')
         
         if not token:
@@ -140,26 +281,34 @@ class CompleteProfileUploadView(APIView):
         if not team_tid:
             return Response({'error': 'team_id is required'}, status=400)
 
-        cached_data = cache.get(f'profile_upload_token:{token}')
-        if not cached_data:
+        data = await cache.aget(f'upload:token:{token}')
+        if not data:
             return Response({'error': 'Invalid or expired token.'}, status=400)
         
-        data = json.loads(cached_data)
         if data['user_id'] != request.user.id:
             return Response({'error': 'Token does not belong to you.'}, status=403)
         
-        file_url = f"https://{settings.AWS_S3_STORAGE_BUCKET_NAME}.s3.amazonaws.com/{data['key']}"
+        storage = get_storage()
+        file_url = storage.url(data['key'])
 
         try:
-            member = Member.objects.get(user=request.user, team__tid=team_tid)
-        except member.DoesNotExist:
+            member = await Member.objects.aget(user=request.user, team_id=team_id_for(team_tid))
+        except Member.DoesNotExist:
             return Response({'detail': 'Member not found in the specified team.'}, status=404)
-        else:
-            if member.profile_picture_url:
-                delete_old_profile_picture(member.profile_picture_url)
-            member.profile_picture_url = file_url
-            member.save()
-        
-        cache.delete(f'profile_upload_token:{token}')
+
+        if data.get('content_addressed') and not await sync_to_async(referenced_keys)(storage, [data['key']]):
+            # S3 and Redis calls block, keep them off the event loop; they don't
+            # use the ORM, so they need not wait for the request's sync thread
+            if not await sync_to_async(storage.exists, thread_sensitive=False)(data['key']):
+                return Response({'error': 'Upload not found.'}, status=400)
+            uploaded = await sync_to_async(storage.get, thread_sensitive=False)(data['key'])
+            if not content_matches(uploaded, data['key']):
+                await sync_to_async(queue_deletion, thread_sensitive=False)(data['key'])
+                await cache.adelete(f'upload:token:{token}')
+                return Response({'error': 'Uploaded file does not match its checksum.'}, status=400)
+
+        await sync_to_async(apply_profile_picture)(member, file_url)
+
+        await cache.adelete(f'upload:token:{token}')
         return Response({'success': True, 'file_url': file_url})
     
\ No newline at end of file
@@ -0,0 +1,18 @@
+"""
+ASGI config for tochly project.
+
+It exposes the ASGI callable as a module-level variable named ``application``.
+
+For more information on this file, see
+https://docs.djangoproject.com/en/4.2/howto/deployment/asgi/
+"""
+
+import os
+
+from django.core.asgi import get_asgi_application
+
+os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'tochly.settings')
+# settings close DB connections after every request when served over ASGI
+os.environ.setdefault('SERVER_INTERFACE', 'asgi')
+
+application = get_asgi_application()
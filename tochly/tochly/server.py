@@ -0,0 +1,116 @@
+"""
+Gunicorn configuration for production.
+
+Run with ``gunicorn -c python:tochly.server tochly.wsgi:application``.
+
+Workers and threads are sized from the cores this container may use and
+``SERVER_WORKLOAD``: ``io`` (the default, requests mostly wait on Postgres,
+Redis and S3) runs threaded workers, ``cpu`` runs one sync worker per core.
+``WEB_CONCURRENCY`` and ``SERVER_THREADS`` override the computed values.
+
+``SERVER_INTERFACE=asgi`` serves ``tochly.asgi`` from one uvicorn event loop
+per core instead, where async views handle many concurrent requests each.
+"""
+
+import gc
+import math
+import os
+
+WORKLOADS = {
+    # (workers per core, extra workers, threads per worker)
+    'io': (2, 1, 4),
+    'cpu': (1, 1, 1),
+}
+
+
+def available_cores():
+    """Cores usable by this process, honouring affinity and cgroup CPU quotas."""
+    try:
+        cores = len(os.sched_getaffinity(0))
+    except AttributeError:
+        cores = os.cpu_count() or 1
+
+    try:
+        with open('/sys/fs/cgroup/cpu.max') as f:
+            quota, period = f.read().split()
+        if quota != 'max':
+            cores = min(cores, max(1, math.ceil(int(quota) / int(period))))
+    except (OSError, ValueError):
+        pass
+    return cores
+
+
+def worker_sizing(cores, workload):
+    per_core, extra, threads = WORKLOADS[workload]
+    return per_core * cores + extra, threads
+
+
+workload = os.getenv('SERVER_WORKLOAD', 'io')
+if workload not in WORKLOADS:
+    raise ValueError(f'SERVER_WORKLOAD must be one of {sorted(WORKLOADS)}, got {workload!r}')
+
+interface = os.getenv('SERVER_INTERFACE', 'wsgi')
+if interface not in ('wsgi', 'asgi'):
+    raise ValueError(f"SERVER_INTERFACE must be 'wsgi' or 'asgi', got {interface!r}")
+
+if interface == 'asgi':
+    _workers, _threads = worker_sizing(available_cores(), 'cpu')
+else:
+    _workers, _threads = worker_sizing(available_cores(), workload)
+
+bind = os.getenv('SERVER_BIND', '0.0.0.0:8000')
+wsgi_app = f'tochly.{interface}:application'
+workers = int(os.getenv('WEB_CONCURRENCY', _workers))
+threads = int(os.getenv('SERVER_THREADS', _threads))
+if interface == 'asgi':
+    worker_class = 'uvicorn_worker.UvicornWorker'
+else:
+    worker_class = 'gthread' if threads > 1 else 'sync'
+
+# import Django once in the master so workers share its pages copy-on-write
+preload_app = True
+
+# recycle workers to cap slow leaks, jittered so they do not restart together
+max_requests = int(os.getenv('SERVER_MAX_REQUESTS', 2000))
+max_requests_jitter = max_requests // 10
+
+timeout = int(os.getenv('SERVER_TIMEOUT', 30))
+graceful_timeout = 30
+keepalive = 5
+# the heartbeat file on an overlay filesystem can stall workers under load
+worker_tmp_dir = '/dev/shm' if os.path.isdir('/dev/shm') else None
+
+
+def when_ready(server):
+    from django.db import connections
+
+    from common.db.pool import all_pools
+
+    # nothing opened while preloading may be inherited by the workers
+    connections.close_all()
+    for pool in all_pools():
+        pool.close_all()
+    gc.collect()
+    gc.freeze()
+
+
+def pre_fork(server, worker):
+    # move objects created since the last fork out of the collector's reach, so
+    # collections in the worker do not write to pages shared with the master
+    gc.freeze()
+
+
+def post_worker_init(worker):
+    """Open DB and Redis connections before the worker takes its first request."""
+    from django.core.cache import cache
+    from django.db import connections
+
+    try:
+        # Django connections are per thread, so only sync workers reuse this one
+        if worker_class == 'sync':
+            for connection in connections.all():
+                connection.ensure_connection()
+        # the Redis pool is shared by every thread in the worker
+        cache.get('server:warmup')
+    except Exception:
+        worker.log.warning('Connection warmup failed', exc_info=True)
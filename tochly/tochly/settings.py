@@ -10,11 +10,14 @@ For the full list of settings and their values, see
 https://docs.djangoproject.com/en/4.1/ref/settings/
 """
 
+from importlib.util import find_spec
 from os import getenv
 from pathlib import Path
 from dotenv import load_dotenv
 from datetime import timedelta
 
+from django.core.exceptions import ImproperlyConfigured
+
 # Build paths inside the project like this: BASE_DIR / 'subdir'.
 BASE_DIR = Path(__file__).resolve().parent.parent
 
@@ -51,6 +54,7 @@ INSTALLED_APPS = [
     'members',
     'core',
     'invitations',
+    'uploads',
 ]
 
 MIDDLEWARE = [
@@ -63,6 +67,7 @@ MIDDLEWARE = [
     'django.contrib.auth.middleware.AuthenticationMiddleware',
     'django.contrib.messages.middleware.MessageMiddleware',
     'django.middleware.clickjacking.XFrameOptionsMiddleware',
+    'common.db.middleware.PrimaryPinMiddleware',
 ]
 
 ROOT_URLCONF = 'tochly.urls'
@@ -163,20 +168,87 @@ REST_FRAMEWORK = {
     )
 }
 
+# orjson renders and parses API JSON exactly like DRF, only faster.
+# API_JSON=stdlib (the default when orjson is not installed) keeps DRF's JSONRenderer/JSONParser.
+API_JSON = getenv('API_JSON', 'orjson' if find_spec('orjson') else 'stdlib')
+if API_JSON not in ('orjson', 'stdlib'):
+    raise ImproperlyConfigured(f"API_JSON must be 'orjson' or 'stdlib', got {API_JSON!r}")
+if API_JSON == 'orjson':
+    REST_FRAMEWORK['DEFAULT_RENDERER_CLASSES'] = (
+        'common.rest.renderers.ORJSONRenderer',
+        'rest_framework.renderers.BrowsableAPIRenderer',
+    )
+    REST_FRAMEWORK['DEFAULT_PARSER_CLASSES'] = (
+        'common.rest.parsers.ORJSONParser',
+        'rest_framework.parsers.FormParser',
+        'rest_framework.parsers.MultiPartParser',
+    )
+
+# routes /api/batch/ may run as sub-requests, and how many per batch
+BATCH_ROUTES = ('/api/teams/', '/api/profiles/', '/api/users/')
+BATCH_MAX_REQUESTS = int(getenv('BATCH_MAX_REQUESTS', 20))
+
 # Database
 # https://docs.djangoproject.com/en/4.1/ref/settings/#databases
 
+# How connections are reused across requests:
+#   persistent - each worker thread keeps its connection for DB_CONN_MAX_AGE
+#                seconds and checks it is alive before reusing it
+#   pool       - threads borrow from a per-process pool, see common/db/pool.py
+#   pgbouncer  - DB_HOST/DB_PORT point at a transaction-mode pgbouncer, which
+#                cannot keep server-side cursors open across transactions
+# Under SERVER_INTERFACE=asgi every request runs its sync code on a thread of
+# its own, so a connection kept past the request would never be reused or
+# closed (Django ticket #33497). Connections are then closed at the end of
+# each request in every mode; use pool or pgbouncer to still reuse them.
+DB_POOL_MODE = getenv('DB_POOL_MODE', 'persistent')
+if DB_POOL_MODE not in ('persistent', 'pool', 'pgbouncer'):
+    raise ImproperlyConfigured(f'Unknown DB_POOL_MODE {DB_POOL_MODE!r}')
+SERVER_INTERFACE = getenv('SERVER_INTERFACE', 'wsgi')
+
 DATABASES = {
     'default': {
-        'ENGINE': 'django.db.backends.postgresql',
+        'ENGINE': (
+            'common.db.backends.postgresql_pool'
+            if DB_POOL_MODE == 'pool' else 'django.db.backends.postgresql'
+        ),
         'NAME': getenv('DB_NAME'),
         'USER': getenv('DB_USER'),
         'PASSWORD': getenv('DB_PASSWORD'),
         'HOST': getenv('DB_HOST'),
-        'PORT': 5432,
+        'PORT': int(getenv('DB_PORT', 5432)),
+        # pooled connections go back to the pool at the end of every request
+        'CONN_MAX_AGE': (
+            0 if DB_POOL_MODE == 'pool' or SERVER_INTERFACE == 'asgi' else int(getenv('DB_CONN_MAX_AGE', 300))
+        ),
+        'CONN_HEALTH_CHECKS': DB_POOL_MODE != 'pool',
+        'DISABLE_SERVER_SIDE_CURSORS': DB_POOL_MODE == 'pgbouncer',
+        'POOL': {
+            'max_size': int(getenv('DB_POOL_MAX_SIZE', 10)),
+            'max_lifetime': int(getenv('DB_POOL_MAX_LIFETIME', 1800)),
+            'checkout_timeout': int(getenv('DB_POOL_CHECKOUT_TIMEOUT', 10)),
+            'health_check_interval': int(getenv('DB_POOL_HEALTH_CHECK_INTERVAL', 30)),
+        },
     }
 }
 
+# Read replicas, e.g. DB_REPLICA_HOSTS=replica-1.internal,replica-2.internal:5433.
+# Tests read them through the default test database.
+for index, replica in enumerate(filter(None, getenv('DB_REPLICA_HOSTS', '').split(',')), start=1):
+    host, _, port = replica.strip().partition(':')
+    DATABASES[f'replica{index}'] = {
+        **DATABASES['default'],
+        'HOST': host,
+        'PORT': int(port or DATABASES['default']['PORT']),
+        'TEST': {'MIRROR': 'default'},
+    }
+DATABASE_REPLICAS = [alias for alias in DATABASES if alias != 'default']
+DATABASE_ROUTERS = ['common.db.routers.ReplicaRouter']
+# how long a user's reads stay on the primary after they write
+REPLICA_LAG_WINDOW = int(getenv('DB_REPLICA_LAG_WINDOW', 5))
+# hash partitions of the members table, 0 keeps it a single table (see members.partitioning)
+MEMBER_PARTITIONS = int(getenv('DB_MEMBER_PARTITIONS', 0))
+
 # Djoser settings
 DJOSER = {
     'PASSWORD_RESET_CONFIRM_URL': 'auth/password-reset/{uid}/{token}',
@@ -203,6 +275,31 @@ CELERY_ACCEPT_CONTENT = ['json']
 CELERY_RESULT_BACKEND = getenv('CELERY_RESULT_BACKEND')
 CELERY_TASK_SERIALIZER = 'json'
 CELERY_RESULT_EXPIRES = 3600
+# image work is CPU bound, keep it off the default queue
+CELERY_TASK_ROUTES = {
+    'members.tasks.process_profile_picture': {'queue': 'media'},
+}
+# seconds buffered presence updates may wait before being written
+PRESENCE_FLUSH_INTERVAL = float(getenv('PRESENCE_FLUSH_INTERVAL', 5))
+
+CELERY_BEAT_SCHEDULE = {
+    'flush-profile-picture-deletions': {
+        'task': 'members.tasks.flush_profile_picture_deletions',
+        'schedule': 30.0,
+    },
+    'reconcile-profile-pictures': {
+        'task': 'members.tasks.reconcile_profile_pictures',
+        'schedule': 60 * 60 * 24,
+    },
+    'abort-stale-multipart-uploads': {
+        'task': 'uploads.tasks.abort_stale_multipart_uploads',
+        'schedule': 60 * 60 * 6,
+    },
+    'flush-member-presence': {
+        'task': 'members.tasks.flush_presence',
+        'schedule': PRESENCE_FLUSH_INTERVAL,
+    },
+}
 
 # email settings
 EMAIL_BACKEND = 'django_ses.SESBackend'
@@ -220,14 +317,44 @@ AWS_S3_ACCESS_KEY_ID = getenv('AWS_S3_ACCESS_KEY_ID')
 AWS_S3_SECRET_ACCESS_KEY = getenv('AWS_S3_SECRET_ACCESS_KEY')
 AWS_S3_STORAGE_BUCKET_NAME = getenv('AWS_S3_STORAGE_BUCKET_NAME')
 AWS_S3_REGION_NAME = getenv('AWS_S3_REGION_NAME')
+AWS_S3_MAX_POOL_CONNECTIONS = int(getenv('AWS_S3_MAX_POOL_CONNECTIONS', 20))
+STORAGE_BACKEND = getenv('STORAGE_BACKEND', 'common.storage.s3.S3Storage')
+# uploads younger than this are never treated as orphans
+PROFILE_PICTURE_ORPHAN_GRACE = 60 * 60 * 24
+
+# resumable multipart uploads, S3 needs parts of at least 5 MiB except the last
+UPLOAD_PART_SIZE = int(getenv('UPLOAD_PART_SIZE', 8 * 1024 * 1024))
+UPLOAD_PART_URL_EXPIRES = 60 * 60
+UPLOAD_SESSION_TIMEOUT = 60 * 60 * 24
+UPLOAD_PURPOSES = {
+    'avatar': {
+        'prefix': 'profile_pictures/',
+        'max_size': 10 * 1024 * 1024,
+        'content_types': ['image/jpeg', 'image/png', 'image/webp'],
+        'validate': 'members.uploads.validate_avatar_upload',
+        'on_complete': 'members.uploads.complete_avatar_upload',
+    },
+}
+
+# Redis via django-redis, optionally fronted by a per-process L1
+CACHE_L1_ENABLED = getenv('CACHE_L1_ENABLED', 'False') == 'True'
 
-# Redis via django-redis
 CACHES = {
     'default': {
-        'BACKEND': 'django_redis.cache.RedisCache',
+        'BACKEND': (
+            'common.cache.backends.TwoTierRedisCache'
+            if CACHE_L1_ENABLED else 'django_redis.cache.RedisCache'
+        ),
         'LOCATION': getenv('DJANGO_CACHE_LOCATION'),
+        'KEY_PREFIX': 'tochly',
         'OPTIONS': {
             'CLIENT_CLASS': 'django_redis.client.DefaultClient',
+            'SERIALIZER': 'common.cache.serializers.MsgpackSerializer',
+            'COMPRESSOR': 'common.cache.compressors.Lz4Compressor',
+            'COMPRESS_MIN_LENGTH': int(getenv('CACHE_COMPRESS_MIN_LENGTH', 256)),
+            'L1_MAX_ENTRIES': int(getenv('CACHE_L1_MAX_ENTRIES', 1024)),
+            'L1_TIMEOUT': int(getenv('CACHE_L1_TIMEOUT', 5)),
+            'L1_CHANNEL': 'cache:invalidate',
         }
     }
 }
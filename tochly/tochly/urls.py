@@ -7,4 +7,6 @@ urlpatterns = [
     path('api/', include('users.urls')),
     path('api/', include('members.urls')),
     path('api/invitations/', include('invitations.urls')),
+    path('api/uploads/', include('uploads.urls')),
+    path('api/', include('core.urls')),
 ]
@@ -0,0 +1,130 @@
+import math
+import uuid
+
+from django.conf import settings
+from django.core.cache import cache
+from django.utils.module_loading import import_string
+from rest_framework.exceptions import NotFound, PermissionDenied, ValidationError
+
+from common.storage import get_storage
+
+# S3 refuses multipart uploads with more parts than this
+MAX_UPLOAD_PARTS = 10000
+
+
+def session_key(upload_id):
+    return f'upload:session:{upload_id}'
+
+
+def create_session(user_id, purpose, content_type, size, extension):
+    """Start a multipart upload and record its session in the cache."""
+    config = settings.UPLOAD_PURPOSES[purpose]
+    storage = get_storage()
+    key = f"{config['prefix']}{uuid.uuid4()}.{extension}"
+    part_size = max(settings.UPLOAD_PART_SIZE, math.ceil(size / MAX_UPLOAD_PARTS))
+
+    session = {
+        'id': uuid.uuid4().hex,
+        'user_id': user_id,
+        'purpose': purpose,
+        'key': key,
+        'storage_upload_id': storage.create_multipart_upload(key, content_type),
+        'content_type': content_type,
+        'size': size,
+        'part_size': part_size,
+        'part_count': max(1, math.ceil(size / part_size)),
+    }
+    cache.set(session_key(session['id']), session, timeout=settings.UPLOAD_SESSION_TIMEOUT)
+    return session
+
+
+def get_session(upload_id, user_id):
+    session = cache.get(session_key(upload_id))
+    if session is None:
+        raise NotFound('Upload session not found or expired.')
+    if session['user_id'] != user_id:
+        raise PermissionDenied('Upload session does not belong to you.')
+    return session
+
+
+def describe(session, uploaded=None):
+    """
+    Return the session state with fresh URLs for every part not received yet.
+
+    Clients PUT those parts in parallel and, after an interruption, fetch this
+    again to resume with only the missing parts. Once the parts are assembled
+    the multipart upload is gone, so only completing or aborting is left.
+    """
+    storage = get_storage()
+    if session.get('assembled'):
+        received = set(range(1, session['part_count'] + 1))
+    else:
+        if uploaded is None:
+            uploaded = storage.list_parts(session['key'], session['storage_upload_id'])
+        received = {part['part_number'] for part in uploaded}
+
+    return {
+        'upload_id': session['id'],
+        'purpose': session['purpose'],
+        'file_url': storage.url(session['key']),
+        'size': session['size'],
+        'part_size': session['part_size'],
+        'part_count': session['part_count'],
+        'uploaded_parts': sorted(received),
+        'assembled': bool(session.get('assembled')),
+        'parts': [
+            {
+                'part_number': number,
+                'url': storage.presigned_part_url(
+                    session['key'],
+                    session['storage_upload_id'],
+                    number,
+                    expires_in=settings.UPLOAD_PART_URL_EXPIRES,
+                ),
+            }
+            for number in range(1, session['part_count'] + 1)
+            if number not in received
+        ],
+    }
+
+
+def complete(session, request):
+    """
+    Assemble the parts and hand the stored file to the purpose's handler.
+
+    The purpose's ``validate`` hook runs first, so a request the handler
+    would refuse leaves the upload as it was. Its result is passed on to
+    ``on_complete``. The session is kept until the handler succeeds, and a
+    retry after a failed handler skips the assembly already done.
+    """
+    config = settings.UPLOAD_PURPOSES[session['purpose']]
+    validated = import_string(config['validate'])(session, request) if config.get('validate') else None
+
+    storage = get_storage()
+    if not session.get('assembled'):
+        parts = storage.list_parts(session['key'], session['storage_upload_id'])
+        received = {part['part_number'] for part in parts}
+        missing = [number for number in range(1, session['part_count'] + 1) if number not in received]
+
+        if missing or len(parts) != session['part_count']:
+            raise ValidationError({'parts': f'Upload is missing parts {missing}.'})
+        if sum(part['size'] for part in parts) != session['size']:
+            raise ValidationError({'size': 'Uploaded size does not match the declared size.'})
+
+        storage.complete_multipart_upload(session['key'], session['storage_upload_id'], parts)
+        session['assembled'] = True
+        cache.set(session_key(session['id']), session, timeout=settings.UPLOAD_SESSION_TIMEOUT)
+
+    data = {'file_url': storage.url(session['key'])}
+    if config.get('on_complete'):
+        data.update(import_string(config['on_complete'])(session, request, validated) or {})
+    cache.delete(session_key(session['id']))
+    return data
+
+
+def abort(session):
+    if session.get('assembled'):
+        get_storage().delete(session['key'])
+    else:
+        get_storage().abort_multipart_upload(session['key'], session['storage_upload_id'])
+    cache.delete(session_key(session['id']))
@@ -0,0 +1,21 @@
+from datetime import timedelta
+
+from celery import shared_task
+from django.conf import settings
+from django.utils import timezone
+
+from common.storage import get_storage
+
+
+@shared_task
+def abort_stale_multipart_uploads():
+    """Abort multipart uploads whose session expired, so their parts stop being billed."""
+    storage = get_storage()
+    cutoff = timezone.now() - timedelta(seconds=settings.UPLOAD_SESSION_TIMEOUT)
+    aborted = 0
+    for config in settings.UPLOAD_PURPOSES.values():
+        for key, upload_id, initiated in storage.iter_multipart_uploads(config['prefix']):
+            if initiated < cutoff:
+                storage.abort_multipart_upload(key, upload_id)
+                aborted += 1
+    return aborted
@@ -0,0 +1,169 @@
+from datetime import timedelta
+from unittest.mock import patch
+
+from django.urls import reverse
+from django.test import override_settings
+from django.utils import timezone
+
+from rest_framework import status
+
+from common.storage import get_storage
+from core.tests.base import BaseAPITestCaseAuthenticated
+from members.models import Team, Member
+from uploads.tasks import abort_stale_multipart_uploads
+
+
+@override_settings(STORAGE_BACKEND='common.storage.memory.InMemoryStorage', UPLOAD_PART_SIZE=4)
+class UploadViewTests(BaseAPITestCaseAuthenticated):
+    def setUp(self):
+        super().setUp()
+        get_storage.cache_clear()
+        self.storage = get_storage()
+        self.team = Team.objects.create(name='Upload Team')
+        self.member = Member.objects.create(user=self.user, team=self.team, display_name='Uploader')
+        self.body = b'0123456789'
+
+    def create(self, **overrides):
+        payload = {
+            'purpose': 'avatar',
+            'content_type': 'image/jpeg',
+            'size': len(self.body),
+            'extension': 'jpg',
+        }
+        payload.update(overrides)
+        return self.client.post(reverse('uploads'), payload, format='json')
+
+    def storage_upload_id(self, data):
+        key = self.storage.key_from_url(data['file_url'])
+        return next(
+            upload_id for upload_id, upload in self.storage.multipart_uploads.items() if upload['key'] == key
+        )
+
+    def upload_parts(self, data, numbers):
+        upload_id = self.storage_upload_id(data)
+        for number in numbers:
+            start = (number - 1) * data['part_size']
+            self.storage.upload_part(upload_id, number, self.body[start:start + data['part_size']])
+
+    def complete(self, upload_id):
+        return self.client.post(
+            f"{reverse('upload-complete', args=[upload_id])}?team_tid={self.team.tid}",
+        )
+
+    def test_create_returns_a_url_per_part(self):
+        response = self.create()
+
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+        self.assertEqual(response.data['part_count'], 3)
+        self.assertEqual([part['part_number'] for part in response.data['parts']], [1, 2, 3])
+
+    def test_rejects_unknown_purpose_and_oversized_files(self):
+        self.assertEqual(self.create(purpose='unknown').status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertEqual(self.create(size=100 * 1024 * 1024).status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertEqual(self.create(content_type='text/html').status_code, status.HTTP_400_BAD_REQUEST)
+
+    def test_resume_lists_only_missing_parts(self):
+        data = self.create().data
+        self.upload_parts(data, [1, 3])
+
+        response = self.client.get(reverse('upload-detail', args=[data['upload_id']]))
+
+        self.assertEqual(response.data['uploaded_parts'], [1, 3])
+        self.assertEqual([part['part_number'] for part in response.data['parts']], [2])
+
+    def test_complete_requires_every_part(self):
+        data = self.create().data
+        self.upload_parts(data, [1, 2])
+
+        response = self.complete(data['upload_id'])
+
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+
+    def test_complete_assembles_parts_and_sets_avatar(self):
+        data = self.create().data
+        self.upload_parts(data, [3, 1, 2])
+
+        response = self.complete(data['upload_id'])
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        key = self.storage.key_from_url(data['file_url'])
+        self.assertEqual(self.storage.get(key), self.body)
+        self.member.refresh_from_db()
+        self.assertEqual(self.member.profile_picture_url, data['file_url'])
+        detail = self.client.get(reverse('upload-detail', args=[data['upload_id']]))
+        self.assertEqual(detail.status_code, status.HTTP_404_NOT_FOUND)
+
+    def test_complete_without_team_leaves_the_upload_resumable(self):
+        data = self.create().data
+        self.upload_parts(data, [1, 2, 3])
+
+        response = self.client.post(reverse('upload-complete', args=[data['upload_id']]))
+
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertIn(self.storage_upload_id(data), self.storage.multipart_uploads)
+        self.assertFalse(self.storage.exists(self.storage.key_from_url(data['file_url'])))
+        self.assertEqual(self.complete(data['upload_id']).status_code, status.HTTP_200_OK)
+
+    def test_failed_handler_keeps_the_session_for_a_retry(self):
+        data = self.create().data
+        self.upload_parts(data, [1, 2, 3])
+
+        with patch('members.uploads.apply_profile_picture', side_effect=RuntimeError('database down')):
+            with self.assertRaises(RuntimeError):
+                self.complete(data['upload_id'])
+        response = self.complete(data['upload_id'])
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.member.refresh_from_db()
+        self.assertEqual(self.member.profile_picture_url, data['file_url'])
+
+    def test_detail_after_failed_handler_reports_the_assembled_upload(self):
+        data = self.create().data
+        self.upload_parts(data, [1, 2, 3])
+        with patch('members.uploads.apply_profile_picture', side_effect=RuntimeError('database down')):
+            with self.assertRaises(RuntimeError):
+                self.complete(data['upload_id'])
+
+        response = self.client.get(reverse('upload-detail', args=[data['upload_id']]))
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertTrue(response.data['assembled'])
+        self.assertEqual(response.data['uploaded_parts'], [1, 2, 3])
+        self.assertEqual(response.data['parts'], [])
+
+    def test_abort_after_failed_handler_deletes_the_file(self):
+        data = self.create().data
+        self.upload_parts(data, [1, 2, 3])
+        with patch('members.uploads.apply_profile_picture', side_effect=RuntimeError('database down')):
+            with self.assertRaises(RuntimeError):
+                self.complete(data['upload_id'])
+
+        response = self.client.delete(reverse('upload-detail', args=[data['upload_id']]))
+
+        self.assertEqual(response.status_code, status.HTTP_204_NO_CONTENT)
+        self.assertFalse(self.storage.exists(self.storage.key_from_url(data['file_url'])))
+
+    def test_sessions_belong_to_their_creator(self):
+        data = self.create().data
+        self.authenticate(self.create_user(email='other@example.com'))
+
+        response = self.client.get(reverse('upload-detail', args=[data['upload_id']]))
+
+        self.assertEqual(response.status_code, status.HTTP_403_FORBIDDEN)
+
+    def test_abort_discards_the_upload(self):
+        data = self.create().data
+
+        response = self.client.delete(reverse('upload-detail', args=[data['upload_id']]))
+
+        self.assertEqual(response.status_code, status.HTTP_204_NO_CONTENT)
+        self.assertEqual(self.storage.multipart_uploads, {})
+
+    def test_stale_multipart_uploads_are_aborted(self):
+        self.create()
+        fresh = self.storage_upload_id(self.create().data)
+        stale = next(upload_id for upload_id in self.storage.multipart_uploads if upload_id != fresh)
+        self.storage.multipart_uploads[stale]['initiated'] = timezone.now() - timedelta(days=2)
+
+        self.assertEqual(abort_stale_multipart_uploads(), 1)
+        self.assertEqual(list(self.storage.multipart_uploads), [fresh])
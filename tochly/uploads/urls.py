@@ -0,0 +1,8 @@
+from django.urls import path
+from .views import UploadCreateView, UploadDetailView, UploadCompleteView
+
+urlpatterns = [
+    path('', UploadCreateView.as_view(), name='uploads'),
+    path('<str:upload_id>/', UploadDetailView.as_view(), name='upload-detail'),
+    path('<str:upload_id>/complete/', UploadCompleteView.as_view(), name='upload-complete'),
+]
@@ -0,0 +1,24 @@
+from django.conf import settings
+
+from pydantic_core import PydanticCustomError
+from pydantic import BaseModel, Field, model_validator
+
+
+class CreateUploadValidator(BaseModel):
+    purpose: str
+    content_type: str = Field(..., max_length=100)
+    size: int = Field(..., gt=0)
+    extension: str = Field(..., pattern=r'^[a-z0-9]{1,10}$')
+
+    @model_validator(mode='after')
+    def validate_purpose_limits(self):
+        config = settings.UPLOAD_PURPOSES.get(self.purpose)
+        if config is None:
+            raise PydanticCustomError('unknown_upload_purpose', f'Unknown upload purpose {self.purpose}')
+        if self.content_type not in config['content_types']:
+            raise PydanticCustomError(
+                'content_type_not_allowed', f'{self.content_type} is not allowed for {self.purpose}',
+            )
+        if self.size > config['max_size']:
+            raise PydanticCustomError('upload_too_large', f"Uploads are limited to {config['max_size']} bytes")
+        return self
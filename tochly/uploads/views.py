@@ -0,0 +1,43 @@
+from rest_framework.views import APIView
+from rest_framework.response import Response
+from rest_framework import status
+
+from pydantic import ValidationError
+
+from common.utils.ratelimiter import CacheRateLimiter
+from uploads import service
+from uploads.validators import CreateUploadValidator
+
+
+class UploadCreateView(APIView):
+    def post(self, request):
+        if CacheRateLimiter('upload', limit=20).is_limited(request.user.id):
+            return Response(
+                {'error': 'Too many uploads. Try again later.'},
+                status=status.HTTP_429_TOO_MANY_REQUESTS,
+            )
+
+        try:
+            validated_data = CreateUploadValidator.model_validate(request.data)
+        except ValidationError as e:
+            return Response({'detail': e.errors()}, status=status.HTTP_400_BAD_REQUEST)
+
+        session = service.create_session(request.user.id, **validated_data.model_dump())
+        return Response(service.describe(session, uploaded=[]), status=status.HTTP_201_CREATED)
+
+
+class UploadDetailView(APIView):
+    def get(self, request, upload_id):
+        session = service.get_session(upload_id, request.user.id)
+        return Response(service.describe(session))
+
+    def delete(self, request, upload_id):
+        session = service.get_session(upload_id, request.user.id)
+        service.abort(session)
+        return Response(status=status.HTTP_204_NO_CONTENT)
+
+
+class UploadCompleteView(APIView):
+    def post(self, request, upload_id):
+        session = service.get_session(upload_id, request.user.id)
+        return Response(service.complete(session, request))
@@ -6,3 +6,8 @@ class UsersConfig(AppConfig):
 
     def ready(self):
         from . import signals
+        from common.cache.querysets import track
+        from users.models import User, Profile
+
+        track(User, scopes=('id',))
+        track(Profile, scopes=('user_id',))
@@ -2,6 +2,8 @@ import pytz
 from rest_framework import serializers
 from djoser.serializers import UserCreateSerializer as BaseUserCreateSerializer
 
+from common.cache.fragments import FragmentCacheMixin, FragmentCacheListSerializer
+from common.rest.sparse import SparseFieldsetsMixin
 from users.models import User, Profile
 
 class UserSerializer(serializers.ModelSerializer):
@@ -31,7 +33,7 @@ class CustomUserCreateSerializer(BaseUserCreateSerializer):
         're_password': {'write_only': True}
     }
 
-class ProfileSerializer(serializers.ModelSerializer):
+class ProfileSerializer(SparseFieldsetsMixin, FragmentCacheMixin, serializers.ModelSerializer):
     user = serializers.PrimaryKeyRelatedField(queryset=User.objects.all())
     email = serializers.SerializerMethodField(read_only=True)
     full_name = serializers.SerializerMethodField(read_only=True)
@@ -39,6 +41,14 @@ class ProfileSerializer(serializers.ModelSerializer):
     class Meta:
         model = Profile
         fields = '__all__'
+        list_serializer_class = FragmentCacheListSerializer
+        field_sources = {
+            'email': ('user__email',),
+            'full_name': ('user__first_name', 'user__last_name'),
+        }
+
+    def get_fragment_version(self, obj):
+        return (obj.updated, obj.user.email, obj.user.first_name, obj.user.last_name)
 
     def get_full_name(self, obj):
         return obj.full_name
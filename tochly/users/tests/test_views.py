@@ -1,7 +1,11 @@
+import json
+
 from django.urls import reverse
 from django.test import TestCase
 from django.contrib.auth import get_user_model
 from django.conf import settings
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
 
 from rest_framework_simplejwt.tokens import RefreshToken
 from rest_framework.test import APITestCase, APIClient
@@ -275,6 +279,33 @@ class ProfileViewSetTests(BaseAPITestCaseAuthenticated):
         self.assertEqual(response.status_code, status.HTTP_200_OK)
         self.assertEqual(response.data['user'], self.user1.id)
 
+    def test_list_profiles_with_fields(self):
+        """Test ?fields= prunes the profile list and its query"""
+        self.client.force_authenticate(user=self.user1)
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.get(f'{self.filter_url.format(self.user2.id)}&fields=user,dark_mode')
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.data, [{'user': self.user2.id, 'dark_mode': False}])
+        listed = [query['sql'] for query in queries if 'FROM "users_profile"' in query['sql']]
+        self.assertNotIn('JOIN', listed[-1])
+
+    def test_me_endpoint_get_with_omit(self):
+        """Test ?omit= on GET /profiles/me/"""
+        self.client.force_authenticate(user=self.user1)
+        response = self.client.get(f'{self.me_url}?omit=email,full_name,created,updated')
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(set(response.data), {'id', 'user', 'dark_mode'})
+
+    def test_list_profiles_streamed(self):
+        """Test ?stream=true on the profile list"""
+        self.client.force_authenticate(user=self.user1)
+        expected = self.client.get(self.list_url).json()
+
+        response = self.client.get(self.list_url, {'stream': 'true'})
+
+        self.assertTrue(response.streaming)
+        self.assertEqual(json.loads(b''.join(response.streaming_content)), expected)
+
     def test_me_endpoint_get(self):
         """Test GET /profiles/me/ endpoint"""
         self.client.force_authenticate(user=self.user1)
@@ -2,6 +2,8 @@ from django.urls import path, re_path
 
 from rest_framework import routers
 
+from common.rest.negotiation import offer_msgpack
+
 from users.views import (
   CustomTokenObtainPairView,
   CustomTokenRefreshView,
@@ -27,4 +29,4 @@ urlpatterns = [
     path('logout/', LogoutView.as_view(), name='logout'),
 ]
 
-urlpatterns += router.urls
+urlpatterns = offer_msgpack(urlpatterns + router.urls)
@@ -1,3 +1,4 @@
+from asgiref.sync import sync_to_async
 from django.conf import settings
 
 from rest_framework.permissions import IsAuthenticatedOrReadOnly
@@ -6,21 +7,42 @@ from rest_framework.views import APIView
 from rest_framework.response import Response
 from rest_framework import status, viewsets
 from rest_framework.decorators import action
+from rest_framework_simplejwt.exceptions import InvalidToken, TokenError
 from rest_framework_simplejwt.views import (
   TokenObtainPairView,
   TokenRefreshView,
   TokenVerifyView
 )
+from adrf.views import APIView as AsyncAPIView
 
 from djoser.social.views import ProviderAuthView
 
+from common.cache.mixins import CachedQuerysetMixin
+from common.db.mixins import ReplicaReadMixin
+from common.rest.sparse import SparseFieldsetsViewMixin
+from common.rest.streaming import StreamingListMixin
+
 from users.serializers import ProfileSerializer
-from users.models import Profile
+from users.models import User, Profile
 
 
-class CustomTokenObtainPairView(TokenObtainPairView):
-    def post(self, request, *args, **kwargs):
-        response = super().post(request, *args, **kwargs)
+class AsyncTokenViewMixin(AsyncAPIView):
+    """Runs simplejwt's serializer, which hits the ORM and hashes passwords, off the event loop."""
+
+    async def post(self, request, *args, **kwargs):
+        serializer = self.get_serializer(data=request.data)
+
+        try:
+            await sync_to_async(serializer.is_valid)(raise_exception=True)
+        except TokenError as e:
+            raise InvalidToken(e.args[0])
+
+        return Response(serializer.validated_data, status=status.HTTP_200_OK)
+
+
+class CustomTokenObtainPairView(AsyncTokenViewMixin, TokenObtainPairView):
+    async def post(self, request, *args, **kwargs):
+        response = await super().post(request, *args, **kwargs)
 
         if response.status_code == 200:
             access_token = response.data.get('access')
@@ -50,8 +72,8 @@ class CustomTokenObtainPairView(TokenObtainPairView):
         return response
 
 
-class CustomTokenRefreshView(TokenRefreshView):
-    def post(self, request, *args, **kwargs):
+class CustomTokenRefreshView(AsyncTokenViewMixin, TokenRefreshView):
+    async def post(self, request, *args, **kwargs):
         refresh_token = request.COOKIES.get('refresh')
 
         if refresh_token:
@@ -60,7 +82,7 @@ class CustomTokenRefreshView(TokenRefreshView):
             mutable_data['refresh'] = refresh_token
             request._full_data = mutable_data
 
-        response = super().post(request, *args, **kwargs)
+        response = await super().post(request, *args, **kwargs)
 
         if response.status_code == 200:
             access_token = response.data.get('access')
@@ -78,8 +100,8 @@ class CustomTokenRefreshView(TokenRefreshView):
         return response
 
 
-class CustomTokenVerifyView(TokenVerifyView):
-    def post(self, request, *args, **kwargs):
+class CustomTokenVerifyView(AsyncTokenViewMixin, TokenVerifyView):
+    async def post(self, request, *args, **kwargs):
         access_token = request.COOKIES.get('access')
 
         if access_token:
@@ -88,7 +110,7 @@ class CustomTokenVerifyView(TokenVerifyView):
             mutable_data['token'] = access_token
             request._full_data = mutable_data
         
-        return super().post(request, *args, **kwargs)
+        return await super().post(request, *args, **kwargs)
 
 
 class LogoutView(APIView):
@@ -132,15 +154,23 @@ class CustomProviderAuthView(ProviderAuthView):
         return response
 
 
-class ProfileViewSet(viewsets.ModelViewSet):
+class ProfileViewSet(
+    ReplicaReadMixin, SparseFieldsetsViewMixin, StreamingListMixin, CachedQuerysetMixin, viewsets.ModelViewSet,
+):
     serializer_class = ProfileSerializer
-    queryset = Profile.objects.all()
+    queryset = Profile.objects.select_related('user')
 
     def get_queryset(self):
         user_id = self.request.query_params.get('user_id')
         if user_id:
-            return Profile.objects.filter(user__id=user_id)
+            return super().get_queryset().filter(user__id=user_id)
         return super().get_queryset()
+
+    def get_queryset_cache_scopes(self):
+        user_id = self.request.query_params.get('user_id')
+        if user_id and user_id.isdigit():
+            return {Profile: {'user_id': int(user_id)}, User: {'id': int(user_id)}}
+        return None
         
     @action(['get', 'put', 'patch', 'delete'], detail=False)
     def me(self, request):